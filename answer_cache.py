@@ -0,0 +1,156 @@
+"""Disk-backed cache of agent answers with request coalescing.
+
+Answers are keyed on the normalized query text plus the dataset version, so a
+data change never serves a stale answer. Each entry stores the final text and
+the decoded tool results, which lets the map be rebuilt from a cache hit
+without calling the model.
+
+Identical queries that arrive while an answer is still being computed wait on
+the first computation instead of starting their own agent run (single-flight).
+Gradio runs every request through its own ``asyncio.run`` loop, so in-flight
+work is tracked with thread-safe ``concurrent.futures.Future`` objects.
+"""
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from serialization import to_json_bytes, from_json
+
+Answer = Tuple[str, List[Dict[str, Any]]]
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?.!]+$")
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation."""
+    text = _WHITESPACE.sub(" ", query.strip().casefold())
+    text = re.sub(r"\s*,\s*", ", ", text)
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+class AnswerCache:
+    """SQLite-backed answer cache with TTL, size eviction and single-flight."""
+
+    def __init__(self, path: Union[str, Path], dataset_version: Union[str, Callable[[], str]],
+                 ttl_seconds: float = 86400, max_entries: int = 1000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._dataset_version = dataset_version
+        self._lock = threading.RLock()
+        self._inflight: Dict[str, Future] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " key TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_accessed ON answers (accessed)")
+        self._conn.commit()
+
+    @property
+    def dataset_version(self) -> str:
+        version = self._dataset_version
+        return version() if callable(version) else version
+
+    def key(self, query: str) -> str:
+        """Return the cache key for a query under the current dataset version."""
+        raw = f"{self.dataset_version}\x00{normalize_query(query)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, query: str) -> Optional[Answer]:
+        """Return a cached ``(output, tool_results)`` pair, or ``None``."""
+        return self._get(self.key(query))
+
+    def put(self, query: str, answer: Answer) -> None:
+        """Store an answer for a query."""
+        self._put(self.key(query), answer)
+
+    async def get_or_compute(self, query: str, compute: Callable[[], Awaitable[Answer]]) -> Answer:
+        """Return the cached answer, joining or starting a single computation."""
+        key = self.key(query)
+        with self._lock:
+            hit = self._get(key)
+            if hit is not None:
+                return hit
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            answer = await compute()
+            self._put(key, answer)
+            future.set_result(answer)
+            return answer
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _get(self, key: str) -> Optional[Answer]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, created = row
+            if now - created > self.ttl_seconds:
+                self._conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE answers SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        data = from_json(payload)
+        return data["output"], data["tool_results"]
+
+    def _put(self, key: str, answer: Answer) -> None:
+        output, tool_results = answer
+        payload = to_json_bytes({"output": str(output), "tool_results": tool_results})
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (key, payload, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM answers WHERE key IN ("
+            " SELECT key FROM answers ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
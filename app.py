@@ -1,17 +1,19 @@
 import os
-import json
-import re
+from typing import Optional
 import gradio as gr
 import asyncio
 
 from agents import Agent, Runner, function_tool
 from servers.submarine_server import SubmarineCablesServer
 from servers.basestation_server import BaseStationCoverageServer
-from models import (
-    LandingStationResponse, CableRoute, CableLatencyResponse,
-    CableOutageRiskResponse, BaseStationResponse, CoverageStrengthResponse,
-    ProposedStation, HandoverPathResponse
-)
+from servers.geocoder_server import GeocoderServer
+from servers.datasets import DatasetManager
+from servers.gazetteer import load_gazetteer
+from servers.tiles import tiled_datasets
+from serialization import to_json
+from answer_cache import AnswerCache
+from conversation import ConversationMemory, extract_tool_results
+from map_layers import MAP_CONTAINER_HTML, MAP_HEAD, extract_layers, map_clear, map_update
 
 # Load environment variables from .env file if it exists
 try:
@@ -31,50 +33,108 @@ if not OPENAI_API_KEY:
 
 os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
 
+# Answer cache settings
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", ".cache/answers.sqlite3")
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
 
-def build_agent():
-    sub = SubmarineCablesServer()
-    base = BaseStationCoverageServer()
+# Conversation memory settings
+CONVERSATION_MAX_TOKENS = int(os.getenv("CONVERSATION_MAX_TOKENS", "3000"))
+CONVERSATION_KEEP_RECENT = int(os.getenv("CONVERSATION_KEEP_RECENT", "2"))
+
+# Base-station sharding (0 = single process)
+BASESTATION_SHARD_WORKERS = int(os.getenv("BASESTATION_SHARD_WORKERS", "0"))
+BASESTATION_SHARD_TILE_DEG = float(os.getenv("BASESTATION_SHARD_TILE_DEG", "1.0"))
+
+# Monte Carlo cable-cut workers (0 = in process)
+CABLE_RESILIENCE_WORKERS = int(os.getenv("CABLE_RESILIENCE_WORKERS", "0"))
+
+# Tiled datasets (unset = load the full data files into memory)
+DATASET_TILE_DIR = os.getenv("DATASET_TILE_DIR")
+DATASET_TILE_CACHE_MB = float(os.getenv("DATASET_TILE_CACHE_MB", "256"))
+DATASET_TILE_IDLE_SECONDS = float(os.getenv("DATASET_TILE_IDLE_SECONDS", "300"))
+
+# Offline gazetteer: places.json or a GeoNames cities*.txt dump (unset = data/places.json)
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH")
+
+
+def build_agent(sub: SubmarineCablesServer = None, base: BaseStationCoverageServer = None,
+                geo: GeocoderServer = None):
+    sub = sub or SubmarineCablesServer()
+    base = base or BaseStationCoverageServer()
+    geo = geo or GeocoderServer()
+
+    @function_tool
+    def locate_landing_station(country: str) -> str:
+        return to_json(sub._locate_landing_station_impl(country))
+
+    @function_tool
+    def cable_route_between(country_a: str, country_b: str) -> str:
+        return to_json(sub._cable_route_between_impl(country_a, country_b))
+
+    @function_tool
+    def list_cables_near(lat: Optional[float], lon: Optional[float], radius_km: float, place: Optional[str] = None) -> str:
+        lat, lon = geo.locate(lat, lon, place)
+        return to_json(sub._list_cables_near_impl(lat, lon, radius_km))
+
+    @function_tool
+    def cable_latency_estimate(country_a: str, country_b: str) -> str:
+        return to_json(sub._cable_latency_estimate_impl(country_a, country_b))
 
     @function_tool
-    def locate_landing_station(country: str) -> LandingStationResponse:
-        return sub._locate_landing_station_impl(country)
+    def cable_outage_risk(lat: Optional[float], lon: Optional[float], place: Optional[str] = None) -> str:
+        lat, lon = geo.locate(lat, lon, place)
+        return to_json(sub._cable_outage_risk_impl(lat, lon))
 
     @function_tool
-    def cable_route_between(country_a: str, country_b: str) -> CableRoute:
-        return sub._cable_route_between_impl(country_a, country_b)
+    def nearest_basestations(lat: Optional[float], lon: Optional[float], radius_km: float, place: Optional[str] = None) -> str:
+        lat, lon = geo.locate(lat, lon, place)
+        return to_json(base._nearest_basestations_impl(lat, lon, radius_km))
 
     @function_tool
-    def list_cables_near(lat: float, lon: float, radius_km: float) -> list:
-        return sub._list_cables_near_impl(lat, lon, radius_km)
+    def coverage_strength_at(lat: Optional[float], lon: Optional[float], place: Optional[str] = None) -> str:
+        lat, lon = geo.locate(lat, lon, place)
+        return to_json(base._coverage_strength_at_impl(lat, lon))
 
     @function_tool
-    def cable_latency_estimate(country_a: str, country_b: str) -> CableLatencyResponse:
-        return sub._cable_latency_estimate_impl(country_a, country_b)
+    def propose_new_station(lat: Optional[float], lon: Optional[float], required_radius: float, place: Optional[str] = None) -> str:
+        lat, lon = geo.locate(lat, lon, place)
+        return to_json(base._propose_new_station_impl(lat, lon, required_radius))
 
     @function_tool
-    def cable_outage_risk(lat: float, lon: float) -> CableOutageRiskResponse:
-        return sub._cable_outage_risk_impl(lat, lon)
+    def stations_with_capacity(min_capacity: int) -> str:
+        return to_json(base._stations_with_capacity_impl(min_capacity))
 
     @function_tool
-    def nearest_basestations(lat: float, lon: float, radius_km: float) -> BaseStationResponse:
-        return base._nearest_basestations_impl(lat, lon, radius_km)
+    def handover_path(start_lat: Optional[float], start_lon: Optional[float], end_lat: Optional[float], end_lon: Optional[float],
+                      start_place: Optional[str] = None, end_place: Optional[str] = None) -> str:
+        start_lat, start_lon = geo.locate(start_lat, start_lon, start_place)
+        end_lat, end_lon = geo.locate(end_lat, end_lon, end_place)
+        return to_json(base._handover_path_impl(start_lat, start_lon, end_lat, end_lon))
 
     @function_tool
-    def coverage_strength_at(lat: float, lon: float) -> CoverageStrengthResponse:
-        return base._coverage_strength_at_impl(lat, lon)
+    def coverage_gaps(min_lat: Optional[float], min_lon: Optional[float], max_lat: Optional[float], max_lon: Optional[float],
+                      threshold_dbm: float = -100.0, place: Optional[str] = None) -> str:
+        min_lat, min_lon, max_lat, max_lon = geo.bounding_box(min_lat, min_lon, max_lat, max_lon, place)
+        return to_json(base._coverage_gaps_impl(min_lat, min_lon, max_lat, max_lon, threshold_dbm))
 
     @function_tool
-    def propose_new_station(lat: float, lon: float, required_radius: float) -> ProposedStation:
-        return base._propose_new_station_impl(lat, lon, required_radius)
+    def simulate_network_load(min_lat: Optional[float], min_lon: Optional[float], max_lat: Optional[float], max_lon: Optional[float],
+                              mobiles: int = 10000, duration_minutes: float = 60.0, place: Optional[str] = None) -> str:
+        min_lat, min_lon, max_lat, max_lon = geo.bounding_box(min_lat, min_lon, max_lat, max_lon, place)
+        return to_json(base._simulate_network_load_impl(min_lat, min_lon, max_lat, max_lon, mobiles, duration_minutes))
 
     @function_tool
-    def stations_with_capacity(min_capacity: int) -> BaseStationResponse:
-        return base._stations_with_capacity_impl(min_capacity)
+    def cable_resilience(country_a: str, country_b: str, scenarios: int = 100000) -> str:
+        return to_json(sub._cable_resilience_impl(country_a, country_b, scenarios))
 
     @function_tool
-    def handover_path(start_lat: float, start_lon: float, end_lat: float, end_lon: float) -> HandoverPathResponse:
-        return base._handover_path_impl(start_lat, start_lon, end_lat, end_lon)
+    def disjoint_cable_paths(country_a: str, country_b: str, k: int = 3) -> str:
+        return to_json(sub._disjoint_cable_paths_impl(country_a, country_b, k))
+
+    @function_tool
+    def geocode(place: str, limit: int = 5) -> str:
+        return to_json(geo._geocode_impl(place, limit))
 
     tools = [
         locate_landing_station,
@@ -86,7 +146,12 @@ def build_agent():
         coverage_strength_at,
         propose_new_station,
         stations_with_capacity,
-        handover_path
+        handover_path,
+        coverage_gaps,
+        simulate_network_load,
+        cable_resilience,
+        disjoint_cable_paths,
+        geocode
     ]
 
     agent = Agent(
@@ -98,231 +163,90 @@ def build_agent():
     return agent
 
 
-agent = build_agent()
+# Built by start_services(), not at import time: pool workers are spawned and re-import this module
+agent = None
+answer_cache = None
+
+
+def start_services():
+    """Create the servers, agent and answer cache, and start hot-reloading the datasets."""
+    global agent, answer_cache
+    # Servers hot-reload their data files; every session keeps running across reloads
+    submarine_datasets, basestation_datasets = None, None
+    if DATASET_TILE_DIR:
+        submarine_datasets, basestation_datasets = tiled_datasets(
+            DATASET_TILE_DIR,
+            max_bytes=int(DATASET_TILE_CACHE_MB * 2 ** 20),
+            idle_seconds=DATASET_TILE_IDLE_SECONDS
+        )
+    submarine_server = SubmarineCablesServer(submarine_datasets, resilience_workers=CABLE_RESILIENCE_WORKERS)
+    basestation_server = BaseStationCoverageServer(
+        basestation_datasets,
+        shard_workers=BASESTATION_SHARD_WORKERS,
+        shard_tile_deg=BASESTATION_SHARD_TILE_DEG
+    )
+    geocoder_server = GeocoderServer(
+        DatasetManager(GAZETTEER_PATH, load_gazetteer) if GAZETTEER_PATH else None
+    )
+    submarine_server.datasets.start()
+    basestation_server.datasets.start()
+    geocoder_server.datasets.start()
+
+    agent = build_agent(submarine_server, basestation_server, geocoder_server)
+
+    answer_cache = AnswerCache(
+        ANSWER_CACHE_PATH,
+        dataset_version=lambda: (
+            f"{submarine_server.dataset_version}:{basestation_server.dataset_version}:{geocoder_server.dataset_version}"
+        ),
+        ttl_seconds=ANSWER_CACHE_TTL,
+        max_entries=ANSWER_CACHE_MAX_ENTRIES
+    )
 
 
-async def ask_agent_async(message: str):
-    result = await Runner.run(agent, input=message)
-    
-    # Try to extract tool results from new_items
-    tool_results = []
-    if hasattr(result, 'new_items') and result.new_items:
-        for item in result.new_items:
-            # Check if item has content that might be a tool result
-            if hasattr(item, 'content'):
-                try:
-                    content = item.content
-                    if isinstance(content, str):
-                        try:
-                            content = json.loads(content)
-                        except:
-                            pass
-                    if isinstance(content, dict):
-                        tool_results.append(content)
-                except:
-                    pass
-    
-    return result.final_output, tool_results
+async def ask_agent_async(message: str, memory: ConversationMemory = None):
+    # Follow-ups depend on the conversation, so only first questions are cached
+    if not memory:
+        return await answer_cache.get_or_compute(message, lambda: run_agent_async(message))
+    return await run_agent_async(memory.build_input(message))
 
 
-def ask_agent(message: str):
-    output, tool_results = asyncio.run(ask_agent_async(message))
+async def run_agent_async(agent_input):
+    result = await Runner.run(agent, input=agent_input)
+    return str(result.final_output), extract_tool_results(result)
+
+
+def ask_agent(message: str, memory: ConversationMemory = None):
+    output, tool_results = asyncio.run(ask_agent_async(message, memory))
     return str(output), tool_results
 
 
-def build_leaflet_map(agent_output, tool_results=None):
-    """Build an interactive Leaflet map with markers, lines, and circles."""
-    # Always show a map, even if empty
-    html = """
-    <div id="map" style="height: 100%; width: 100%; min-height: 600px; border-radius: 8px; border: 2px solid #ddd;"></div>
-    <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css"/>
-    <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-    <script>
-        var map = L.map('map').setView([20, 0], 2);
-        L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
-            maxZoom: 19,
-            attribution: '© OpenStreetMap contributors'
-        }).addTo(map);
-        
-        function animateLine(coords, color='red') {
-            var index = 0;
-            var polyline = L.polyline([], {color: color, weight: 4, opacity: 0.8}).addTo(map);
-            function drawSegment() {
-                if (index < coords.length) {
-                    polyline.addLatLng(coords[index]);
-                    index++;
-                    setTimeout(drawSegment, 100);
-                }
-            }
-            drawSegment();
-        }
-    """
-    
-    points = []
-    lines = []
-    circles = []
-    
-    # Extract from tool results
-    if tool_results:
-        for result in tool_results:
-            if isinstance(result, dict):
-                # Base stations
-                if "stations" in result:
-                    for station in result.get("stations", []):
-                        if isinstance(station, dict) and "lat" in station and "lon" in station:
-                            points.append({
-                                "lat": float(station["lat"]),
-                                "lon": float(station["lon"]),
-                                "label": f"📡 {station.get('id', 'Base Station')}"
-                            })
-                
-                # Landing stations
-                if "landing_stations" in result:
-                    for station in result.get("landing_stations", []):
-                        if isinstance(station, dict) and "lat" in station and "lon" in station:
-                            points.append({
-                                "lat": float(station["lat"]),
-                                "lon": float(station["lon"]),
-                                "label": f"🌐 {station.get('name', 'Landing Station')}"
-                            })
-                
-                # Cable routes
-                if "path_coordinates" in result:
-                    coords = []
-                    for coord in result["path_coordinates"]:
-                        if isinstance(coord, (list, tuple)) and len(coord) >= 2:
-                            coords.append([float(coord[0]), float(coord[1])])
-                    if coords:
-                        lines.append({"coords": coords, "color": "#e74c3c"})
-                
-                # Coverage areas
-                if "center" in result and "radius_km" in result:
-                    center = result["center"]
-                    if isinstance(center, (list, tuple)) and len(center) >= 2:
-                        circles.append({
-                            "lat": float(center[0]),
-                            "lon": float(center[1]),
-                            "radius": float(result["radius_km"])
-                        })
-                
-                # Locations
-                if "location" in result:
-                    loc = result["location"]
-                    if isinstance(loc, (list, tuple)) and len(loc) >= 2:
-                        points.append({
-                            "lat": float(loc[0]),
-                            "lon": float(loc[1]),
-                            "label": "📍 Location"
-                        })
-    
-    # Parse coordinates from text - improved pattern matching
-    text = str(agent_output)
-    
-    # Pattern 1: (lat, lon) or [lat, lon]
-    coord_pattern1 = r'[\[\(]?\s*([+-]?\d+\.?\d+)\s*[,]\s*([+-]?\d+\.?\d+)\s*[\]\)]?'
-    matches1 = re.findall(coord_pattern1, text)
-    
-    # Pattern 2: "lat: X, lon: Y" or "latitude: X, longitude: Y"
-    coord_pattern2 = r'(?:lat|latitude)[:\s]+([+-]?\d+\.?\d+).*?(?:lon|lng|longitude)[:\s]+([+-]?\d+\.?\d+)'
-    matches2 = re.findall(coord_pattern2, text, re.IGNORECASE)
-    
-    # Pattern 3: Numbers that look like coordinates (pairs of numbers)
-    coord_pattern3 = r'\b(\d{1,2}\.\d+)[,\s]+(\d{1,3}\.\d+)\b'
-    matches3 = re.findall(coord_pattern3, text)
-    
-    all_matches = matches1 + matches2 + matches3
-    
-    for match in all_matches[:20]:  # Limit to 20 matches
-        try:
-            lat, lon = float(match[0]), float(match[1])
-            # Validate coordinates
-            if -90 <= lat <= 90 and -180 <= lon <= 180:
-                # Check if we already have this point (within 0.01 degrees)
-                if not any(abs(p['lat'] - lat) < 0.01 and abs(p['lon'] - lon) < 0.01 for p in points):
-                    points.append({
-                        "lat": lat,
-                        "lon": lon,
-                        "label": f"📍 ({lat:.2f}, {lon:.2f})"
-                    })
-        except:
-            pass
-    
-    # Add markers
-    if points:
-        for p in points:
-            label = p.get('label', 'Location').replace('"', '\\"').replace('\n', ' ')
-            html += f"""
-            L.marker([{p['lat']}, {p['lon']}]).addTo(map)
-                .bindPopup("{label}");
-            """
-        # Fit bounds
-        lats = [p['lat'] for p in points]
-        lons = [p['lon'] for p in points]
-        html += f"map.fitBounds([[{min(lats)}, {min(lons)}], [{max(lats)}, {max(lons)}]]);"
-    else:
-        # Show a message if no points found
-        html += """
-        L.marker([20, 0]).addTo(map)
-            .bindPopup("No locations found. Try asking about specific coordinates or locations!");
-        """
-    
-    # Add lines
-    for line in lines:
-        coords = line["coords"]
-        color = line.get("color", "red")
-        html += f"animateLine({json.dumps(coords)}, '{color}');"
-    
-    # Add circles
-    for c in circles:
-        html += f"""
-        L.circle([{c['lat']}, {c['lon']}], {{
-            radius: {c['radius'] * 1000},
-            color: "#3498db",
-            fillColor: "#3498db",
-            fillOpacity: 0.2,
-            weight: 2
-        }}).addTo(map).bindPopup("Coverage: {c['radius']}km");
-        """
-    
-    html += "</script>"
-    return html
+def new_memory():
+    return ConversationMemory(max_tokens=CONVERSATION_MAX_TOKENS, keep_recent=CONVERSATION_KEEP_RECENT)
 
 
-def process_query(message, history):
+def process_query(message, history, memory, map_layers):
     """Process user query and update all components."""
     if not message.strip():
-        return history, ""
+        return history, "", gr.update(), memory, map_layers
     
     # Get response
-    output, tool_results = ask_agent(message)
+    output, tool_results = ask_agent(message, memory)
+    memory.add_turn(message, output, tool_results)
     
-    # Build map
-    map_html = build_leaflet_map(output, tool_results)
+    # Send only the layers that changed since the last answer
+    layers = extract_layers(output, tool_results)
+    update = map_update(len(history) + 1, map_layers, layers)
     
     # Update chat history
     history = history + [(message, output)]
     
-    return history, "", map_html
+    return history, "", update, memory, layers
 
 
 def clear_all():
     """Clear all components."""
-    default_map_html = """
-    <div id="map" style="height: 100%; width: 100%; min-height: 600px; border-radius: 8px; border: 2px solid #ddd;"></div>
-    <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css"/>
-    <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-    <script>
-        var map = L.map('map').setView([20, 0], 2);
-        L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
-            maxZoom: 19,
-            attribution: '© OpenStreetMap contributors'
-        }).addTo(map);
-        
-        L.marker([20, 0]).addTo(map)
-            .bindPopup("🗺️ Map cleared. Ask a question to see results!");
-    </script>
-    """
-    return [], "", default_map_html
+    return [], "", map_clear(0), new_memory(), {}
 
 
 # Example queries
@@ -332,128 +256,124 @@ examples = [
     "What is the signal strength at 1.1, 2.2?",
     "Show me the cable route between France and Brazil",
     "Find landing stations in Japan",
-    "What's the coverage area for base stations near 10, 10 with 5km radius?"
+    "What's the coverage area for base stations near 10, 10 with 5km radius?",
+    "List submarine cables near Marseille",
+    "How is the coverage in downtown Beirut?"
 ]
 
 
-# Create impressive Gradio interface
-with gr.Blocks(
-    theme=gr.themes.Soft(),
-    title="🌍 Advanced MCP Map Assistant",
-    css="""
-    .gradio-container {
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    }
-    .main-header {
-        text-align: center;
-        padding: 20px;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border-radius: 10px;
-        margin-bottom: 20px;
-    }
-    """
-) as demo:
+def build_demo() -> gr.Blocks:
+    """Create the Gradio interface."""
+    with gr.Blocks(
+        theme=gr.themes.Soft(),
+        title="🌍 Advanced MCP Map Assistant",
+        head=MAP_HEAD,
+        css="""
+        .gradio-container {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+        }
+        .main-header {
+            text-align: center;
+            padding: 20px;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        }
+        """
+    ) as demo:
     
-    # Header
-    gr.HTML("""
-    <div class="main-header">
-        <h1>🌍 Advanced MCP Map Assistant</h1>
-        <p>Interactive AI-powered mapping for submarine cables and base station coverage</p>
-    </div>
-    """)
+        # Per-session conversation memory
+        memory_state = gr.State(new_memory())
     
-    with gr.Row():
-        # Left Column - Chat and Input
-        with gr.Column(scale=1):
-            chatbot = gr.Chatbot(
-                label="💬 Conversation",
-                height=400,
-                show_label=True,
-                avatar_images=(None, "🤖")
-            )
-            
-            with gr.Row():
-                user_input = gr.Textbox(
-                    label="Ask your question",
-                    placeholder="e.g., 'Find base stations near 10, 10' or 'Show cables near Japan'",
-                    scale=4,
-                    show_label=False
+        # Per-session layers currently shown on the map, by id
+        map_layers_state = gr.State({})
+    
+        # Header
+        gr.HTML("""
+        <div class="main-header">
+            <h1>🌍 Advanced MCP Map Assistant</h1>
+            <p>Interactive AI-powered mapping for submarine cables and base station coverage</p>
+        </div>
+        """)
+    
+        with gr.Row():
+            # Left Column - Chat and Input
+            with gr.Column(scale=1):
+                chatbot = gr.Chatbot(
+                    label="💬 Conversation",
+                    height=400,
+                    show_label=True,
+                    avatar_images=(None, "🤖")
                 )
-                submit_btn = gr.Button("🚀 Send", scale=1, variant="primary")
             
-            with gr.Row():
-                clear_btn = gr.Button("🗑️ Clear", variant="secondary")
-                examples_btn = gr.Button("💡 Examples", variant="secondary")
+                with gr.Row():
+                    user_input = gr.Textbox(
+                        label="Ask your question",
+                        placeholder="e.g., 'Find base stations near 10, 10' or 'Show cables near Japan'",
+                        scale=4,
+                        show_label=False
+                    )
+                    submit_btn = gr.Button("🚀 Send", scale=1, variant="primary")
+            
+                with gr.Row():
+                    clear_btn = gr.Button("🗑️ Clear", variant="secondary")
+                    gr.Button("💡 Examples", variant="secondary")
             
-            gr.Examples(
-                examples=examples,
-                inputs=user_input,
-                label="💡 Try these examples:"
-            )
+                gr.Examples(
+                    examples=examples,
+                    inputs=user_input,
+                    label="💡 Try these examples:"
+                )
         
-        # Right Column - Map
-        with gr.Column(scale=1):
-            # Default map HTML - always show a map
-            default_map_html = """
-            <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css"/>
-
-            <div id="map" style="height: 600px; width: 100%; border-radius: 8px; border: 2px solid #ddd;"></div>
-
-            <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-
-            <script>
-            window.onload = function () {
-                var map = L.map('map').setView([20, 0], 2);
-                
-                L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
-                    maxZoom: 19,
-                    attribution: '© OpenStreetMap contributors'
-                }).addTo(map);
-
-                L.marker([20, 0]).addTo(map)
-                    .bindPopup("🗺️ Interactive Map<br>Ask a question to see locations, cables, and coverage areas!");
-            }
-            </script>
-            """
-
-            map_display = gr.HTML(
-                value=default_map_html,
-                label="🗺️ Interactive Map Visualization",
-                 elem_id="map_html",
-            )
+            # Right Column - Map
+            with gr.Column(scale=1):
+                # Created once; later answers only send layer changes through map_updates
+                gr.HTML(
+                    value=MAP_CONTAINER_HTML,
+                    label="🗺️ Interactive Map Visualization",
+                    elem_id="map_html",
+                )
+                map_updates = gr.Textbox(visible=False)
             
-            gr.Markdown("""
-            ### 📊 Features:
-            - **📍 Markers**: Base stations and landing points
-            - **🔴 Routes**: Animated cable paths
-            - **🔵 Coverage**: Signal coverage areas
-            - **🔍 Auto-zoom**: Automatically fits to show all results
-            """)
+                gr.Markdown("""
+                ### 📊 Features:
+                - **📍 Markers**: Base stations and landing points
+                - **🔴 Routes**: Animated cable paths
+                - **🔵 Coverage**: Signal coverage areas
+                - **🔍 Auto-zoom**: Pans to new results when they are out of view
+                """)
     
-    # Status bar
-    with gr.Row():
-        status = gr.Markdown("✅ **Status**: Ready to answer your questions!")
+        # Status bar
+        with gr.Row():
+            gr.Markdown("✅ **Status**: Ready to answer your questions!")
     
-    # Event handlers
-    submit_btn.click(
-        fn=process_query,
-        inputs=[user_input, chatbot],
-        outputs=[chatbot, user_input, map_display]
-    )
+        # Event handlers
+        submit_btn.click(
+            fn=process_query,
+            inputs=[user_input, chatbot, memory_state, map_layers_state],
+            outputs=[chatbot, user_input, map_updates, memory_state, map_layers_state]
+        )
     
-    user_input.submit(
-        fn=process_query,
-        inputs=[user_input, chatbot],
-        outputs=[chatbot, user_input, map_display]
-    )
+        user_input.submit(
+            fn=process_query,
+            inputs=[user_input, chatbot, memory_state, map_layers_state],
+            outputs=[chatbot, user_input, map_updates, memory_state, map_layers_state]
+        )
     
-    clear_btn.click(
-        fn=clear_all,
-        inputs=[],
-        outputs=[chatbot, user_input, map_display]
-    )
+        clear_btn.click(
+            fn=clear_all,
+            inputs=[],
+            outputs=[chatbot, user_input, map_updates, memory_state, map_layers_state]
+        )
+    
+        # Apply layer changes in the browser, keeping the map and its view
+        map_updates.change(fn=None, inputs=[map_updates], js="(message) => window.mapApply(message)")
+        demo.load(fn=None, js="() => window.mapInit()")
+
+    return demo
 
 
 if __name__ == "__main__":
-    demo.launch(share=True, server_name="0.0.0.0", inbrowser=True)
+    start_services()
+    build_demo().launch(share=True, server_name="0.0.0.0", inbrowser=True)
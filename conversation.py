@@ -0,0 +1,143 @@
+"""Session memory for multi-turn conversations with the map agent.
+
+Recent turns are replayed verbatim, including the tool results the agent saw.
+Older turns are compacted into one-line summaries, with station lists and
+waypoints reduced to counts and endpoints. The oldest summaries are left out
+of a request once the history no longer fits its token budget, and forgotten
+once they could not fit any request.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from serialization import to_json, from_json
+
+# Rough tokens-per-character ratio for English text and JSON.
+CHARS_PER_TOKEN = 4
+
+# Longest answer text kept for a compacted turn.
+MAX_SUMMARY_CHARS = 400
+
+# Fields that name an item in a list, in order of preference.
+_NAME_FIELDS = ("station_id", "station_name", "cable_name", "to_station")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate, good enough for budgeting history."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def summarize_tool_result(result: Dict[str, Any], max_names: int = 3) -> str:
+    """Reduce a tool result to its scalar fields plus list sizes and endpoints."""
+    parts = []
+    for key, value in result.items():
+        if key == "waypoints" and isinstance(value, list) and value:
+            parts.append(f"waypoints: {len(value)} points from {value[0]} to {value[-1]}")
+        elif isinstance(value, list):
+            names = [
+                str(item[name]) for item in value if isinstance(item, dict)
+                for name in _NAME_FIELDS if name in item
+            ][:max_names]
+            if not names:
+                names = [str(item) for item in value[:max_names] if not isinstance(item, (dict, list))]
+            more = ", ..." if len(value) > len(names) else ""
+            parts.append(f"{key}: {len(value)} items" + (f" ({', '.join(names)}{more})" if names else ""))
+        elif not isinstance(value, dict):
+            parts.append(f"{key}: {value}")
+    return "; ".join(parts)
+
+
+@dataclass(slots=True)
+class Turn:
+    """One user question with the agent's answer and tool results."""
+    user: str
+    answer: str
+    tool_results: List[Dict[str, Any]] = field(default_factory=list)
+
+    def verbatim(self) -> List[Dict[str, str]]:
+        context = "".join(f"\nTool result: {to_json(r)}" for r in self.tool_results)
+        return [
+            {"role": "user", "content": self.user},
+            {"role": "assistant", "content": self.answer + context}
+        ]
+
+    def compacted(self) -> List[Dict[str, str]]:
+        answer = self.answer
+        if len(answer) > MAX_SUMMARY_CHARS:
+            answer = answer[:MAX_SUMMARY_CHARS].rstrip() + " ..."
+        context = "".join(f"\nTool result (summary): {summarize_tool_result(r)}" for r in self.tool_results)
+        return [
+            {"role": "user", "content": self.user},
+            {"role": "assistant", "content": answer + context}
+        ]
+
+
+def extract_tool_results(result: Any) -> List[Dict[str, Any]]:
+    """Decode the JSON tool outputs from a ``Runner.run`` result."""
+    tool_results = []
+    for item in getattr(result, "new_items", None) or []:
+        # Tool outputs are the JSON strings produced by to_json()
+        if getattr(item, "type", None) == "tool_call_output_item":
+            try:
+                content = item.output
+                if isinstance(content, (str, bytes)):
+                    content = from_json(content)
+                if isinstance(content, dict):
+                    tool_results.append(content)
+            except ValueError:
+                # Not JSON (orjson.JSONDecodeError is a ValueError), e.g. a tool error message
+                pass
+    return tool_results
+
+
+def _message_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(m["content"]) for m in messages)
+
+
+class ConversationMemory:
+    """Token-budgeted history that keeps recent turns and compacts older ones."""
+
+    def __init__(self, max_tokens: int = 3000, keep_recent: int = 2):
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.turns: List[Turn] = []
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def add_turn(self, user: str, answer: str, tool_results: List[Dict[str, Any]] = None) -> None:
+        self.turns.append(Turn(user, str(answer), list(tool_results or [])))
+        self._prune()
+
+    def _prune(self) -> None:
+        """Forget turns that cannot fit even when every newer turn is compacted and the message is empty."""
+        total = 0
+        for age, turn in enumerate(reversed(self.turns)):
+            total += _message_tokens(turn.compacted())
+            if total > self.max_tokens:
+                del self.turns[:len(self.turns) - age]
+                return
+
+    def clear(self) -> None:
+        self.turns.clear()
+
+    def build_input(self, message: str) -> List[Dict[str, str]]:
+        """Return the agent input: budgeted history followed by the new message."""
+        new_message = {"role": "user", "content": message}
+        budget = self.max_tokens - estimate_tokens(message)
+
+        # Newest turns first; verbatim while they are recent and fit, else compacted.
+        blocks = []
+        for age, turn in enumerate(reversed(self.turns)):
+            messages = turn.verbatim() if age < self.keep_recent else turn.compacted()
+            cost = _message_tokens(messages)
+            if cost > budget and age < self.keep_recent:
+                messages = turn.compacted()
+                cost = _message_tokens(messages)
+            if cost > budget:
+                # Older turns are left out of this request only; a shorter message may have room for them
+                break
+            blocks.append(messages)
+            budget -= cost
+
+        history = [m for messages in reversed(blocks) for m in messages]
+        return history + [new_message]
@@ -1,12 +1,11 @@
 import os
+from typing import Optional
 from agents import Agent, Runner, function_tool
 from servers.submarine_server import SubmarineCablesServer
 from servers.basestation_server import BaseStationCoverageServer
-from models import (
-    LandingStationResponse, CableRoute, CableLatencyResponse,
-    CableOutageRiskResponse, BaseStationResponse, CoverageStrengthResponse,
-    ProposedStation, HandoverPathResponse
-)
+from servers.geocoder_server import GeocoderServer
+from serialization import to_json
+from conversation import ConversationMemory, extract_tool_results
 
 # Load environment variables from .env file if it exists
 try:
@@ -26,59 +25,98 @@ if not OPENAI_API_KEY:
 
 os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
 
-def build_agent():
-    sub = SubmarineCablesServer()
-    base = BaseStationCoverageServer()
+def build_agent(sub: SubmarineCablesServer = None, base: BaseStationCoverageServer = None,
+                geo: GeocoderServer = None):
+    sub = sub or SubmarineCablesServer()
+    base = base or BaseStationCoverageServer()
+    geo = geo or GeocoderServer()
 
     @function_tool
-    def locate_landing_station(country: str) -> LandingStationResponse:
+    def locate_landing_station(country: str) -> str:
         """Return landing stations associated with a country."""
-        return sub._locate_landing_station_impl(country)
+        return to_json(sub._locate_landing_station_impl(country))
     
     @function_tool
-    def cable_route_between(country_a: str, country_b: str) -> CableRoute:
+    def cable_route_between(country_a: str, country_b: str) -> str:
         """Return approximate cable path between two countries."""
-        return sub._cable_route_between_impl(country_a, country_b)
+        return to_json(sub._cable_route_between_impl(country_a, country_b))
     
     @function_tool
-    def list_cables_near(lat: float, lon: float, radius_km: float) -> list:
-        """List submarine cables near a given location."""
-        return sub._list_cables_near_impl(lat, lon, radius_km)
+    def list_cables_near(lat: Optional[float], lon: Optional[float], radius_km: float, place: Optional[str] = None) -> str:
+        """List submarine cables near a location, given as lat/lon or as a place name."""
+        lat, lon = geo.locate(lat, lon, place)
+        return to_json(sub._list_cables_near_impl(lat, lon, radius_km))
     
     @function_tool
-    def cable_latency_estimate(country_a: str, country_b: str) -> CableLatencyResponse:
+    def cable_latency_estimate(country_a: str, country_b: str) -> str:
         """Estimate latency of cable route between countries."""
-        return sub._cable_latency_estimate_impl(country_a, country_b)
+        return to_json(sub._cable_latency_estimate_impl(country_a, country_b))
     
     @function_tool
-    def cable_outage_risk(lat: float, lon: float) -> CableOutageRiskResponse:
-        """Return outage risk score for an ocean coordinate."""
-        return sub._cable_outage_risk_impl(lat, lon)
+    def cable_outage_risk(lat: Optional[float], lon: Optional[float], place: Optional[str] = None) -> str:
+        """Return outage risk score for a coordinate or a named place."""
+        lat, lon = geo.locate(lat, lon, place)
+        return to_json(sub._cable_outage_risk_impl(lat, lon))
     
     @function_tool
-    def nearest_basestations(lat: float, lon: float, radius_km: float) -> BaseStationResponse:
-        """Return nearby base stations."""
-        return base._nearest_basestations_impl(lat, lon, radius_km)
+    def nearest_basestations(lat: Optional[float], lon: Optional[float], radius_km: float, place: Optional[str] = None) -> str:
+        """Return nearby base stations around lat/lon or a place name."""
+        lat, lon = geo.locate(lat, lon, place)
+        return to_json(base._nearest_basestations_impl(lat, lon, radius_km))
     
     @function_tool
-    def coverage_strength_at(lat: float, lon: float) -> CoverageStrengthResponse:
-        """Return estimated signal strength."""
-        return base._coverage_strength_at_impl(lat, lon)
+    def coverage_strength_at(lat: Optional[float], lon: Optional[float], place: Optional[str] = None) -> str:
+        """Return estimated signal strength at lat/lon or a place name."""
+        lat, lon = geo.locate(lat, lon, place)
+        return to_json(base._coverage_strength_at_impl(lat, lon))
     
     @function_tool
-    def propose_new_station(lat: float, lon: float, required_radius: float) -> ProposedStation:
-        """Suggest a new base station location."""
-        return base._propose_new_station_impl(lat, lon, required_radius)
+    def propose_new_station(lat: Optional[float], lon: Optional[float], required_radius: float, place: Optional[str] = None) -> str:
+        """Suggest a new base station location near lat/lon or a place name."""
+        lat, lon = geo.locate(lat, lon, place)
+        return to_json(base._propose_new_station_impl(lat, lon, required_radius))
     
     @function_tool
-    def stations_with_capacity(min_capacity: int) -> BaseStationResponse:
+    def stations_with_capacity(min_capacity: int) -> str:
         """Return stations meeting minimum capacity."""
-        return base._stations_with_capacity_impl(min_capacity)
+        return to_json(base._stations_with_capacity_impl(min_capacity))
     
     @function_tool
-    def handover_path(start_lat: float, start_lon: float, end_lat: float, end_lon: float) -> HandoverPathResponse:
-        """Simulate mobile station handover along a route."""
-        return base._handover_path_impl(start_lat, start_lon, end_lat, end_lon)
+    def handover_path(start_lat: Optional[float], start_lon: Optional[float], end_lat: Optional[float], end_lon: Optional[float],
+                      start_place: Optional[str] = None, end_place: Optional[str] = None) -> str:
+        """Simulate mobile station handover along a route between coordinates or place names."""
+        start_lat, start_lon = geo.locate(start_lat, start_lon, start_place)
+        end_lat, end_lon = geo.locate(end_lat, end_lon, end_place)
+        return to_json(base._handover_path_impl(start_lat, start_lon, end_lat, end_lon))
+    
+    @function_tool
+    def coverage_gaps(min_lat: Optional[float], min_lon: Optional[float], max_lat: Optional[float], max_lon: Optional[float],
+                      threshold_dbm: float = -100.0, place: Optional[str] = None) -> str:
+        """Find areas inside a bounding box, or around a named place, where the best signal is below a threshold."""
+        min_lat, min_lon, max_lat, max_lon = geo.bounding_box(min_lat, min_lon, max_lat, max_lon, place)
+        return to_json(base._coverage_gaps_impl(min_lat, min_lon, max_lat, max_lon, threshold_dbm))
+
+    @function_tool
+    def simulate_network_load(min_lat: Optional[float], min_lon: Optional[float], max_lat: Optional[float], max_lon: Optional[float],
+                              mobiles: int = 10000, duration_minutes: float = 60.0, place: Optional[str] = None) -> str:
+        """Simulate many mobiles moving through a bounding box, or around a named place, and report per-station load, blocked attaches and handovers."""
+        min_lat, min_lon, max_lat, max_lon = geo.bounding_box(min_lat, min_lon, max_lat, max_lon, place)
+        return to_json(base._simulate_network_load_impl(min_lat, min_lon, max_lat, max_lon, mobiles, duration_minutes))
+
+    @function_tool
+    def cable_resilience(country_a: str, country_b: str, scenarios: int = 100000) -> str:
+        """Estimate how likely random cable cuts disconnect two countries, and the latency impact when they stay connected."""
+        return to_json(sub._cable_resilience_impl(country_a, country_b, scenarios))
+
+    @function_tool
+    def disjoint_cable_paths(country_a: str, country_b: str, k: int = 3) -> str:
+        """Return cable paths between two countries that share no cable, and the fewest cables whose loss disconnects them."""
+        return to_json(sub._disjoint_cable_paths_impl(country_a, country_b, k))
+
+    @function_tool
+    def geocode(place: str, limit: int = 5) -> str:
+        """Look up a place name in the offline gazetteer and return matching places with coordinates, best first."""
+        return to_json(geo._geocode_impl(place, limit))
 
     tools = [
         locate_landing_station,
@@ -90,7 +128,12 @@ def build_agent():
         coverage_strength_at,
         propose_new_station,
         stations_with_capacity,
-        handover_path
+        handover_path,
+        coverage_gaps,
+        simulate_network_load,
+        cable_resilience,
+        disjoint_cable_paths,
+        geocode
     ]
 
     agent = Agent(
@@ -104,6 +147,10 @@ def build_agent():
 
 async def interactive_mode():
     agent = build_agent()
+    memory = ConversationMemory(
+        max_tokens=int(os.getenv("CONVERSATION_MAX_TOKENS", "3000")),
+        keep_recent=int(os.getenv("CONVERSATION_KEEP_RECENT", "2"))
+    )
 
     print("Map Assistant ready. Type a question or 'quit' to exit.")
 
@@ -114,7 +161,8 @@ async def interactive_mode():
             print("Goodbye.")
             break
 
-        result = await Runner.run(agent, input=user_input)
+        result = await Runner.run(agent, input=memory.build_input(user_input))
+        memory.add_turn(user_input, result.final_output, extract_tool_results(result))
         print("\nAssistant:", result.final_output)
 
 
@@ -0,0 +1,289 @@
+"""Map layers for the web UI, sent to the browser as incremental updates.
+
+The Leaflet map is created once per page. For each answer, the server extracts
+the answer's layers (points, lines, circles and polygons), each keyed by a
+stable id. It diffs them against the layers already on the client and sends
+only the difference as one compact JSON message:
+
+    {"seq": 3, "add": [...], "update": [...], "remove": ["id", ...]}
+
+A message with ``"clear": true`` removes everything. The client never resets
+the view. It pans to the new layers only when none of them is already visible,
+so the user's pan and zoom are kept.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from serialization import to_json
+
+# Decimal places kept for coordinates sent to the browser (~1 m)
+COORD_DECIMALS = 5
+
+# Coordinates parsed out of the answer text are capped at this many matches
+MAX_TEXT_MATCHES = 20
+
+# Text coordinates this close (in degrees) to an existing point are not repeated
+TEXT_DEDUP_DEG = 0.01
+
+# (lat, lon) or [lat, lon]
+_PAIR_PATTERN = re.compile(r'[\[\(]?\s*([+-]?\d+\.?\d+)\s*[,]\s*([+-]?\d+\.?\d+)\s*[\]\)]?')
+# "lat: X, lon: Y" or "latitude: X, longitude: Y"
+_NAMED_PATTERN = re.compile(
+    r'(?:lat|latitude)[:\s]+([+-]?\d+\.?\d+).*?(?:lon|lng|longitude)[:\s]+([+-]?\d+\.?\d+)', re.IGNORECASE
+)
+# Bare number pairs that look like coordinates
+_BARE_PATTERN = re.compile(r'\b(\d{1,2}\.\d+)[,\s]+(\d{1,3}\.\d+)\b')
+
+Layers = Dict[str, Dict[str, Any]]
+
+
+def _coord(value) -> float:
+    return round(float(value), COORD_DECIMALS)
+
+
+def _key(lat: float, lon: float) -> str:
+    return f"{lat},{lon}"
+
+
+class _LayerSet:
+    """Collects layers in insertion order; the first layer with a given id wins."""
+
+    def __init__(self):
+        self.layers: Layers = {}
+
+    def add(self, layer_id: str, layer: Dict[str, Any]) -> None:
+        if layer_id not in self.layers:
+            self.layers[layer_id] = {"id": layer_id, **layer}
+
+    def point(self, lat, lon, label: str, layer_id: str = None) -> None:
+        lat, lon = _coord(lat), _coord(lon)
+        self.add(layer_id or f"point:{_key(lat, lon)}", {"type": "point", "lat": lat, "lon": lon, "label": label})
+
+    def circle(self, lat, lon, radius_km) -> None:
+        lat, lon = _coord(lat), _coord(lon)
+        self.add(f"circle:{_key(lat, lon)}",
+                 {"type": "circle", "lat": lat, "lon": lon, "radius_km": float(radius_km)})
+
+    def points(self) -> Iterable[Dict[str, Any]]:
+        return (layer for layer in self.layers.values() if layer["type"] == "point")
+
+
+def extract_layers(agent_output: str, tool_results: Optional[List[Dict[str, Any]]] = None) -> Layers:
+    """Layers for one answer, keyed by stable id, from its tool results and text."""
+    layers = _LayerSet()
+
+    for result in tool_results or []:
+        if not isinstance(result, dict):
+            continue
+
+        # Base stations and landing stations
+        for station in result.get("stations", []):
+            if isinstance(station, dict) and "lat" in station and "lon" in station:
+                if "station_id" in station:
+                    layers.point(station["lat"], station["lon"], f"📡 {station['station_id']}",
+                                 f"station:{station['station_id']}")
+                else:
+                    name = station.get("station_name", "Landing Station")
+                    layers.point(station["lat"], station["lon"], f"🌐 {name}", f"landing:{name}")
+                if "coverage_radius_km" in station:
+                    layers.circle(station["lat"], station["lon"], station["coverage_radius_km"])
+
+        # Cable routes
+        if "waypoints" in result:
+            coords = [[_coord(c[0]), _coord(c[1])] for c in result["waypoints"]
+                      if isinstance(c, (list, tuple)) and len(c) >= 2]
+            if coords:
+                name = result.get("cable_name")
+                layer_id = f"line:{name}" if name else f"line:{_key(*coords[0])}:{_key(*coords[-1])}"
+                layers.add(layer_id, {"type": "line", "coords": coords, "color": "#e74c3c"})
+
+        # Handover events
+        for event in result.get("handover_events", []):
+            if isinstance(event, dict) and "lat" in event and "lon" in event:
+                layers.point(event["lat"], event["lon"],
+                             f"🔁 {event.get('from_station')} → {event.get('to_station')}")
+
+        # Coverage gaps
+        for gap in result.get("gaps", []):
+            if isinstance(gap, dict) and gap.get("polygon"):
+                label = f"⚠️ No coverage: {gap.get('area_km2')} km²"
+                lat, lon = _coord(gap["centroid_lat"]), _coord(gap["centroid_lon"])
+                rings = [[[_coord(c[0]), _coord(c[1])] for c in ring] for ring in gap["polygon"]]
+                layers.add(f"gap:{_key(lat, lon)}", {"type": "polygon", "rings": rings, "label": label})
+                layers.point(lat, lon, label)
+
+        # Simulated station load
+        for station in result.get("busiest_stations", []):
+            if isinstance(station, dict) and "lat" in station and "lon" in station:
+                layers.point(station["lat"], station["lon"],
+                             f"📶 {station['station_id']}: peak {station.get('peak_load')}/{station.get('capacity')}",
+                             f"station:{station['station_id']}")
+
+        # Geocoded places
+        for place in result.get("places", []):
+            if isinstance(place, dict) and "lat" in place and "lon" in place:
+                layers.point(place["lat"], place["lon"], f"📍 {place.get('name')}, {place.get('country')}")
+
+        # Single locations, with a coverage area when a radius is given
+        if "lat" in result and "lon" in result:
+            layers.point(result["lat"], result["lon"], "📍 Location")
+            radius = result.get("radius_km", result.get("estimated_coverage_radius_km"))
+            if radius is not None:
+                layers.circle(result["lat"], result["lon"], radius)
+
+    # Coordinates mentioned in the answer text
+    text = str(agent_output)
+    matches = _PAIR_PATTERN.findall(text) + _NAMED_PATTERN.findall(text) + _BARE_PATTERN.findall(text)
+    for match in matches[:MAX_TEXT_MATCHES]:
+        lat, lon = float(match[0]), float(match[1])
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            continue
+        if not any(abs(p["lat"] - lat) < TEXT_DEDUP_DEG and abs(p["lon"] - lon) < TEXT_DEDUP_DEG
+                   for p in layers.points()):
+            layers.point(lat, lon, f"📍 ({lat:.2f}, {lon:.2f})")
+
+    return layers.layers
+
+
+def diff_layers(previous: Layers, current: Layers) -> Dict[str, Any]:
+    """Changes that turn the client's ``previous`` layers into ``current``; empty keys are omitted."""
+    diff = {}
+    add = [layer for layer_id, layer in current.items() if layer_id not in previous]
+    update = [layer for layer_id, layer in current.items()
+              if layer_id in previous and previous[layer_id] != layer]
+    remove = [layer_id for layer_id in previous if layer_id not in current]
+    if add:
+        diff["add"] = add
+    if update:
+        diff["update"] = update
+    if remove:
+        diff["remove"] = remove
+    return diff
+
+
+def map_update(seq: int, previous: Layers, current: Layers) -> str:
+    """The JSON message for update ``seq``; the sequence number makes every message distinct."""
+    return to_json({"seq": seq, **diff_layers(previous, current)})
+
+
+def map_clear(seq: int) -> str:
+    """The JSON message that removes every layer."""
+    return to_json({"seq": seq, "clear": True})
+
+
+# The map container; rendered once and never replaced
+MAP_CONTAINER_HTML = """
+<div id="map" style="height: 600px; width: 100%; border-radius: 8px; border: 2px solid #ddd;"></div>
+"""
+
+# Loaded once in the page <head>: Leaflet plus the client that applies updates
+MAP_HEAD = """
+<link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css"/>
+<script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+<script>
+(function () {
+    var map = null;
+    var layers = {};
+    var pending = [];
+
+    function popup(text) {
+        var node = document.createElement("div");
+        node.textContent = text;
+        return node;
+    }
+
+    function animateLine(polyline, coords) {
+        var index = 0;
+        function drawSegment() {
+            if (index < coords.length && polyline._map) {
+                polyline.addLatLng(coords[index]);
+                index++;
+                setTimeout(drawSegment, 100);
+            }
+        }
+        drawSegment();
+    }
+
+    function build(f) {
+        switch (f.type) {
+            case "point":
+                return L.marker([f.lat, f.lon]).bindPopup(popup(f.label));
+            case "line":
+                var line = L.polyline([], {color: f.color, weight: 4, opacity: 0.8});
+                line.on("add", function () { animateLine(line, f.coords); });
+                return line;
+            case "circle":
+                return L.circle([f.lat, f.lon], {
+                    radius: f.radius_km * 1000, color: "#3498db", fillColor: "#3498db", fillOpacity: 0.2, weight: 2
+                }).bindPopup(popup("Coverage: " + f.radius_km + "km"));
+            case "polygon":
+                return L.polygon(f.rings, {
+                    color: "#e67e22", fillColor: "#e67e22", fillOpacity: 0.35, weight: 1
+                }).bindPopup(popup(f.label));
+        }
+        return null;
+    }
+
+    function bounds(f) {
+        if (f.type === "line") return L.latLngBounds(f.coords);
+        if (f.type === "polygon") return L.polygon(f.rings).getBounds();
+        return L.latLngBounds([[f.lat, f.lon]]);
+    }
+
+    function remove(id) {
+        if (layers[id]) {
+            map.removeLayer(layers[id]);
+            delete layers[id];
+        }
+    }
+
+    function apply(msg) {
+        if (msg.clear) {
+            Object.keys(layers).forEach(remove);
+            return;
+        }
+        (msg.remove || []).forEach(remove);
+        var added = (msg.add || []).concat(msg.update || []);
+        added.forEach(function (f) {
+            remove(f.id);
+            var layer = build(f);
+            if (layer) {
+                layers[f.id] = layer.addTo(map);
+            }
+        });
+        // Keep the user's view unless none of the new layers is visible in it
+        if (msg.add && msg.add.length) {
+            var view = map.getBounds();
+            var area = bounds(msg.add[0]);
+            msg.add.forEach(function (f) { area.extend(bounds(f)); });
+            var visible = msg.add.some(function (f) { return view.intersects(bounds(f)); });
+            if (!visible) {
+                map.fitBounds(area, {maxZoom: 12});
+            }
+        }
+    }
+
+    window.mapInit = function () {
+        var node = document.getElementById("map");
+        if (map || !node || !window.L) return;
+        map = L.map(node).setView([20, 0], 2);
+        L.tileLayer("https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png", {
+            maxZoom: 19,
+            attribution: "© OpenStreetMap contributors"
+        }).addTo(map);
+        pending.splice(0).forEach(apply);
+    };
+
+    window.mapApply = function (message) {
+        if (!message) return;
+        var msg = typeof message === "string" ? JSON.parse(message) : message;
+        window.mapInit();
+        if (map) {
+            apply(msg);
+        } else {
+            pending.push(msg);
+        }
+    };
+})();
+</script>
+"""
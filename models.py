@@ -1,11 +1,13 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional
+
+import numpy as np
 
 # ============================================================================
 # SUBMARINE CABLES MODELS
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class LandingStation:
     """A submarine cable landing station."""
     country: str
@@ -13,22 +15,38 @@ class LandingStation:
     lon: float
     station_name: str
 
-@dataclass
+@dataclass(slots=True)
 class LandingStationResponse:
     """Response for landing station queries."""
     stations: List[LandingStation]
     count: int
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class CableRoute:
-    """A submarine cable route between countries."""
+    """A submarine cable route between countries.
+
+    ``waypoints`` is stored as a contiguous ``(N, 2)`` float64 array of
+    ``(lat, lon)`` rows; any sequence of pairs is accepted on construction.
+    """
     country_a: str
     country_b: str
-    waypoints: List[Tuple[float, float]]
+    waypoints: np.ndarray
     distance_km: float
     cable_name: str
 
-@dataclass
+    def __post_init__(self):
+        self.waypoints = np.ascontiguousarray(self.waypoints, dtype=np.float64).reshape(-1, 2)
+
+@dataclass(slots=True)
+class NearbyCablesResponse:
+    """Cables passing within a radius of a location."""
+    lat: float
+    lon: float
+    radius_km: float
+    cables: List[str]
+    count: int
+
+@dataclass(slots=True)
 class CableLatencyResponse:
     """Latency estimate for a cable route."""
     country_a: str
@@ -36,7 +54,7 @@ class CableLatencyResponse:
     estimated_latency_ms: float
     distance_km: float
 
-@dataclass
+@dataclass(slots=True)
 class CableOutageRiskResponse:
     """Outage risk assessment for a location."""
     lat: float
@@ -49,7 +67,7 @@ class CableOutageRiskResponse:
 # BASE STATION MODELS
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class BaseStation:
     """A cellular base station."""
     station_id: str
@@ -59,13 +77,13 @@ class BaseStation:
     capacity: int
     signal_strength_dbm: float
 
-@dataclass
+@dataclass(slots=True)
 class BaseStationResponse:
     """Response for base station queries."""
     stations: List[BaseStation]
     count: int
 
-@dataclass
+@dataclass(slots=True)
 class CoverageStrengthResponse:
     """Signal strength at a specific location."""
     lat: float
@@ -74,7 +92,7 @@ class CoverageStrengthResponse:
     nearest_station: str
     distance_to_station_km: float
 
-@dataclass
+@dataclass(slots=True)
 class ProposedStation:
     """A proposed new base station location."""
     lat: float
@@ -83,7 +101,7 @@ class ProposedStation:
     reason: str
     expected_improvement: str
 
-@dataclass
+@dataclass(slots=True)
 class HandoverEvent:
     """A handover event during mobile movement."""
     timestamp: int
@@ -93,7 +111,7 @@ class HandoverEvent:
     to_station: str
     signal_quality: str
 
-@dataclass
+@dataclass(slots=True)
 class HandoverPathResponse:
     """Response for handover simulation."""
     start_lat: float
@@ -101,4 +119,131 @@ class HandoverPathResponse:
     end_lat: float
     end_lon: float
     handover_events: List[HandoverEvent]
-    total_handovers: int
\ No newline at end of file
+    total_handovers: int
+
+@dataclass(slots=True, eq=False)
+class CoverageGap:
+    """A connected area where the best-server signal is below a threshold.
+
+    ``polygon`` is a list of rings, each an ``(N, 2)`` array of ``(lat, lon)``
+    rows: the outer boundary first, then any covered holes inside it.
+    """
+    polygon: List[np.ndarray]
+    area_km2: float
+    centroid_lat: float
+    centroid_lon: float
+    min_signal_dbm: float
+    mean_signal_dbm: float
+
+@dataclass(slots=True)
+class CoverageGapsResponse:
+    """Uncovered areas inside a bounding box.
+
+    ``count`` is the number of gaps found; ``gaps`` holds the largest of them.
+    """
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+    threshold_dbm: float
+    resolution_km: float
+    total_area_km2: float
+    uncovered_area_km2: float
+    uncovered_fraction: float
+    gaps: List[CoverageGap]
+    count: int
+
+@dataclass(slots=True)
+class CableResilienceResponse:
+    """Monte Carlo cable-cut analysis between two countries.
+
+    Latency statistics cover only the scenarios that stay connected; they are
+    ``None`` when every scenario disconnects.
+    """
+    country_a: str
+    country_b: str
+    scenarios: int
+    disconnection_probability: float
+    baseline_latency_ms: float
+    mean_latency_ms: Optional[float]
+    p50_latency_ms: Optional[float]
+    p90_latency_ms: Optional[float]
+    p99_latency_ms: Optional[float]
+    mean_degradation_ms: Optional[float]
+
+@dataclass(slots=True)
+class CablePath:
+    """One path through the cable network."""
+    countries: List[str]
+    cables: List[str]
+    distance_km: float
+    latency_ms: float
+
+@dataclass(slots=True)
+class DisjointCablePathsResponse:
+    """Edge-disjoint cable paths and the minimum set of cables whose loss disconnects two countries."""
+    country_a: str
+    country_b: str
+    paths: List[CablePath]
+    count: int
+    min_cut_cables: List[str]
+    min_cut_size: int
+
+@dataclass(slots=True)
+class StationLoad:
+    """Simulated load on one base station."""
+    station_id: str
+    lat: float
+    lon: float
+    capacity: int
+    peak_load: int
+    mean_load: float
+    peak_utilization: float
+    blocked_attaches: int
+    handovers_in: int
+
+@dataclass(slots=True)
+class LoadSimulationResponse:
+    """Summary of a multi-mobile load simulation over a bounding box.
+
+    Per-tick time series are written as CSV files under ``metrics_dir``.
+    """
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+    mobiles: int
+    duration_s: float
+    tick_s: float
+    session_attempts: int
+    blocked_attaches: int
+    blocking_probability: float
+    no_coverage: int
+    handovers: int
+    handovers_per_mobile_hour: float
+    failed_handovers: int
+    dropped_sessions: int
+    overloaded_stations: int
+    busiest_stations: List[StationLoad]
+    metrics_dir: str
+
+# ============================================================================
+# GEOCODING MODELS
+# ============================================================================
+
+@dataclass(slots=True)
+class Place:
+    """A named place from the offline gazetteer."""
+    name: str
+    country: str
+    admin1: str
+    lat: float
+    lon: float
+    population: int
+
+@dataclass(slots=True)
+class GeocodeResponse:
+    """Gazetteer matches for a place name, best first."""
+    query: str
+    places: List[Place]
+    count: int
@@ -0,0 +1,26 @@
+"""Fast JSON encoding for tool responses.
+
+Tool responses are slotted dataclasses from ``models.py`` that may carry NumPy
+arrays (e.g. ``CableRoute.waypoints``). ``orjson`` serializes both natively,
+without building an intermediate ``dict`` or list-of-tuples first.
+"""
+from typing import Any
+
+import orjson
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def to_json_bytes(obj: Any) -> bytes:
+    """Encode a response model (or any JSON-compatible value) to UTF-8 bytes."""
+    return orjson.dumps(obj, option=_OPTIONS)
+
+
+def to_json(obj: Any) -> str:
+    """Encode a response model to a JSON string, as returned to the agent."""
+    return to_json_bytes(obj).decode("utf-8")
+
+
+def from_json(data: Any) -> Any:
+    """Decode a JSON string or bytes produced by ``to_json``."""
+    return orjson.loads(data)
@@ -1,79 +1,432 @@
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
 from agents import function_tool
-from typing import Dict, Any, List
+from models import (
+    BaseStationResponse, CoverageStrengthResponse,
+    ProposedStation, HandoverEvent, HandoverPathResponse, CoverageGap, CoverageGapsResponse,
+    StationLoad, LoadSimulationResponse
+)
+from servers.datasets import BASE_STATIONS_PATH, BaseStationSnapshot, DatasetManager, load_base_stations
+from servers.geodesy import (
+    EARTH_RADIUS_KM, KM_PER_DEGREE_LAT, destination, haversine_km, initial_bearing_deg, interpolate
+)
+from servers.mobility import MIN_ATTACH_DBM, TICK_SECONDS, LoadSimulation, RandomWaypoint
+from servers.propagation import NO_SIGNAL_DBM, MIN_DISTANCE_KM, PATH_LOSS_DB_PER_DECADE, received_signal_dbm
+from servers.raster import label_regions, trace_rings, signed_area
+from servers.sharding import ShardedStationIndex
+
+# Number of points sampled along a handover path
+HANDOVER_SAMPLES = 100
+
+# Coverage-gap grid: finest cell size, longest grid side, and (point, station) pairs evaluated per batch
+GAP_MIN_RESOLUTION_KM = 0.05
+GAP_MAX_CELLS_PER_SIDE = 400
+GAP_CHUNK_ELEMENTS = 1 << 20
+GAP_MAX_POLYGONS = 50
+
+# Load simulation limits, output location, runs kept there, and how many stations the summary lists
+SIMULATION_MAX_MOBILES = 100000
+SIMULATION_MAX_MINUTES = 24 * 60
+SIMULATION_DIR = Path(".cache/simulations")
+SIMULATION_KEEP_RUNS = 20
+SIMULATION_TOP_STATIONS = 10
+
+
+def signal_quality(dbm: float) -> str:
+    if dbm >= -70:
+        return "excellent"
+    if dbm >= -85:
+        return "good"
+    if dbm >= -100:
+        return "fair"
+    return "poor"
+
+
+def best_server(snapshot: BaseStationSnapshot, lats, lons):
+    """Return ``(station_index, received_dbm, distance_km)`` of the strongest station per point."""
+    lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+    lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+    if len(snapshot) == 0:
+        return np.full(lats.shape, -1), np.full(lats.shape, NO_SIGNAL_DBM), np.full(lats.shape, np.inf)
+    distances = haversine_km(lats[:, None], lons[:, None], snapshot.lat[None, :], snapshot.lon[None, :])
+    dbm = received_signal_dbm(snapshot.signal_strength_dbm[None, :], distances)
+    best = np.argmax(dbm, axis=1)
+    rows = np.arange(len(lats))
+    return best, dbm[rows, best], distances[rows, best]
+
+
+def max_signal_grid(snapshot: BaseStationSnapshot, lats: np.ndarray, lons: np.ndarray,
+                    threshold_dbm: float) -> np.ndarray:
+    """Best-server received power at each ``(lats[i], lons[j])`` grid point, shape ``(len(lats), len(lons))``.
+
+    Only stations that could reach ``threshold_dbm`` somewhere in the grid are
+    evaluated. The haversine terms are separable over grid rows and columns,
+    so no trigonometry runs per cell. Path loss is compared as
+    ``10**(dbm / k) / d**2`` (with ``k`` half the loss per decade), which takes
+    one logarithm per cell instead of one per cell and station.
+    """
+    result = np.full((len(lats), len(lons)), NO_SIGNAL_DBM)
+    if len(snapshot) == 0:
+        return result
+    reach_km = 10 ** ((snapshot.signal_strength_dbm - threshold_dbm) / PATH_LOSS_DB_PER_DECADE)
+    center_lat, center_lon = (lats[0] + lats[-1]) / 2, (lons[0] + lons[-1]) / 2
+    half_diagonal = haversine_km(lats[0], lons[0], lats[-1], lons[-1]) / 2
+    relevant = haversine_km(center_lat, center_lon, snapshot.lat, snapshot.lon) <= half_diagonal + reach_km
+    if not relevant.any():
+        return result
+
+    k = PATH_LOSS_DB_PER_DECADE / 2
+    weight = 10 ** (snapshot.signal_strength_dbm[relevant] / k)
+    phi_rows, phi_stations = np.radians(lats), np.radians(snapshot.lat[relevant])
+    sin2_dlat = np.sin((phi_rows[:, None] - phi_stations[None, :]) / 2) ** 2
+    sin2_dlon = np.sin((np.radians(lons)[:, None] - np.radians(snapshot.lon[relevant])[None, :]) / 2) ** 2
+    cos_cos = np.cos(phi_rows)[:, None] * np.cos(phi_stations)[None, :]
+    min_a = np.sin(MIN_DISTANCE_KM / (2 * EARTH_RADIUS_KM)) ** 2
+
+    # Batch over rows and stations so each temporary holds at most GAP_CHUNK_ELEMENTS values
+    n_stations = len(weight)
+    station_step = max(1, min(n_stations, GAP_CHUNK_ELEMENTS // len(lons)))
+    row_step = max(1, GAP_CHUNK_ELEMENTS // (len(lons) * station_step))
+    for r0 in range(0, len(lats), row_step):
+        rows = slice(r0, r0 + row_step)
+        best = np.zeros((len(lats[rows]), len(lons)))
+        for s0 in range(0, n_stations, station_step):
+            stations = slice(s0, s0 + station_step)
+            a = sin2_dlat[rows, None, stations] + cos_cos[rows, None, stations] * sin2_dlon[None, :, stations]
+            np.maximum(a, min_a, out=a)
+            # a -> (d / 2R)**2, then weight / that
+            np.sqrt(a, out=a)
+            np.arcsin(a, out=a)
+            np.square(a, out=a)
+            np.divide(weight[stations], a, out=a)
+            np.maximum(best, a.max(axis=2), out=best)
+        result[rows] = k * np.log10(best / (2 * EARTH_RADIUS_KM) ** 2)
+    return result
+
+
+def prune_runs(directory: Path, keep: int) -> None:
+    """Delete all but the ``keep`` most recently modified run directories under ``directory``."""
+    if not directory.is_dir():
+        return
+    runs = sorted((path for path in directory.iterdir() if path.is_dir()),
+                  key=lambda path: (path.stat().st_mtime, path.name), reverse=True)
+    for path in runs[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
 
 class BaseStationCoverageServer:
 
-    def _nearest_basestations_impl(self, lat: float, lon: float, radius_km: float) -> Dict[str, Any]:
+    def __init__(self, datasets: DatasetManager[BaseStationSnapshot] = None,
+                 shard_workers: int = 0, shard_tile_deg: float = 1.0, simulation_dir: Path = SIMULATION_DIR):
+        """Serve from ``datasets``; with ``shard_workers`` > 0, queries run on that many worker processes.
+
+        ``datasets`` may hold a ``BaseStationSnapshot`` or a tiled dataset
+        (``servers.tiles``); sharding needs the former.
+        """
+        self.datasets = datasets or DatasetManager(BASE_STATIONS_PATH, load_base_stations)
+        if shard_workers and not isinstance(self.datasets.snapshot, BaseStationSnapshot):
+            raise ValueError("Sharded queries need an in-memory dataset, not a tiled one")
+        self.simulation_dir = Path(simulation_dir)
+        self.shard_workers = shard_workers
+        self.shard_tile_deg = shard_tile_deg
+        self._sharded = None
+        self._sharded_lock = threading.Lock()
+
+    @property
+    def dataset_version(self) -> str:
+        return self.datasets.version
+
+    def close(self) -> None:
+        """Shut down shard workers, if any."""
+        with self._sharded_lock:
+            if self._sharded is not None:
+                self._sharded.close()
+                self._sharded = None
+
+    def _sharded_index(self, snapshot: BaseStationSnapshot):
+        """The sharded index for ``snapshot``, rebuilt when the dataset version changes."""
+        if not self.shard_workers or len(snapshot) == 0:
+            return None
+        with self._sharded_lock:
+            if self._sharded is None or self._sharded.version != snapshot.version:
+                # The old index shuts down once in-flight queries release it
+                self._sharded = ShardedStationIndex(snapshot, self.shard_workers, self.shard_tile_deg)
+            return self._sharded
+
+    def _box_region(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                    min_dbm: float) -> BaseStationSnapshot:
+        """Stations, including every one that can deliver ``min_dbm`` somewhere inside the box."""
+        data = self.datasets.snapshot
+        reach_km = 10 ** ((data.max_signal_dbm - min_dbm) / PATH_LOSS_DB_PER_DECADE)
+        half_diagonal = haversine_km(min_lat, min_lon, max_lat, max_lon) / 2
+        return data.region((min_lat + max_lat) / 2, (min_lon + max_lon) / 2, half_diagonal + reach_km)
+
+    def _within(self, snapshot: BaseStationSnapshot, lat: float, lon: float, radius_km: float):
+        sharded = self._sharded_index(snapshot)
+        if sharded is not None:
+            return sharded.within(lat, lon, radius_km)
+        return snapshot.within(lat, lon, radius_km)
+
+    def _best_server(self, snapshot: BaseStationSnapshot, lats, lons):
+        sharded = self._sharded_index(snapshot)
+        if sharded is not None:
+            return sharded.best_server(np.atleast_1d(lats), np.atleast_1d(lons))
+        return best_server(snapshot, lats, lons)
+
+    def _nearest_basestations_impl(self, lat: float, lon: float, radius_km: float) -> BaseStationResponse:
         """Return nearby base stations."""
-        return {
-            "center": (lat, lon),
-            "radius_km": radius_km,
-            "stations": [
-                {"id": "BTS001", "lat": lat + 0.01, "lon": lon + 0.01},
-                {"id": "BTS002", "lat": lat - 0.02, "lon": lon + 0.03}
-            ]
-        }
+        snapshot = self.datasets.snapshot.region(lat, lon, radius_km)
+        indices, _ = self._within(snapshot, lat, lon, radius_km)
+        stations = [snapshot.stations[i] for i in indices]
+        return BaseStationResponse(stations=stations, count=len(stations))
 
     @function_tool
-    def nearest_basestations(self, lat: float, lon: float, radius_km: float) -> Dict[str, Any]:
+    def nearest_basestations(self, lat: float, lon: float, radius_km: float) -> BaseStationResponse:
         """Return nearby base stations."""
         return self._nearest_basestations_impl(lat, lon, radius_km)
 
-    def _coverage_strength_at_impl(self, lat: float, lon: float) -> Dict[str, Any]:
+    def _coverage_strength_at_impl(self, lat: float, lon: float) -> CoverageStrengthResponse:
         """Return estimated signal strength."""
-        return {
-            "location": (lat, lon),
-            "signal_strength": "strong",
-            "quality_score": 0.89
-        }
+        snapshot = self.datasets.snapshot.serving_region(lat, lon)
+        best, dbm, distance = self._best_server(snapshot, lat, lon)
+        if best[0] < 0:
+            return CoverageStrengthResponse(lat=lat, lon=lon, signal_strength_dbm=NO_SIGNAL_DBM,
+                                            nearest_station="", distance_to_station_km=-1.0)
+        return CoverageStrengthResponse(
+            lat=lat,
+            lon=lon,
+            signal_strength_dbm=round(float(dbm[0]), 1),
+            nearest_station=snapshot.stations[best[0]].station_id,
+            distance_to_station_km=round(float(distance[0]), 3)
+        )
 
     @function_tool
-    def coverage_strength_at(self, lat: float, lon: float) -> Dict[str, Any]:
+    def coverage_strength_at(self, lat: float, lon: float) -> CoverageStrengthResponse:
         """Return estimated signal strength."""
         return self._coverage_strength_at_impl(lat, lon)
 
-    def _propose_new_station_impl(self, lat: float, lon: float, required_radius: float) -> Dict[str, Any]:
+    def _propose_new_station_impl(self, lat: float, lon: float, required_radius: float) -> ProposedStation:
         """Suggest a new base station location."""
-        return {
-            "suggested_location": (lat + 0.01, lon + 0.01),
-            "required_radius": required_radius
-        }
+        data = self.datasets.snapshot
+        snapshot = data.region(lat, lon, required_radius)
+        indices, distances = self._within(snapshot, lat, lon, required_radius)
+        proposed_lat, proposed_lon = lat, lon
+        if len(indices) == 0:
+            reason = f"No existing station within {required_radius} km"
+        else:
+            # Push the site away from the nearest station until they are required_radius apart
+            nearest, d = snapshot.stations[indices[0]], float(distances[0])
+            bearing = initial_bearing_deg(nearest.lat, nearest.lon, lat, lon) if d > 0 else 0.0
+            proposed_lat, proposed_lon = destination(nearest.lat, nearest.lon, bearing, required_radius)
+            reason = (f"{len(indices)} existing station(s) within {required_radius} km; "
+                      f"moved away from {nearest.station_id} ({d:.2f} km) to limit overlap")
+        _, dbm, _ = self._best_server(data.serving_region(lat, lon), lat, lon)
+        return ProposedStation(
+            lat=round(float(proposed_lat), 5),
+            lon=round(float(proposed_lon), 5),
+            estimated_coverage_radius_km=required_radius,
+            reason=reason,
+            expected_improvement=f"Signal at requested location is currently {dbm[0]:.1f} dBm "
+                                 f"({signal_quality(float(dbm[0]))}); new station covers a {required_radius} km radius"
+        )
 
     @function_tool
-    def propose_new_station(self, lat: float, lon: float, required_radius: float) -> Dict[str, Any]:
+    def propose_new_station(self, lat: float, lon: float, required_radius: float) -> ProposedStation:
         """Suggest a new base station location."""
         return self._propose_new_station_impl(lat, lon, required_radius)
 
-    def _stations_with_capacity_impl(self, min_capacity: int) -> Dict[str, Any]:
+    def _stations_with_capacity_impl(self, min_capacity: int) -> BaseStationResponse:
         """Return stations meeting minimum capacity."""
-        stations = [
-            {"id": "BTS001", "capacity": 500},
-            {"id": "BTS002", "capacity": 300},
-            {"id": "BTS003", "capacity": 1000}
-        ]
-        result = [s for s in stations if s["capacity"] >= min_capacity]
-        return {"filtered_stations": result}
+        snapshot = self.datasets.snapshot.with_capacity(min_capacity)
+        result = [snapshot.stations[i] for i in np.flatnonzero(snapshot.capacity >= min_capacity)]
+        return BaseStationResponse(stations=result, count=len(result))
 
     @function_tool
-    def stations_with_capacity(self, min_capacity: int) -> Dict[str, Any]:
+    def stations_with_capacity(self, min_capacity: int) -> BaseStationResponse:
         """Return stations meeting minimum capacity."""
         return self._stations_with_capacity_impl(min_capacity)
 
     def _handover_path_impl(self, start_lat: float, start_lon: float,
-                      end_lat: float, end_lon: float) -> Dict[str, Any]:
+                      end_lat: float, end_lon: float) -> HandoverPathResponse:
         """Simulate mobile station handover along a route."""
-        return {
-            "start": (start_lat, start_lon),
-            "end": (end_lat, end_lon),
-            "handover_sequence": [
-                {"station": "BTS001", "distance": 1.2},
-                {"station": "BTS002", "distance": 2.5},
-                {"station": "BTS003", "distance": 1.7}
-            ]
-        }
+        lats, lons = interpolate(start_lat, start_lon, end_lat, end_lon, np.linspace(0.0, 1.0, HANDOVER_SAMPLES))
+        snapshot = self.datasets.snapshot.serving_region(lats, lons)
+        best, dbm, _ = self._best_server(snapshot, lats, lons)
+
+        events = []
+        for i in np.flatnonzero(best[1:] != best[:-1]) + 1:
+            events.append(HandoverEvent(
+                timestamp=int(i),
+                lat=round(float(lats[i]), 5),
+                lon=round(float(lons[i]), 5),
+                from_station=snapshot.stations[best[i - 1]].station_id,
+                to_station=snapshot.stations[best[i]].station_id,
+                signal_quality=signal_quality(float(dbm[i]))
+            ))
+        return HandoverPathResponse(
+            start_lat=start_lat,
+            start_lon=start_lon,
+            end_lat=end_lat,
+            end_lon=end_lon,
+            handover_events=events,
+            total_handovers=len(events)
+        )
 
     @function_tool
     def handover_path(self, start_lat: float, start_lon: float,
-                      end_lat: float, end_lon: float) -> Dict[str, Any]:
+                      end_lat: float, end_lon: float) -> HandoverPathResponse:
         """Simulate mobile station handover along a route."""
         return self._handover_path_impl(start_lat, start_lon, end_lat, end_lon)
+
+    def _coverage_gaps_impl(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                            threshold_dbm: float = -100.0) -> CoverageGapsResponse:
+        """Find areas inside a bounding box where the best signal is below a threshold."""
+        if not (min_lat < max_lat and min_lon < max_lon):
+            raise ValueError("Bounding box must satisfy min_lat < max_lat and min_lon < max_lon")
+        snapshot = self._box_region(min_lat, min_lon, max_lat, max_lon, threshold_dbm)
+
+        # Square-ish cells, no finer than GAP_MIN_RESOLUTION_KM and at most GAP_MAX_CELLS_PER_SIDE per side
+        mid_lat = (min_lat + max_lat) / 2
+        height_km = (max_lat - min_lat) * KM_PER_DEGREE_LAT
+        width_km = (max_lon - min_lon) * KM_PER_DEGREE_LAT * np.cos(np.radians(mid_lat))
+        resolution_km = max(GAP_MIN_RESOLUTION_KM, max(height_km, width_km) / GAP_MAX_CELLS_PER_SIDE)
+        rows = max(1, int(np.ceil(height_km / resolution_km)))
+        cols = max(1, int(np.ceil(width_km / resolution_km)))
+        dlat, dlon = (max_lat - min_lat) / rows, (max_lon - min_lon) / cols
+
+        # Evaluate at cell centres
+        cell_lats = min_lat + (np.arange(rows) + 0.5) * dlat
+        cell_lons = min_lon + (np.arange(cols) + 0.5) * dlon
+        signal = max_signal_grid(snapshot, cell_lats, cell_lons, threshold_dbm)
+        uncovered = signal < threshold_dbm
+
+        cell_area = (dlat * KM_PER_DEGREE_LAT) * (dlon * KM_PER_DEGREE_LAT * np.cos(np.radians(cell_lats)))
+        total_area = float(cell_area.sum()) * cols
+
+        labels, count = label_regions(uncovered)
+        flat_labels = labels.ravel()
+        order = np.argsort(flat_labels, kind="stable")
+        bounds = np.searchsorted(flat_labels[order], np.arange(1, count + 2))
+        regions = []
+        for label in range(1, count + 1):
+            cells = order[bounds[label - 1]:bounds[label]]
+            r_idx, c_idx = np.divmod(cells, cols)
+            areas = cell_area[r_idx]
+            regions.append((float(areas.sum()), label, r_idx, c_idx, areas))
+        # Largest gaps first; only the largest GAP_MAX_POLYGONS carry geometry
+        regions.sort(key=lambda region: region[0], reverse=True)
+
+        gaps = []
+        for area, label, r_idx, c_idx, areas in regions[:GAP_MAX_POLYGONS]:
+            r0, c0 = r_idx.min(), c_idx.min()
+            region = labels[r0:r_idx.max() + 1, c0:c_idx.max() + 1] == label
+            rings = trace_rings(region)
+            # Outer ring (counter-clockwise, largest) first, then holes
+            rings.sort(key=signed_area, reverse=True)
+            polygon = [
+                np.column_stack([min_lat + (ring[:, 0] + r0) * dlat, min_lon + (ring[:, 1] + c0) * dlon]).round(6)
+                for ring in rings
+            ]
+            region_signal = signal[r_idx, c_idx]
+            gaps.append(CoverageGap(
+                polygon=polygon,
+                area_km2=round(area, 4),
+                centroid_lat=round(float(np.average(cell_lats[r_idx], weights=areas)), 6),
+                centroid_lon=round(float(np.average(cell_lons[c_idx], weights=areas)), 6),
+                min_signal_dbm=round(float(region_signal.min()), 1),
+                mean_signal_dbm=round(float(region_signal.mean()), 1)
+            ))
+
+        uncovered_area = float(uncovered.sum(axis=1) @ cell_area)
+        return CoverageGapsResponse(
+            min_lat=min_lat,
+            min_lon=min_lon,
+            max_lat=max_lat,
+            max_lon=max_lon,
+            threshold_dbm=threshold_dbm,
+            resolution_km=round(float(resolution_km), 4),
+            total_area_km2=round(total_area, 4),
+            uncovered_area_km2=round(uncovered_area, 4),
+            uncovered_fraction=round(uncovered_area / total_area, 4) if total_area else 0.0,
+            gaps=gaps,
+            count=count
+        )
+
+    @function_tool
+    def coverage_gaps(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                      threshold_dbm: float = -100.0) -> CoverageGapsResponse:
+        """Find areas inside a bounding box where the best signal is below a threshold."""
+        return self._coverage_gaps_impl(min_lat, min_lon, max_lat, max_lon, threshold_dbm)
+
+    def _simulate_network_load_impl(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                                    mobiles: int = 10000, duration_minutes: float = 60.0,
+                                    seed: int = None) -> LoadSimulationResponse:
+        """Simulate many mobiles moving through a bounding box and report station load and handovers."""
+        if not (min_lat < max_lat and min_lon < max_lon):
+            raise ValueError("Bounding box must satisfy min_lat < max_lat and min_lon < max_lon")
+        mobiles = max(1, min(int(mobiles), SIMULATION_MAX_MOBILES))
+        duration_s = max(TICK_SECONDS, min(float(duration_minutes), SIMULATION_MAX_MINUTES) * 60.0)
+        snapshot = self._box_region(min_lat, min_lon, max_lat, max_lon, MIN_ATTACH_DBM)
+
+        # Only stations that can serve somewhere in the box take part
+        reach_km = 10 ** ((snapshot.signal_strength_dbm - MIN_ATTACH_DBM) / PATH_LOSS_DB_PER_DECADE)
+        center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+        half_diagonal = haversine_km(min_lat, min_lon, max_lat, max_lon) / 2
+        stations = np.flatnonzero(
+            haversine_km(center_lat, center_lon, snapshot.lat, snapshot.lon) <= half_diagonal + reach_km
+        )
+
+        mobility = RandomWaypoint(mobiles, min_lat, min_lon, max_lat, max_lon, seed=seed)
+        simulation = LoadSimulation(snapshot, mobility, stations, seed=seed)
+        metrics_dir = self.simulation_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        totals = simulation.run(duration_s, metrics_dir)
+        prune_runs(self.simulation_dir, SIMULATION_KEEP_RUNS)
+
+        capacity = simulation.capacity
+        peak_utilization = totals.peak_load / np.maximum(capacity, 1)
+        busiest = np.argsort(-peak_utilization, kind="stable")[:SIMULATION_TOP_STATIONS]
+        busiest_stations = [
+            StationLoad(
+                station_id=simulation.station_ids[i],
+                lat=float(snapshot.lat[stations[i]]),
+                lon=float(snapshot.lon[stations[i]]),
+                capacity=int(capacity[i]),
+                peak_load=int(totals.peak_load[i]),
+                mean_load=round(float(totals.mean_load[i]), 1),
+                peak_utilization=round(float(peak_utilization[i]), 3),
+                blocked_attaches=int(totals.station_blocked[i]),
+                handovers_in=int(totals.station_handovers_in[i])
+            )
+            for i in busiest
+        ]
+        return LoadSimulationResponse(
+            min_lat=min_lat,
+            min_lon=min_lon,
+            max_lat=max_lat,
+            max_lon=max_lon,
+            mobiles=mobiles,
+            duration_s=duration_s,
+            tick_s=simulation.tick_s,
+            session_attempts=totals.session_attempts,
+            blocked_attaches=totals.blocked_attaches,
+            blocking_probability=round(totals.blocked_attaches / max(totals.session_attempts, 1), 4),
+            no_coverage=totals.no_coverage,
+            handovers=totals.handovers,
+            handovers_per_mobile_hour=round(totals.handovers / mobiles / (duration_s / 3600.0), 3),
+            failed_handovers=totals.failed_handovers,
+            dropped_sessions=totals.dropped_sessions,
+            overloaded_stations=int(np.count_nonzero(totals.peak_load >= capacity)),
+            busiest_stations=busiest_stations,
+            metrics_dir=str(metrics_dir)
+        )
+
+    @function_tool
+    def simulate_network_load(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                              mobiles: int = 10000, duration_minutes: float = 60.0) -> LoadSimulationResponse:
+        """Simulate many mobiles moving through a bounding box and report station load and handovers."""
+        return self._simulate_network_load_impl(min_lat, min_lon, max_lat, max_lon, mobiles, duration_minutes)
@@ -0,0 +1,301 @@
+"""Versioned, immutable dataset snapshots with background hot reload.
+
+Each server reads its data through a ``DatasetManager``. The manager holds the
+current snapshot, watches the source file, and builds a replacement snapshot
+(records plus indexes) in a background thread when the file changes. The swap
+is a single attribute assignment, so readers never take a lock: a query grabs
+``manager.snapshot`` once and keeps using that object even if a reload lands
+mid-query. Snapshots are never mutated, so an old version stays consistent
+until its last reader drops it and it is garbage collected.
+"""
+import hashlib
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Generic, List, Mapping, Optional, Tuple, TypeVar, Union
+
+import numpy as np
+
+from models import BaseStation, LandingStation, CableRoute
+from serialization import from_json
+from servers.geodesy import KM_PER_DEGREE_LAT, haversine_km, path_distance_km, path_length_km
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+BASE_STATIONS_PATH = DATA_DIR / "base_stations.json"
+SUBMARINE_CABLES_PATH = DATA_DIR / "submarine_cables.json"
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    array = np.ascontiguousarray(array)
+    array.flags.writeable = False
+    return array
+
+
+def tiles_overlapping(tiles: np.ndarray, tile_deg: float, lat: float, lon: float, radius_km: float) -> np.ndarray:
+    """Mask of ``(lat_index, lon_index)`` tiles that a search circle's bounding box overlaps.
+
+    Tile ``(i, j)`` spans latitudes ``[i, i + 1) * tile_deg`` and longitudes
+    ``[j, j + 1) * tile_deg``.
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = np.cos(np.radians(min(89.9, abs(lat) + dlat)))
+    dlon = dlat / max(cos_lat, 1e-6)
+    i_lo = np.floor((lat - dlat) / tile_deg)
+    i_hi = np.floor((lat + dlat) / tile_deg)
+    hit = (tiles[:, 0] >= i_lo) & (tiles[:, 0] <= i_hi)
+    if 2 * dlon < 360.0 - tile_deg:
+        j_lo = np.floor((lon - dlon) / tile_deg)
+        j_hi = np.floor((lon + dlon) / tile_deg)
+        # Modular comparison handles boxes that cross the antimeridian
+        hit &= np.mod(tiles[:, 1] - j_lo, np.ceil(360.0 / tile_deg)) <= (j_hi - j_lo)
+    return hit
+
+
+def content_version(data: bytes) -> str:
+    """Short content hash used as the dataset version."""
+    return hashlib.sha1(data).hexdigest()[:12]
+
+
+# ============================================================================
+# BASE STATIONS
+# ============================================================================
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class BaseStationSnapshot:
+    """Immutable base-station table with columnar arrays sorted by latitude."""
+    version: str
+    stations: Tuple[BaseStation, ...]
+    lat: np.ndarray
+    lon: np.ndarray
+    coverage_radius_km: np.ndarray
+    capacity: np.ndarray
+    signal_strength_dbm: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    @property
+    def max_signal_dbm(self) -> float:
+        return float(self.signal_strength_dbm.max()) if len(self.stations) else float("-inf")
+
+    # A snapshot already holds every region. Tiled datasets (servers/tiles.py)
+    # implement the same methods by loading only the tiles a query needs.
+
+    def region(self, lat: float, lon: float, radius_km: float) -> "BaseStationSnapshot":
+        """Stations, including at least all of those within ``radius_km`` of the point."""
+        return self
+
+    def serving_region(self, lats, lons) -> "BaseStationSnapshot":
+        """Stations, including every station that can be the best server at any of the points."""
+        return self
+
+    def with_capacity(self, min_capacity: int) -> "BaseStationSnapshot":
+        """Stations, including at least all of those with ``capacity >= min_capacity``."""
+        return self
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(indices, distances_km)`` of stations within a radius, nearest first."""
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        lo = np.searchsorted(self.lat, lat - dlat, side="left")
+        hi = np.searchsorted(self.lat, lat + dlat, side="right")
+        candidates = np.arange(lo, hi)
+        distances = haversine_km(lat, lon, self.lat[lo:hi], self.lon[lo:hi])
+        keep = distances <= radius_km
+        candidates, distances = candidates[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+
+def build_base_station_snapshot(stations: List[BaseStation], version: str) -> BaseStationSnapshot:
+    """Build a snapshot (sorted columns) from a list of stations."""
+    stations = sorted(stations, key=lambda s: s.lat)
+    return BaseStationSnapshot(
+        version=version,
+        stations=tuple(stations),
+        lat=_frozen(np.array([s.lat for s in stations], dtype=np.float64)),
+        lon=_frozen(np.array([s.lon for s in stations], dtype=np.float64)),
+        coverage_radius_km=_frozen(np.array([s.coverage_radius_km for s in stations], dtype=np.float64)),
+        capacity=_frozen(np.array([s.capacity for s in stations], dtype=np.int64)),
+        signal_strength_dbm=_frozen(np.array([s.signal_strength_dbm for s in stations], dtype=np.float64))
+    )
+
+
+def load_base_stations(path: Union[str, Path]) -> BaseStationSnapshot:
+    """Load ``base_stations.json`` into a snapshot."""
+    raw = Path(path).read_bytes()
+    records = from_json(raw)["stations"]
+    stations = [BaseStation(**record) for record in records]
+    return build_base_station_snapshot(stations, content_version(raw))
+
+
+# ============================================================================
+# SUBMARINE CABLES
+# ============================================================================
+
+@dataclass(frozen=True, slots=True)
+class CableInfo:
+    """A cable's attributes without its geometry."""
+    cable_name: str
+    country_a: str
+    country_b: str
+    distance_km: float
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class CableSnapshot:
+    """Immutable landing-station and cable tables with lookup indexes."""
+    version: str
+    landing_stations: Tuple[LandingStation, ...]
+    cables: Tuple[CableRoute, ...]
+    cable_info: Tuple[CableInfo, ...]
+    outage_risk: np.ndarray
+    stations_by_country: Mapping[str, Tuple[LandingStation, ...]]
+    cables_by_pair: Mapping[frozenset, Tuple[int, ...]]
+
+    def landing_stations_in(self, country: str) -> Tuple[LandingStation, ...]:
+        return self.stations_by_country.get(country.strip().casefold(), ())
+
+    def cables_between(self, country_a: str, country_b: str) -> List[CableRoute]:
+        key = frozenset((country_a.strip().casefold(), country_b.strip().casefold()))
+        return [self.cables[i] for i in self.cables_by_pair.get(key, ())]
+
+    def cables_within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(indices, distances_km)`` of cables whose route passes within a radius."""
+        indices, distances = [], []
+        for i, cable in enumerate(self.cables):
+            d = path_distance_km(lat, lon, cable.waypoints)
+            if d <= radius_km:
+                indices.append(i)
+                distances.append(d)
+        order = np.argsort(distances, kind="stable")
+        return np.asarray(indices, dtype=np.int64)[order], np.asarray(distances, dtype=np.float64)[order]
+
+
+def load_submarine_cables(path: Union[str, Path]) -> CableSnapshot:
+    """Load ``submarine_cables.json`` into a snapshot."""
+    raw = Path(path).read_bytes()
+    data = from_json(raw)
+
+    landing_stations = tuple(LandingStation(**record) for record in data["landing_stations"])
+    by_country = {}
+    for station in landing_stations:
+        by_country.setdefault(station.country.casefold(), []).append(station)
+
+    cables, risks, by_pair = [], [], {}
+    for i, record in enumerate(data["cables"]):
+        waypoints = np.asarray(record["waypoints"], dtype=np.float64).reshape(-1, 2)
+        waypoints.flags.writeable = False
+        cables.append(CableRoute(
+            country_a=record["country_a"],
+            country_b=record["country_b"],
+            waypoints=waypoints,
+            distance_km=round(path_length_km(waypoints, ellipsoidal=True), 1),
+            cable_name=record["cable_name"]
+        ))
+        risks.append(record.get("outage_risk", 0.0))
+        key = frozenset((record["country_a"].casefold(), record["country_b"].casefold()))
+        by_pair.setdefault(key, []).append(i)
+
+    return CableSnapshot(
+        version=content_version(raw),
+        landing_stations=landing_stations,
+        cables=tuple(cables),
+        cable_info=tuple(CableInfo(c.cable_name, c.country_a, c.country_b, c.distance_km) for c in cables),
+        outage_risk=_frozen(np.asarray(risks, dtype=np.float64)),
+        stations_by_country=MappingProxyType({k: tuple(v) for k, v in by_country.items()}),
+        cables_by_pair=MappingProxyType({k: tuple(v) for k, v in by_pair.items()})
+    )
+
+
+# ============================================================================
+# HOT RELOAD
+# ============================================================================
+
+S = TypeVar("S")
+
+
+class DatasetManager(Generic[S]):
+    """Holds the current snapshot of a data file and hot-swaps it on change."""
+
+    def __init__(self, path: Union[str, Path], loader: Callable[[Path], S], poll_interval: float = 2.0,
+                 housekeeping: Optional[Callable[[List[S]], None]] = None):
+        """Load ``path`` with ``loader``; once started, also call ``housekeeping(live_snapshots())`` every poll."""
+        self.path = Path(path)
+        self.loader = loader
+        self.poll_interval = poll_interval
+        self.housekeeping = housekeeping
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._versions: "weakref.WeakValueDictionary[str, S]" = weakref.WeakValueDictionary()
+        self._stamp = self._file_stamp()
+        self._snapshot: S = self._install(self.loader(self.path))
+
+    @property
+    def snapshot(self) -> S:
+        """The current snapshot; hold on to it for the duration of a query."""
+        return self._snapshot
+
+    @property
+    def version(self) -> str:
+        return self._snapshot.version
+
+    def live_versions(self) -> List[str]:
+        """Versions still referenced by the manager or by in-flight readers."""
+        return sorted(self._versions.keys())
+
+    def live_snapshots(self) -> List[S]:
+        """Snapshots still referenced by the manager or by in-flight readers."""
+        return list(self._versions.values())
+
+    def reload(self) -> bool:
+        """Rebuild the snapshot from disk; return whether the version changed."""
+        with self._reload_lock:
+            self._stamp = self._file_stamp()
+            snapshot = self.loader(self.path)
+            if snapshot.version == self._snapshot.version:
+                return False
+            self._snapshot = self._install(snapshot)
+            logger.info("Loaded %s version %s", self.path.name, snapshot.version)
+            return True
+
+    def start(self) -> "DatasetManager[S]":
+        """Start watching the data file in a background thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name=f"watch-{self.path.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _install(self, snapshot: S) -> S:
+        # Only snapshots that were swapped in are tracked; an unchanged reload is discarded
+        self._versions[snapshot.version] = snapshot
+        return snapshot
+
+    def _file_stamp(self) -> Tuple[int, int]:
+        stat = self.path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if self._file_stamp() != self._stamp:
+                    self.reload()
+            except Exception:
+                # Keep serving the last good snapshot, e.g. while a file is half-written
+                logger.exception("Reloading %s failed", self.path)
+            if self.housekeeping is not None:
+                try:
+                    self.housekeeping(self.live_snapshots())
+                except Exception:
+                    logger.exception("Housekeeping for %s failed", self.path)
@@ -0,0 +1,233 @@
+"""Offline place-name gazetteer with exact, prefix and fuzzy lookup.
+
+Names and alternate names are normalized (accents stripped, case folded,
+punctuation collapsed) and indexed three ways:
+
+* a dict from name to places, for exact matches;
+* a sorted name table searched with ``bisect``, for prefixes;
+* a trigram index, for misspellings, scored by Dice similarity with one
+  ``np.bincount`` over the matching names.
+
+Matches rank exact before prefix before fuzzy, and by population within a
+tier, so "Paris" is the French capital and "Tripoli, Libya" is not the one in
+Lebanon. Lookups never touch the network.
+
+The gazetteer loads ``data/places.json`` or a GeoNames ``cities*.txt`` dump
+and is served through a ``DatasetManager`` like the other datasets. A dump is
+paired with the GeoNames ``countryInfo.txt`` and ``admin1CodesASCII.txt``
+files found next to it, which turn country and region codes into names.
+"""
+import csv
+import re
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Tuple, Union
+
+import numpy as np
+
+from models import Place
+from serialization import from_json
+from servers.datasets import DATA_DIR, content_version
+
+PLACES_PATH = DATA_DIR / "places.json"
+
+# Prefix matches scanned per lookup (names sharing a short prefix can be many)
+MAX_PREFIX_NAMES = 64
+
+# Lowest trigram Dice similarity accepted as a fuzzy match
+MIN_FUZZY_SCORE = 0.45
+
+# Leading words that qualify a place rather than name it ("downtown Beirut")
+QUALIFIER_WORDS = frozenset(("downtown", "central", "centre", "center", "city", "of", "the", "greater", "in", "near"))
+
+# GeoNames dump columns
+_GEONAMES_NAME, _GEONAMES_ASCII, _GEONAMES_ALT, _GEONAMES_LAT, _GEONAMES_LON = 1, 2, 3, 4, 5
+_GEONAMES_COUNTRY, _GEONAMES_ADMIN1, _GEONAMES_POPULATION = 8, 10, 14
+
+# GeoNames code tables read from the dump's directory, and their name columns
+GEONAMES_COUNTRY_INFO = "countryInfo.txt"
+GEONAMES_ADMIN1_CODES = "admin1CodesASCII.txt"
+_COUNTRY_INFO_NAME = 4
+_ADMIN1_NAME, _ADMIN1_ASCII = 1, 2
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(name: str) -> str:
+    """Accent-free, case-folded name with punctuation collapsed to single spaces."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    plain = "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    return _NON_ALNUM.sub(" ", plain).strip()
+
+
+def trigrams(key: str) -> FrozenSet[str]:
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class Gazetteer:
+    """Immutable place table with name indexes; places are sorted most populous first."""
+    version: str
+    places: Tuple[Place, ...]
+    qualifiers: Tuple[FrozenSet[str], ...]
+    names: Tuple[str, ...]
+    name_places: Tuple[Tuple[int, ...], ...]
+    name_index: Mapping[str, int]
+    trigram_names: Mapping[str, np.ndarray]
+    name_trigram_counts: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def lookup(self, query: str, limit: int = 5) -> List[Place]:
+        """Places matching ``query``, best first.
+
+        A trailing ``", qualifier"`` (country, country code or region) filters
+        the matches, and leading words such as "downtown" are ignored when the
+        full name does not match.
+        """
+        name, _, qualifier = query.partition(",")
+        key, qualifier = normalize(name), normalize(qualifier)
+        variants = [key]
+        words = key.split()
+        while len(words) > 1 and words[0] in QUALIFIER_WORDS:
+            words = words[1:]
+            variants.append(" ".join(words))
+
+        found: Dict[int, None] = {}
+        for tier in (self._exact, self._prefix, self._fuzzy):
+            for variant in variants:
+                for place in tier(variant):
+                    if not qualifier or qualifier in self.qualifiers[place]:
+                        found.setdefault(place)
+            if len(found) >= limit:
+                break
+        return [self.places[i] for i in list(found)[:limit]]
+
+    def resolve(self, query: str) -> Place:
+        """The best match for ``query``; ``ValueError`` if nothing matches."""
+        matches = self.lookup(query, limit=1)
+        if not matches:
+            raise ValueError(f"Unknown place: {query}")
+        return matches[0]
+
+    def _exact(self, key: str) -> Tuple[int, ...]:
+        i = self.name_index.get(key)
+        return () if i is None else self.name_places[i]
+
+    def _prefix(self, key: str) -> List[int]:
+        if not key:
+            return []
+        start = bisect_left(self.names, key)
+        places = set()
+        for i in range(start, min(start + MAX_PREFIX_NAMES, len(self.names))):
+            if not self.names[i].startswith(key):
+                break
+            places.update(self.name_places[i])
+        return sorted(places)
+
+    def _fuzzy(self, key: str) -> List[int]:
+        grams = [g for g in trigrams(key) if g in self.trigram_names]
+        if not key or not grams:
+            return []
+        shared = np.bincount(np.concatenate([self.trigram_names[g] for g in grams]), minlength=len(self.names))
+        scores = 2 * shared / (len(trigrams(key)) + self.name_trigram_counts)
+        candidates = np.flatnonzero(scores >= MIN_FUZZY_SCORE)
+        best = {}
+        for i in candidates[np.argsort(-scores[candidates], kind="stable")]:
+            for place in self.name_places[i]:
+                best.setdefault(place, scores[i])
+        # Higher similarity first, then population (place order)
+        return sorted(best, key=lambda place: (-best[place], place))
+
+
+def build_gazetteer(records: Iterable[Tuple[Place, Iterable[str], Iterable[str]]], version: str) -> Gazetteer:
+    """Index ``(place, names, qualifiers)`` records."""
+    records = sorted(records, key=lambda record: -record[0].population)
+    by_name: Dict[str, List[int]] = {}
+    for i, (_, names, _) in enumerate(records):
+        for name in names:
+            key = normalize(name)
+            if key and i not in by_name.setdefault(key, []):
+                by_name[key].append(i)
+
+    names = tuple(sorted(by_name))
+    by_trigram: Dict[str, List[int]] = {}
+    counts = np.empty(len(names), dtype=np.float64)
+    for i, key in enumerate(names):
+        grams = trigrams(key)
+        counts[i] = len(grams)
+        for gram in grams:
+            by_trigram.setdefault(gram, []).append(i)
+    counts.flags.writeable = False
+
+    return Gazetteer(
+        version=version,
+        places=tuple(record[0] for record in records),
+        qualifiers=tuple(frozenset(normalize(q) for q in record[2] if q) for record in records),
+        names=names,
+        name_places=tuple(tuple(by_name[key]) for key in names),
+        name_index=MappingProxyType({key: i for i, key in enumerate(names)}),
+        trigram_names=MappingProxyType({g: np.asarray(v, dtype=np.int64) for g, v in by_trigram.items()}),
+        name_trigram_counts=counts
+    )
+
+
+def _places_json_records(raw: bytes):
+    for record in from_json(raw)["places"]:
+        place = Place(
+            name=record["name"],
+            country=record["country"],
+            admin1=record.get("admin1", ""),
+            lat=float(record["lat"]),
+            lon=float(record["lon"]),
+            population=int(record.get("population", 0))
+        )
+        names = [record["name"], *record.get("alt_names", ())]
+        qualifiers = (record["country"], record.get("country_code"), record.get("admin1"))
+        yield place, names, qualifiers
+
+
+def _geonames_rows(raw: bytes) -> Iterable[List[str]]:
+    lines = (line for line in raw.decode("utf-8").splitlines() if line and not line.startswith("#"))
+    return csv.reader(lines, delimiter="\t", quoting=csv.QUOTE_NONE)
+
+
+def _geonames_records(raw: bytes, country_info: bytes = b"", admin1_codes: bytes = b""):
+    """Records of a GeoNames dump; codes missing from the code tables are kept as they are."""
+    countries = {row[0]: row[_COUNTRY_INFO_NAME] for row in _geonames_rows(country_info)}
+    regions = {row[0]: (row[_ADMIN1_NAME], row[_ADMIN1_ASCII]) for row in _geonames_rows(admin1_codes)}
+    for row in _geonames_rows(raw):
+        code, admin1 = row[_GEONAMES_COUNTRY], row[_GEONAMES_ADMIN1]
+        country = countries.get(code, code)
+        region = regions.get(f"{code}.{admin1}", ())
+        place = Place(
+            name=row[_GEONAMES_NAME],
+            country=country,
+            admin1=region[0] if region else admin1,
+            lat=float(row[_GEONAMES_LAT]),
+            lon=float(row[_GEONAMES_LON]),
+            population=int(row[_GEONAMES_POPULATION] or 0)
+        )
+        alt_names = row[_GEONAMES_ALT].split(",") if row[_GEONAMES_ALT] else []
+        yield place, [row[_GEONAMES_NAME], row[_GEONAMES_ASCII], *alt_names], (country, code, admin1, *region)
+
+
+def _read_optional(path: Path) -> bytes:
+    return path.read_bytes() if path.exists() else b""
+
+
+def load_gazetteer(path: Union[str, Path]) -> Gazetteer:
+    """Load ``places.json``, or a GeoNames dump (with its code tables) when the file ends in ``.txt``."""
+    path = Path(path)
+    raw = path.read_bytes()
+    if path.suffix != ".txt":
+        return build_gazetteer(_places_json_records(raw), content_version(raw))
+    country_info = _read_optional(path.parent / GEONAMES_COUNTRY_INFO)
+    admin1_codes = _read_optional(path.parent / GEONAMES_ADMIN1_CODES)
+    records = _geonames_records(raw, country_info, admin1_codes)
+    return build_gazetteer(records, content_version(raw + country_info + admin1_codes))
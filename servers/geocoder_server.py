@@ -0,0 +1,56 @@
+from typing import Optional, Tuple
+
+import numpy as np
+from agents import function_tool
+from models import GeocodeResponse
+from servers.datasets import DatasetManager
+from servers.gazetteer import PLACES_PATH, Gazetteer, load_gazetteer
+from servers.geodesy import KM_PER_DEGREE_LAT
+
+# Half-width of the bounding box used when a region tool is given a place name
+PLACE_BOX_KM = 10.0
+
+MAX_GEOCODE_RESULTS = 20
+
+
+class GeocoderServer:
+
+    def __init__(self, datasets: DatasetManager[Gazetteer] = None):
+        """Resolve place names from ``datasets`` (default: ``data/places.json``)."""
+        self.datasets = datasets or DatasetManager(PLACES_PATH, load_gazetteer)
+
+    @property
+    def dataset_version(self) -> str:
+        return self.datasets.version
+
+    def locate(self, lat: Optional[float], lon: Optional[float], place: Optional[str]) -> Tuple[float, float]:
+        """Coordinates of ``place`` when given, otherwise ``(lat, lon)``."""
+        if place:
+            match = self.datasets.snapshot.resolve(place)
+            return match.lat, match.lon
+        if lat is None or lon is None:
+            raise ValueError("Give either lat and lon or a place name")
+        return lat, lon
+
+    def bounding_box(self, min_lat: Optional[float], min_lon: Optional[float],
+                     max_lat: Optional[float], max_lon: Optional[float],
+                     place: Optional[str]) -> Tuple[float, float, float, float]:
+        """A ``PLACE_BOX_KM`` box around ``place`` when given, otherwise the box as passed."""
+        if place:
+            lat, lon = self.locate(None, None, place)
+            dlat = PLACE_BOX_KM / KM_PER_DEGREE_LAT
+            dlon = dlat / max(np.cos(np.radians(lat)), 0.01)
+            return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+        if None in (min_lat, min_lon, max_lat, max_lon):
+            raise ValueError("Give either a bounding box or a place name")
+        return min_lat, min_lon, max_lat, max_lon
+
+    def _geocode_impl(self, place: str, limit: int = 5) -> GeocodeResponse:
+        """Return gazetteer places matching a name, best match first."""
+        places = self.datasets.snapshot.lookup(place, max(1, min(limit, MAX_GEOCODE_RESULTS)))
+        return GeocodeResponse(query=place, places=places, count=len(places))
+
+    @function_tool
+    def geocode(self, place: str, limit: int = 5) -> GeocodeResponse:
+        """Return gazetteer places matching a name, best match first."""
+        return self._geocode_impl(place, limit)
@@ -0,0 +1,210 @@
+"""Great-circle and ellipsoidal distance kernels shared by the servers.
+
+Every function takes latitudes and longitudes in degrees as scalars or NumPy
+arrays and broadcasts them, so a whole batch of points is one call with no
+Python loop per point. Spherical formulas use the mean Earth radius. For
+lengths that need to be exact to a few millimetres, ``vincenty_km`` solves
+the inverse problem on the WGS-84 ellipsoid.
+"""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = EARTH_RADIUS_KM * np.pi / 180
+
+# WGS-84 ellipsoid
+WGS84_A_KM = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_B_KM = WGS84_A_KM * (1 - WGS84_F)
+
+# Vincenty iteration: convergence tolerance on lambda (radians) and iteration cap
+VINCENTY_TOLERANCE = 1e-12
+VINCENTY_MAX_ITERATIONS = 200
+
+
+def unit_vectors(lats, lons) -> np.ndarray:
+    """Earth-centred unit vectors, with shape ``(..., 3)``, for positions in degrees."""
+    phi, lam = np.radians(lats), np.radians(lons)
+    cos_phi = np.cos(phi)
+    vectors = np.empty(np.broadcast_shapes(np.shape(phi), np.shape(lam)) + (3,))
+    vectors[..., 0] = cos_phi * np.cos(lam)
+    vectors[..., 1] = cos_phi * np.sin(lam)
+    vectors[..., 2] = np.sin(phi)
+    return vectors
+
+
+def from_unit_vectors(vectors: np.ndarray):
+    """``(lats, lons)`` in degrees for vectors with shape ``(..., 3)``; vectors need not be normalized."""
+    x, y, z = vectors[..., 0], vectors[..., 1], vectors[..., 2]
+    return np.degrees(np.arctan2(z, np.hypot(x, y))), np.degrees(np.arctan2(y, x))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km on the mean-radius sphere."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def vincenty_km(lat1, lon1, lat2, lon2):
+    """Geodesic distance in km on the WGS-84 ellipsoid (Vincenty's inverse formula).
+
+    All pairs iterate together; converged pairs keep their value while the
+    rest continue. Nearly antipodal pairs, where the iteration does not
+    converge, fall back to ``haversine_km``.
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (lat1, lon1, lat2, lon2)))
+    u1 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat1)))
+    u2 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat2)))
+    sin_u1, cos_u1, sin_u2, cos_u2 = np.sin(u1), np.cos(u1), np.sin(u2), np.cos(u2)
+    big_l = np.radians(lon2 - lon1)
+
+    lam = big_l.copy()
+    pending = np.ones(lam.shape, dtype=bool)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for _ in range(VINCENTY_MAX_ITERATIONS):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = np.where(sin_sigma > 0, cos_u1 * cos_u2 * sin_lam / sin_sigma, 0.0)
+            cos2_alpha = 1 - sin_alpha ** 2
+            # Equatorial lines have cos2_alpha == 0
+            cos_2sigma_m = np.where(cos2_alpha > 0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha, 0.0)
+            c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+            updated = big_l + (1 - c) * WGS84_F * sin_alpha * (
+                sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2))
+            )
+            pending = np.abs(updated - lam) > VINCENTY_TOLERANCE
+            lam = updated
+            if not pending.any():
+                break
+
+    sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+    sin_sigma = np.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+    cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+    sigma = np.arctan2(sin_sigma, cos_sigma)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sin_alpha = np.where(sin_sigma > 0, cos_u1 * cos_u2 * sin_lam / sin_sigma, 0.0)
+        cos2_alpha = 1 - sin_alpha ** 2
+        cos_2sigma_m = np.where(cos2_alpha > 0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha, 0.0)
+    u_sq = cos2_alpha * (WGS84_A_KM ** 2 - WGS84_B_KM ** 2) / WGS84_B_KM ** 2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = big_b * sin_sigma * (cos_2sigma_m + big_b / 4 * (
+        cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+        - big_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)
+    ))
+    distance = WGS84_B_KM * big_a * (sigma - delta_sigma)
+    if pending.any():
+        distance = np.where(pending, haversine_km(lat1, lon1, lat2, lon2), distance)
+    return distance[()] if distance.ndim == 0 else distance
+
+
+def initial_bearing_deg(lat1, lon1, lat2, lon2):
+    """Initial great-circle bearing from point 1 to point 2, in degrees clockwise from north in [0, 360)."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dlam = np.radians(np.subtract(lon2, lon1))
+    y = np.sin(dlam) * np.cos(phi2)
+    x = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(dlam)
+    return np.degrees(np.arctan2(y, x)) % 360.0
+
+
+def destination(lat, lon, bearing_deg, distance_km):
+    """``(lats, lons)`` reached by travelling ``distance_km`` along a great circle at an initial bearing."""
+    phi, lam = np.radians(lat), np.radians(lon)
+    theta = np.radians(bearing_deg)
+    delta = np.divide(distance_km, EARTH_RADIUS_KM)
+    sin_phi2 = np.sin(phi) * np.cos(delta) + np.cos(phi) * np.sin(delta) * np.cos(theta)
+    phi2 = np.arcsin(np.clip(sin_phi2, -1.0, 1.0))
+    lam2 = lam + np.arctan2(np.sin(theta) * np.sin(delta) * np.cos(phi), np.cos(delta) - np.sin(phi) * sin_phi2)
+    return np.degrees(phi2), (np.degrees(lam2) + 540.0) % 360.0 - 180.0
+
+
+def arc_angle(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Central angle in radians between unit vectors with shape ``(..., 3)``."""
+    return np.arccos(np.clip(np.sum(a * b, axis=-1), -1.0, 1.0))
+
+
+def slerp(a: np.ndarray, b: np.ndarray, fraction, omega=None) -> np.ndarray:
+    """Vectors at ``fraction`` along the arcs from unit vectors ``a`` to ``b``.
+
+    ``omega`` is the arc angle from ``arc_angle``. Pass it in when the same
+    arcs are sampled repeatedly. The result is not normalized, which
+    ``from_unit_vectors`` does not need.
+    """
+    omega = arc_angle(a, b) if omega is None else np.asarray(omega, dtype=np.float64)
+    fraction = np.asarray(fraction, dtype=np.float64)
+    sin_omega = np.sin(omega)
+    # Arcs too short to divide by sin(omega) are interpolated linearly
+    short = sin_omega < 1e-12
+    sin_omega = np.where(short, 1.0, sin_omega)
+    wa = np.where(short, 1 - fraction, np.sin((1 - fraction) * omega) / sin_omega)
+    wb = np.where(short, fraction, np.sin(fraction * omega) / sin_omega)
+    return wa[..., None] * a + wb[..., None] * b
+
+
+def interpolate(lat1, lon1, lat2, lon2, fraction):
+    """Points at ``fraction`` (0 at point 1, 1 at point 2) along the great circle between two points.
+
+    Spherical linear interpolation of unit vectors. Coincident endpoints give
+    the start point. Antipodal endpoints have no unique great circle.
+    """
+    return from_unit_vectors(slerp(unit_vectors(lat1, lon1), unit_vectors(lat2, lon2), fraction))
+
+
+def densify(waypoints, max_segment_km: float) -> np.ndarray:
+    """Insert great-circle points so no segment of an ``(N, 2)`` lat/lon path is longer than ``max_segment_km``.
+
+    The original waypoints are kept. The result is one ``(M, 2)`` array
+    built with a single interpolation call.
+    """
+    waypoints = np.asarray(waypoints, dtype=np.float64).reshape(-1, 2)
+    if len(waypoints) < 2:
+        return waypoints.copy()
+    start, end = waypoints[:-1], waypoints[1:]
+    lengths = haversine_km(start[:, 0], start[:, 1], end[:, 0], end[:, 1])
+    pieces = np.maximum(np.ceil(lengths / max_segment_km), 1).astype(np.int64)
+    segment = np.repeat(np.arange(len(pieces)), pieces)
+    # Position of each emitted point within its segment: 0, 1/n, ..., (n-1)/n
+    step = np.arange(len(segment)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    lats, lons = interpolate(start[segment, 0], start[segment, 1], end[segment, 0], end[segment, 1],
+                             step / pieces[segment])
+    return np.vstack([np.column_stack([lats, lons]), waypoints[-1:]])
+
+
+def path_length_km(waypoints, ellipsoidal: bool = False) -> float:
+    """Total length of an ``(N, 2)`` lat/lon path, on the sphere or the WGS-84 ellipsoid."""
+    waypoints = np.asarray(waypoints, dtype=np.float64).reshape(-1, 2)
+    if len(waypoints) < 2:
+        return 0.0
+    distance = vincenty_km if ellipsoidal else haversine_km
+    return float(np.sum(distance(waypoints[:-1, 0], waypoints[:-1, 1], waypoints[1:, 0], waypoints[1:, 1])))
+
+
+def segment_distance_km(lat, lon, lat1, lon1, lat2, lon2):
+    """Distance from points to the shortest great-circle arc between points 1 and 2.
+
+    The cross-track distance where the point projects onto the arc, and the
+    distance to the nearer endpoint otherwise (or when the endpoints coincide).
+    """
+    p = unit_vectors(lat, lon)
+    a, b = unit_vectors(lat1, lon1), unit_vectors(lat2, lon2)
+    normal = np.cross(a, b)
+    norm = np.linalg.norm(normal, axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        normal = normal / norm
+    # The projection lies on the arc when it is on the inner side of both endpoints
+    inside = (np.sum(np.cross(a, p) * normal, axis=-1) >= 0) & (np.sum(np.cross(p, b) * normal, axis=-1) >= 0)
+    inside &= norm[..., 0] > 1e-12
+    cross = np.abs(EARTH_RADIUS_KM * np.arcsin(np.clip(np.sum(p * normal, axis=-1), -1.0, 1.0)))
+    ends = np.minimum(haversine_km(lat, lon, lat1, lon1), haversine_km(lat, lon, lat2, lon2))
+    return np.where(inside, cross, ends)
+
+
+def path_distance_km(lat, lon, waypoints) -> float:
+    """Distance from one point to the nearest point of an ``(N, 2)`` lat/lon path of great-circle arcs."""
+    waypoints = np.asarray(waypoints, dtype=np.float64).reshape(-1, 2)
+    if len(waypoints) < 2:
+        return float(haversine_km(lat, lon, waypoints[:, 0], waypoints[:, 1]).min())
+    start, end = waypoints[:-1], waypoints[1:]
+    return float(segment_distance_km(lat, lon, start[:, 0], start[:, 1], end[:, 0], end[:, 1]).min())
@@ -0,0 +1,431 @@
+"""Event-driven load simulation of many mobiles moving through the base-station network.
+
+Mobiles move under a mobility model, either random waypoint or a recorded
+trace, and alternate between idle periods and sessions. A heap-ordered
+event queue drives the simulation:
+
+- ``session_start`` and ``session_end`` events for single mobiles attach them
+  to and detach them from a station. A station carries at most ``capacity``
+  sessions at once; attaches beyond that are blocked.
+- ``tick`` events move every mobile at once, pick the best server for all of
+  them with NumPy, hand over active sessions and record metrics.
+
+Sessions attach to the best server found at the most recent tick. Metrics
+are buffered for a fixed number of ticks and then appended to CSV files, so
+memory use does not grow with the simulated duration.
+"""
+import heapq
+import itertools
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from servers.datasets import BaseStationSnapshot
+from servers.geodesy import EARTH_RADIUS_KM, haversine_km, unit_vectors
+from servers.propagation import MIN_DISTANCE_KM, NO_SIGNAL_DBM, PATH_LOSS_DB_PER_DECADE, received_signal_dbm
+
+# Seconds between mobility/best-server updates
+TICK_SECONDS = 10.0
+
+# A session hands over only when the new server is this much stronger
+HANDOVER_HYSTERESIS_DB = 3.0
+
+# Weakest signal a session can attach to or survive on
+MIN_ATTACH_DBM = -110.0
+
+# Mobiles evaluated per best-server batch (bounds the (mobiles, stations) arrays)
+SERVER_CHUNK_MOBILES = 8192
+
+# Ticks buffered in memory before metrics are appended to disk
+METRICS_CHUNK_TICKS = 256
+
+# Event kinds, in the order they run when they share a timestamp
+SESSION_END, SESSION_START, TICK = 0, 1, 2
+
+SUMMARY_COLUMNS = (
+    "time_s", "active_sessions", "session_attempts", "blocked_attaches", "no_coverage",
+    "handovers", "failed_handovers", "dropped_sessions", "mean_utilization", "max_utilization",
+    "overloaded_stations"
+)
+_SUMMARY_FORMAT = ["%.1f"] + ["%d"] * 7 + ["%.4f", "%.4f", "%d"]
+
+
+class EventQueue:
+    """Min-heap of ``(time, kind, payload)`` events; ties run in kind order, then first in, first out."""
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, time: float, kind: int, payload=None) -> None:
+        heapq.heappush(self._heap, (time, kind, next(self._seq), payload))
+
+    def extend(self, times: Sequence[float], kind: int, payloads: Sequence) -> None:
+        """Push many events at once in O(n) by re-heapifying."""
+        self._heap.extend(zip(times, itertools.repeat(kind), self._seq, payloads))
+        heapq.heapify(self._heap)
+
+    def pop(self) -> Tuple[float, int, object]:
+        time, kind, _, payload = heapq.heappop(self._heap)
+        return time, kind, payload
+
+    def peek_time(self) -> float:
+        return self._heap[0][0]
+
+
+class RandomWaypoint:
+    """Random-waypoint mobility in a bounding box.
+
+    Each mobile travels in a straight line to a uniformly drawn waypoint at a
+    uniformly drawn speed. It then pauses for a uniformly drawn time and
+    picks the next waypoint.
+    """
+
+    def __init__(self, mobiles: int, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                 speed_kmh: Tuple[float, float] = (3.0, 50.0), pause_s: Tuple[float, float] = (0.0, 300.0),
+                 seed=None):
+        self.mobiles = mobiles
+        self.box = (min_lat, min_lon, max_lat, max_lon)
+        self.speed_kmh = speed_kmh
+        self.pause_s = pause_s
+        self._rng = np.random.default_rng(seed)
+        self._dest_lat, self._dest_lon = self._draw_points(mobiles)
+        self._leave = np.zeros(mobiles)
+        self._orig_lat = self._dest_lat.copy()
+        self._orig_lon = self._dest_lon.copy()
+        self._depart = np.zeros(mobiles)
+        self._arrive = np.zeros(mobiles)
+
+    def _draw_points(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        min_lat, min_lon, max_lat, max_lon = self.box
+        return self._rng.uniform(min_lat, max_lat, n), self._rng.uniform(min_lon, max_lon, n)
+
+    def positions(self, t: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions of all mobiles at time ``t``; ``t`` must not decrease between calls."""
+        while True:
+            # Mobiles whose pause at the last waypoint is over start a new leg
+            moving = np.flatnonzero(self._leave <= t)
+            if len(moving) == 0:
+                break
+            self._orig_lat[moving] = self._dest_lat[moving]
+            self._orig_lon[moving] = self._dest_lon[moving]
+            self._dest_lat[moving], self._dest_lon[moving] = self._draw_points(len(moving))
+            distance = haversine_km(self._orig_lat[moving], self._orig_lon[moving],
+                                     self._dest_lat[moving], self._dest_lon[moving])
+            speed = self._rng.uniform(*self.speed_kmh, len(moving))
+            self._depart[moving] = self._leave[moving]
+            self._arrive[moving] = self._depart[moving] + distance / speed * 3600.0
+            self._leave[moving] = self._arrive[moving] + self._rng.uniform(*self.pause_s, len(moving))
+
+        duration = self._arrive - self._depart
+        frac = np.clip((t - self._depart) / np.where(duration > 0, duration, 1.0), 0.0, 1.0)
+        return (self._orig_lat + (self._dest_lat - self._orig_lat) * frac,
+                self._orig_lon + (self._dest_lon - self._orig_lon) * frac)
+
+
+class TraceMobility:
+    """Replays recorded positions, linearly interpolated between samples.
+
+    ``times`` has shape ``(T,)`` and ``lats``/``lons`` shape ``(T, mobiles)``.
+    Before the first sample and after the last, mobiles stay put.
+    """
+
+    def __init__(self, times, lats, lons):
+        self.times = np.asarray(times, dtype=np.float64)
+        self.lats = np.asarray(lats, dtype=np.float64).reshape(len(self.times), -1)
+        self.lons = np.asarray(lons, dtype=np.float64).reshape(self.lats.shape)
+        if len(self.times) == 0 or np.any(np.diff(self.times) <= 0):
+            raise ValueError("Trace times must be non-empty and strictly increasing")
+        self.mobiles = self.lats.shape[1]
+
+    @classmethod
+    def from_csv(cls, path: Union[str, Path]) -> "TraceMobility":
+        """Load a ``time_s,mobile_id,lat,lon`` CSV that has a row for every mobile at every timestamp."""
+        rows = np.genfromtxt(path, delimiter=",", names=True, dtype=None, encoding="utf-8")
+        rows = np.atleast_1d(rows)
+        times, time_index = np.unique(rows["time_s"].astype(np.float64), return_inverse=True)
+        mobiles, mobile_index = np.unique(rows["mobile_id"].astype(str), return_inverse=True)
+        lats = np.full((len(times), len(mobiles)), np.nan)
+        lons = np.full_like(lats, np.nan)
+        lats[time_index, mobile_index] = rows["lat"]
+        lons[time_index, mobile_index] = rows["lon"]
+        if np.isnan(lats).any():
+            raise ValueError(f"Trace {path} is missing positions for some mobiles at some timestamps")
+        return cls(times, lats, lons)
+
+    def positions(self, t: float) -> Tuple[np.ndarray, np.ndarray]:
+        i = int(np.clip(np.searchsorted(self.times, t, side="right") - 1, 0, len(self.times) - 1))
+        if i == len(self.times) - 1 or t <= self.times[0]:
+            return self.lats[i].copy(), self.lons[i].copy()
+        frac = (t - self.times[i]) / (self.times[i + 1] - self.times[i])
+        return (self.lats[i] + (self.lats[i + 1] - self.lats[i]) * frac,
+                self.lons[i] + (self.lons[i + 1] - self.lons[i]) * frac)
+
+
+class MetricsWriter:
+    """Buffers per-tick metrics and appends them to CSV files every ``chunk_ticks`` ticks.
+
+    ``summary.csv`` has one row per tick with network-wide counts for the
+    interval since the previous tick. ``station_load.csv`` has one row per tick
+    and one column per station, holding the number of sessions it carries.
+    """
+
+    def __init__(self, directory: Union[str, Path], station_ids: Sequence[str],
+                 chunk_ticks: int = METRICS_CHUNK_TICKS):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.summary_path = self.directory / "summary.csv"
+        self.station_load_path = self.directory / "station_load.csv"
+        self.summary_path.write_text(",".join(SUMMARY_COLUMNS) + "\n")
+        self.station_load_path.write_text(",".join(["time_s", *station_ids]) + "\n")
+        self._summary = np.empty((chunk_ticks, len(SUMMARY_COLUMNS)))
+        self._loads = np.empty((chunk_ticks, len(station_ids) + 1))
+        self._rows = 0
+
+    def record(self, summary: Sequence[float], loads: np.ndarray) -> None:
+        self._summary[self._rows] = summary
+        self._loads[self._rows, 0] = summary[0]
+        self._loads[self._rows, 1:] = loads
+        self._rows += 1
+        if self._rows == len(self._summary):
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        with open(self.summary_path, "a") as f:
+            np.savetxt(f, self._summary[:self._rows], fmt=_SUMMARY_FORMAT, delimiter=",")
+        with open(self.station_load_path, "a") as f:
+            np.savetxt(f, self._loads[:self._rows], fmt=["%.1f"] + ["%d"] * (self._loads.shape[1] - 1),
+                       delimiter=",")
+        self._rows = 0
+
+
+class _ExponentialStream:
+    """Exponential draws served from a pre-sampled block, so single draws cost no NumPy call."""
+
+    def __init__(self, rng: np.random.Generator, mean: float, block: int = 65536):
+        self._rng, self._mean, self._block = rng, mean, block
+        self._values = []
+
+    def __call__(self) -> float:
+        if not self._values:
+            self._values = self._rng.exponential(self._mean, self._block).tolist()
+        return self._values.pop()
+
+
+@dataclass(slots=True)
+class SimulationTotals:
+    """Counts over a whole run, plus per-station statistics (arrays aligned with the simulated stations)."""
+    ticks: int
+    session_attempts: int
+    blocked_attaches: int
+    no_coverage: int
+    handovers: int
+    failed_handovers: int
+    dropped_sessions: int
+    peak_load: np.ndarray
+    mean_load: np.ndarray
+    station_blocked: np.ndarray
+    station_handovers_in: np.ndarray
+
+
+class LoadSimulation:
+    """Sessions, handovers and per-station load for a population of mobiles.
+
+    ``stations`` selects the snapshot rows that take part, defaulting to all
+    of them. Session and idle durations are exponential, with means
+    ``mean_session_s`` and ``mean_idle_s``.
+    """
+
+    def __init__(self, snapshot: BaseStationSnapshot, mobility, stations: Optional[np.ndarray] = None,
+                 tick_s: float = TICK_SECONDS, mean_session_s: float = 120.0, mean_idle_s: float = 600.0,
+                 seed=None):
+        self.stations = np.arange(len(snapshot)) if stations is None else np.asarray(stations, dtype=np.int64)
+        self.station_ids = [snapshot.stations[i].station_id for i in self.stations]
+        self._lat = snapshot.lat[self.stations]
+        self._lon = snapshot.lon[self.stations]
+        self._signal = snapshot.signal_strength_dbm[self.stations]
+        self._unit = unit_vectors(self._lat, self._lon)
+        self._weight = 10 ** (self._signal / (PATH_LOSS_DB_PER_DECADE / 2))
+        self.capacity = snapshot.capacity[self.stations]
+        self.mobility = mobility
+        self.tick_s = tick_s
+
+        rng = np.random.default_rng(seed)
+        self._rng = rng
+        self._session_length = _ExponentialStream(rng, mean_session_s)
+        self._idle_length = _ExponentialStream(rng, mean_idle_s)
+        self._mean_idle_s = mean_idle_s
+
+        n, s = mobility.mobiles, len(self.stations)
+        self.serving = np.full(n, -1, dtype=np.int64)
+        self._session_id = np.zeros(n, dtype=np.int64)
+        self._best = np.full(n, -1, dtype=np.int64)
+        self._best_dbm = np.full(n, NO_SIGNAL_DBM)
+        self.load = np.zeros(s, dtype=np.int64)
+        self._peak_load = np.zeros(s, dtype=np.int64)
+        self._load_sum = np.zeros(s, dtype=np.float64)
+        self._station_blocked = np.zeros(s, dtype=np.int64)
+        self._station_handovers_in = np.zeros(s, dtype=np.int64)
+        self._interval = dict.fromkeys(SUMMARY_COLUMNS[2:8], 0)
+        self._totals = dict.fromkeys(SUMMARY_COLUMNS[2:8], 0)
+        self._ticks = 0
+
+    # ------------------------------------------------------------------
+    # Radio
+    # ------------------------------------------------------------------
+
+    def best_servers(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Strongest simulated station and its received power for every mobile, in batches.
+
+        Positions become unit vectors, so ``(1 - p . s) / 2`` (the haversine
+        ``a`` term, monotonic in distance) comes from one matrix product per
+        batch. Stations are ranked by ``10**(dbm / k) / a`` as in
+        ``max_signal_grid``, so trigonometry and logarithms run once per mobile
+        rather than once per mobile and station.
+        """
+        best = np.full(len(lats), -1, dtype=np.int64)
+        best_dbm = np.full(len(lats), NO_SIGNAL_DBM)
+        if len(self.stations) == 0:
+            return best, best_dbm
+        points = unit_vectors(lats, lons)
+        min_a = np.sin(MIN_DISTANCE_KM / (2 * EARTH_RADIUS_KM)) ** 2
+        for start in range(0, len(lats), SERVER_CHUNK_MOBILES):
+            rows = slice(start, start + SERVER_CHUNK_MOBILES)
+            a = points[rows] @ self._unit.T
+            np.subtract(1.0, a, out=a)
+            a *= 0.5
+            np.maximum(a, min_a, out=a)
+            chosen = np.argmax(self._weight / a, axis=1)
+            best[rows] = chosen
+            distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a[np.arange(len(a)), chosen]))
+            best_dbm[rows] = received_signal_dbm(self._signal[chosen], distance)
+        return best, best_dbm
+
+    # ------------------------------------------------------------------
+    # Event handlers
+    # ------------------------------------------------------------------
+
+    def _session_start(self, queue: EventQueue, t: float, mobile: int) -> None:
+        self._interval["session_attempts"] += 1
+        station = int(self._best[mobile])
+        if self._best_dbm[mobile] < MIN_ATTACH_DBM:
+            self._interval["no_coverage"] += 1
+        elif self.load[station] >= self.capacity[station]:
+            self._interval["blocked_attaches"] += 1
+            self._station_blocked[station] += 1
+        else:
+            self.load[station] += 1
+            self.serving[mobile] = station
+            self._session_id[mobile] += 1
+            queue.push(t + self._session_length(), SESSION_END, (mobile, int(self._session_id[mobile])))
+            return
+        # Blocked: try again after another idle period
+        queue.push(t + self._idle_length(), SESSION_START, mobile)
+
+    def _session_end(self, queue: EventQueue, t: float, payload: Tuple[int, int]) -> None:
+        mobile, session = payload
+        if self._session_id[mobile] != session or self.serving[mobile] < 0:
+            return  # the session was dropped before it ended
+        self.load[self.serving[mobile]] -= 1
+        self.serving[mobile] = -1
+        queue.push(t + self._idle_length(), SESSION_START, mobile)
+
+    def _tick(self, queue: EventQueue, t: float, writer: Optional[MetricsWriter]) -> None:
+        lats, lons = self.mobility.positions(t)
+        self._best, self._best_dbm = self.best_servers(lats, lons)
+
+        active = np.flatnonzero(self.serving >= 0)
+        source = self.serving[active]
+        serving_dbm = received_signal_dbm(
+            self._signal[source], haversine_km(lats[active], lons[active], self._lat[source], self._lon[source])
+        )
+        target, target_dbm = self._best[active], self._best_dbm[active]
+        wants = (target != source) & (target_dbm >= serving_dbm + HANDOVER_HYSTERESIS_DB) & \
+                (target_dbm >= MIN_ATTACH_DBM)
+
+        # Admit handovers up to each target's free capacity, in random order
+        candidates = self._rng.permutation(np.flatnonzero(wants))
+        order = candidates[np.argsort(target[candidates], kind="stable")]
+        sorted_targets = target[order]
+        rank = np.arange(len(order)) - np.searchsorted(sorted_targets, sorted_targets, side="left")
+        free = self.capacity - self.load
+        accepted = order[rank < free[sorted_targets]]
+        rejected = order[rank >= free[sorted_targets]]
+        s = len(self.stations)
+        self.load += np.bincount(target[accepted], minlength=s) - np.bincount(source[accepted], minlength=s)
+        self.serving[active[accepted]] = target[accepted]
+        self._station_handovers_in += np.bincount(target[accepted], minlength=s)
+
+        # Sessions left on a signal too weak to hold are dropped
+        stays = np.ones(len(active), dtype=bool)
+        stays[accepted] = False
+        dropped = np.flatnonzero(stays & (serving_dbm < MIN_ATTACH_DBM))
+        self.load -= np.bincount(source[dropped], minlength=s)
+        dropped_mobiles = active[dropped]
+        self.serving[dropped_mobiles] = -1
+        self._session_id[dropped_mobiles] += 1
+        for mobile in dropped_mobiles.tolist():
+            queue.push(t + self._idle_length(), SESSION_START, mobile)
+
+        self._interval["handovers"] += len(accepted)
+        self._interval["failed_handovers"] += len(rejected)
+        self._interval["dropped_sessions"] += len(dropped)
+        np.maximum(self._peak_load, self.load, out=self._peak_load)
+        self._load_sum += self.load
+        self._ticks += 1
+        if writer is not None:
+            utilization = self.load / np.maximum(self.capacity, 1)
+            writer.record([
+                t, int(self.load.sum()), *self._interval.values(),
+                float(utilization.mean()) if s else 0.0, float(utilization.max()) if s else 0.0,
+                int(np.count_nonzero(self.load >= self.capacity))
+            ], self.load)
+        self._close_interval()
+
+    def _close_interval(self) -> None:
+        for key, value in self._interval.items():
+            self._totals[key] += value
+            self._interval[key] = 0
+
+    # ------------------------------------------------------------------
+    # Driver
+    # ------------------------------------------------------------------
+
+    def run(self, duration_s: float, metrics_dir: Union[str, Path, None] = None) -> SimulationTotals:
+        """Simulate ``duration_s`` seconds, streaming per-tick metrics to ``metrics_dir`` if given."""
+        writer = MetricsWriter(metrics_dir, self.station_ids) if metrics_dir is not None else None
+        queue = EventQueue()
+        queue.push(0.0, TICK)
+        # Every mobile starts idle
+        first_starts = self._rng.exponential(self._mean_idle_s, self.mobility.mobiles)
+        queue.extend(first_starts.tolist(), SESSION_START, range(self.mobility.mobiles))
+
+        while queue and queue.peek_time() <= duration_s:
+            t, kind, payload = queue.pop()
+            if kind == TICK:
+                self._tick(queue, t, writer)
+                queue.push(t + self.tick_s, TICK)
+            elif kind == SESSION_START:
+                self._session_start(queue, t, payload)
+            else:
+                self._session_end(queue, t, payload)
+        # Events after the last tick count towards the totals but get no summary row
+        self._close_interval()
+        if writer is not None:
+            writer.flush()
+
+        return SimulationTotals(
+            ticks=self._ticks,
+            **self._totals,
+            peak_load=self._peak_load.copy(),
+            mean_load=self._load_sum / max(self._ticks, 1),
+            station_blocked=self._station_blocked.copy(),
+            station_handovers_in=self._station_handovers_in.copy()
+        )
@@ -0,0 +1,14 @@
+"""Radio propagation model shared by the base-station server and its shard workers."""
+import numpy as np
+
+# Received power falls off 35 dB per decade of distance (urban path-loss exponent 3.5).
+# A station's signal_strength_dbm is its received power at 1 km.
+PATH_LOSS_DB_PER_DECADE = 35.0
+MIN_DISTANCE_KM = 0.05
+NO_SIGNAL_DBM = -140.0
+
+
+def received_signal_dbm(signal_strength_dbm, distance_km):
+    """Received power (dBm) at a distance from a station, broadcast by NumPy."""
+    distance_km = np.maximum(distance_km, MIN_DISTANCE_KM)
+    return signal_strength_dbm - PATH_LOSS_DB_PER_DECADE * np.log10(distance_km)
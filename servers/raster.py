@@ -0,0 +1,130 @@
+"""Region extraction from boolean grids.
+
+Used to turn a per-cell coverage mask into merged polygons. Grid cell
+``(r, c)`` spans nodes ``(r, c)`` to ``(r + 1, c + 1)``, where rows increase
+northward and columns eastward. Rings are returned in node coordinates.
+Outer rings run counter-clockwise and holes clockwise.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+Node = Tuple[int, int]
+
+# Direction vectors as (d_row, d_col) for an edge, and the preferred turn order:
+# left first, so that diagonally touching cells stay in separate rings (4-connectivity).
+_LEFT = {(0, 1): (1, 0), (1, 0): (0, -1), (0, -1): (-1, 0), (-1, 0): (0, 1)}
+_RIGHT = {v: k for k, v in _LEFT.items()}
+
+
+def label_regions(mask: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Label 4-connected ``True`` regions; returns ``(labels, count)`` with 0 as background.
+
+    Works on horizontal runs rather than cells: runs are found with NumPy,
+    and only runs (far fewer than cells) go through union-find.
+    """
+    rows, cols = mask.shape
+    edges = np.diff(np.pad(mask, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+    run_row, run_start = np.nonzero(edges == 1)
+    run_end = np.nonzero(edges == -1)[1]
+    row_first = np.searchsorted(run_row, np.arange(rows + 1))
+
+    parent = list(range(len(run_row)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Runs in adjacent rows are connected when their column ranges overlap
+    for r in range(rows - 1):
+        lo, hi = row_first[r], row_first[r + 1]
+        below_lo, below_hi = row_first[r + 1], row_first[r + 2]
+        if lo == hi or below_lo == below_hi:
+            continue
+        starts, ends = run_start[lo:hi], run_end[lo:hi]
+        first = np.searchsorted(ends, run_start[below_lo:below_hi], side="right")
+        last = np.searchsorted(starts, run_end[below_lo:below_hi], side="left")
+        for j, (overlap_first, overlap_last) in enumerate(zip(first.tolist(), last.tolist())):
+            for i in range(lo + overlap_first, lo + overlap_last):
+                root_i, root_j = find(i), find(below_lo + j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    labels = np.zeros(mask.shape, dtype=np.int32)
+    label_of_root = {}
+    for i, (r, start, end) in enumerate(zip(run_row.tolist(), run_start.tolist(), run_end.tolist())):
+        root = find(i)
+        label = label_of_root.setdefault(root, len(label_of_root) + 1)
+        labels[r, start:end] = label
+    return labels, len(label_of_root)
+
+
+def _boundary_edges(mask: np.ndarray) -> Dict[Node, List[Node]]:
+    """Directed boundary edges with the region on the left, keyed by start node."""
+    padded = np.pad(mask, 1)
+    inside = padded[1:-1, 1:-1]
+    edges: Dict[Node, List[Node]] = {}
+
+    def add(rows, cols, start, end):
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            edges.setdefault((r + start[0], c + start[1]), []).append((r + end[0], c + end[1]))
+
+    south = np.nonzero(inside & ~padded[:-2, 1:-1])
+    east = np.nonzero(inside & ~padded[1:-1, 2:])
+    north = np.nonzero(inside & ~padded[2:, 1:-1])
+    west = np.nonzero(inside & ~padded[1:-1, :-2])
+    add(*south, (0, 0), (0, 1))
+    add(*east, (0, 1), (1, 1))
+    add(*north, (1, 1), (1, 0))
+    add(*west, (1, 0), (0, 0))
+    return edges
+
+
+def trace_rings(mask: np.ndarray) -> List[np.ndarray]:
+    """Trace the boundary of ``mask`` into closed rings of ``(row, col)`` nodes.
+
+    Collinear nodes are dropped, so each ring lists only its corners. The
+    first node is not repeated at the end.
+    """
+    edges = _boundary_edges(mask)
+    rings = []
+    while edges:
+        start = next(iter(edges))
+        ring = [start]
+        node, direction = start, None
+        while True:
+            targets = edges[node]
+            if direction is None or len(targets) == 1:
+                target = targets[0]
+            else:
+                preferred = [_LEFT[direction], direction, _RIGHT[direction]]
+                target = min(targets, key=lambda t: preferred.index((t[0] - node[0], t[1] - node[1])))
+            targets.remove(target)
+            if not targets:
+                del edges[node]
+            new_direction = (target[0] - node[0], target[1] - node[1])
+            if new_direction == direction:
+                ring[-1] = target
+            else:
+                ring.append(target)
+            node, direction = target, new_direction
+            if node == start:
+                break
+        ring.pop()
+        # The start node may sit mid-way along a straight side
+        if len(ring) > 2 and _collinear(ring[-1], ring[0], ring[1]):
+            ring.pop(0)
+        rings.append(np.asarray(ring, dtype=np.int64))
+    return rings
+
+
+def _collinear(a: Node, b: Node, c: Node) -> bool:
+    return (b[0] - a[0]) * (c[1] - b[1]) == (b[1] - a[1]) * (c[0] - b[0])
+
+
+def signed_area(ring: np.ndarray) -> float:
+    """Shoelace area in node units; positive for counter-clockwise rings."""
+    rows, cols = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(cols, np.roll(rows, -1)) - np.dot(rows, np.roll(cols, -1)))
@@ -0,0 +1,275 @@
+"""Cable-cut resilience analysis on the country-level cable graph.
+
+Countries are nodes and every cable is an undirected edge weighted by its
+length, so parallel cables between two countries are separate edges. Monte
+Carlo scenarios fail each cable independently with probability equal to its
+``outage_risk``. Shortest paths for a whole batch of scenarios are computed
+together by Bellman-Ford relaxations over ``(nodes, scenarios)`` arrays, so
+there is no Python loop per scenario. Batches can be spread across a
+process pool whose workers read the edge table from shared memory.
+
+Edge-disjoint paths and the minimum cut between two countries come from a
+unit-capacity min-cost flow. It runs once per query on a graph with four arcs
+per cable, so its residual graph is built and searched with plain Python loops.
+"""
+import multiprocessing as mp
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from servers.datasets import CableSnapshot
+
+# Scenarios evaluated per Bellman-Ford batch (bounds the (nodes, scenarios) arrays);
+# batches are also the unit of work handed to pool workers
+BATCH_SCENARIOS = 25000
+
+# Set in each worker process by _attach_graph
+_graph_block = None
+_graph_edges: Optional[np.ndarray] = None
+_graph_nodes = 0
+
+
+def shortest_distances(edges: np.ndarray, node_count: int, source: int, target: int,
+                       alive: np.ndarray) -> np.ndarray:
+    """Shortest ``source``-``target`` distance for each scenario; ``inf`` when disconnected.
+
+    ``edges`` has rows ``(u, v, length_km, risk)``. ``alive`` is an
+    ``(edges, scenarios)`` boolean matrix.
+    """
+    scenarios = alive.shape[1]
+    dist = np.full((node_count, scenarios), np.inf)
+    dist[source] = 0.0
+    u = edges[:, 0].astype(np.int64)
+    v = edges[:, 1].astype(np.int64)
+    length = edges[:, 2]
+    candidate = np.empty(scenarios)
+    for _ in range(node_count - 1):
+        changed = False
+        for e in range(len(edges)):
+            for a, b in ((u[e], v[e]), (v[e], u[e])):
+                np.add(dist[a], length[e], out=candidate)
+                candidate[~alive[e]] = np.inf
+                improved = candidate < dist[b]
+                if improved.any():
+                    dist[b][improved] = candidate[improved]
+                    changed = True
+        if not changed:
+            break
+    return dist[target]
+
+
+def batch_seeds(scenarios: int, seed) -> List[Tuple[int, np.random.SeedSequence]]:
+    """``(size, seed)`` per batch of scenarios.
+
+    Batch boundaries and seeds depend only on ``scenarios`` and ``seed``, so a
+    run gives the same result in process and on a pool of any size.
+    """
+    sizes = [min(BATCH_SCENARIOS, scenarios - start) for start in range(0, scenarios, BATCH_SCENARIOS)]
+    return list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+
+def simulate_batch(edges: np.ndarray, node_count: int, source: int, target: int,
+                   scenarios: int, seed) -> np.ndarray:
+    """Draw ``scenarios`` failure patterns and return the shortest distance under each."""
+    alive = np.random.default_rng(seed).random((len(edges), scenarios)) >= edges[:, 3:4]
+    return shortest_distances(edges, node_count, source, target, alive)
+
+
+def simulate(edges: np.ndarray, node_count: int, source: int, target: int,
+             scenarios: int, seed) -> np.ndarray:
+    """Shortest distance under each of ``scenarios`` failure patterns, batch by batch."""
+    return np.concatenate([simulate_batch(edges, node_count, source, target, n, s)
+                           for n, s in batch_seeds(scenarios, seed)])
+
+
+def _attach_graph(name: str, edge_count: int, node_count: int) -> None:
+    """Worker initializer: map the shared edge table."""
+    global _graph_block, _graph_edges, _graph_nodes
+    _graph_block = shared_memory.SharedMemory(name=name)
+    # Workers share the parent's resource tracker and must not unregister the block;
+    # the parent unlinks it when the pool is released
+    _graph_edges = np.ndarray((edge_count, 4), dtype=np.float64, buffer=_graph_block.buf)
+    _graph_nodes = node_count
+
+
+def _simulate_in_worker(source: int, target: int, scenarios: int, seed) -> np.ndarray:
+    return simulate_batch(_graph_edges, _graph_nodes, source, target, scenarios, seed)
+
+
+def _release(executor: ProcessPoolExecutor, block: shared_memory.SharedMemory) -> None:
+    executor.shutdown(wait=True)
+    block.close()
+    block.unlink()
+
+
+@dataclass(frozen=True, slots=True)
+class FlowPath:
+    """A path found by ``CableGraph.disjoint_paths``."""
+    nodes: Tuple[int, ...]
+    edges: Tuple[int, ...]
+    length_km: float
+
+
+class CableGraph:
+    """Country-level cable graph for one dataset snapshot."""
+
+    def __init__(self, snapshot: CableSnapshot, workers: int = 0):
+        self.version = snapshot.version
+        self.countries: List[str] = []
+        self._node_of: Dict[str, int] = {}
+        rows = []
+        for cable, risk in zip(snapshot.cable_info, snapshot.outage_risk):
+            u, v = self._node(cable.country_a), self._node(cable.country_b)
+            rows.append((u, v, cable.distance_km, risk))
+        self.cable_names = [cable.cable_name for cable in snapshot.cable_info]
+        self.edges = np.asarray(rows, dtype=np.float64).reshape(-1, 4)
+        self.edges.flags.writeable = False
+
+        self.workers = workers
+        self._executor = None
+        if workers > 0 and len(self.edges):
+            block = shared_memory.SharedMemory(create=True, size=self.edges.nbytes)
+            np.ndarray(self.edges.shape, dtype=np.float64, buffer=block.buf)[:] = self.edges
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=mp.get_context("spawn"),
+                initializer=_attach_graph, initargs=(block.name, len(self.edges), len(self.countries))
+            )
+            self._finalizer = weakref.finalize(self, _release, self._executor, block)
+
+    def _node(self, country: str) -> int:
+        key = country.casefold()
+        if key not in self._node_of:
+            self._node_of[key] = len(self.countries)
+            self.countries.append(country)
+        return self._node_of[key]
+
+    def node(self, country: str) -> int:
+        """Node index of a country; ``ValueError`` if no cable lands there."""
+        try:
+            return self._node_of[country.strip().casefold()]
+        except KeyError:
+            raise ValueError(f"No submarine cable lands in {country}") from None
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._finalizer()
+
+    # ------------------------------------------------------------------
+    # Monte Carlo
+    # ------------------------------------------------------------------
+
+    def baseline_distance(self, source: int, target: int) -> float:
+        alive = np.ones((len(self.edges), 1), dtype=bool)
+        return float(shortest_distances(self.edges, len(self.countries), source, target, alive)[0])
+
+    def simulate(self, source: int, target: int, scenarios: int, seed=None) -> np.ndarray:
+        """Shortest distance per failure scenario, on the process pool when configured.
+
+        Batches are seeded independently of the pool, so a given ``seed``
+        gives identical results with or without workers.
+        """
+        if source == target:
+            raise ValueError("Source and target must be different countries")
+        batches = batch_seeds(scenarios, seed)
+        if self._executor is None or len(batches) < 2:
+            return simulate(self.edges, len(self.countries), source, target, scenarios, seed)
+        futures = [self._executor.submit(_simulate_in_worker, source, target, n, s) for n, s in batches]
+        return np.concatenate([f.result() for f in futures])
+
+    # ------------------------------------------------------------------
+    # Disjoint paths and minimum cut
+    # ------------------------------------------------------------------
+
+    def disjoint_paths(self, source: int, target: int, k: int = None) -> Tuple[List[FlowPath], List[int]]:
+        """Up to ``k`` (default: all) edge-disjoint paths, shortest total length, and the min-cut edges.
+
+        Successive shortest augmenting paths on a unit-capacity min-cost flow;
+        each cable is an arc in both directions with capacity 1.
+        """
+        if source == target:
+            raise ValueError("Source and target must be different countries")
+        node_count = len(self.countries)
+        # Arc i and i ^ 1 are residual twins; arcs 4e..4e+3 belong to cable e
+        heads, costs, capacity, arcs_from = [], [], [], [[] for _ in range(node_count)]
+        for e, (u, v, length, _) in enumerate(self.edges):
+            u, v = int(u), int(v)
+            for a, b in ((u, v), (v, u)):
+                arcs_from[a].append(len(heads))
+                heads.append(b)
+                costs.append(length)
+                capacity.append(1)
+                arcs_from[b].append(len(heads))
+                heads.append(a)
+                costs.append(-length)
+                capacity.append(0)
+        tails = [0] * len(heads)
+        for node, arcs in enumerate(arcs_from):
+            for arc in arcs:
+                tails[arc] = node
+
+        # Every augmenting path uses a distinct cable, so the flow never exceeds the cable count
+        limit = len(self.edges) if k is None else min(k, len(self.edges))
+        flow, maximal = 0, False
+        while flow < limit:
+            # Bellman-Ford on the residual graph (it has negative-cost arcs)
+            dist = [np.inf] * node_count
+            via = [-1] * node_count
+            dist[source] = 0.0
+            for _ in range(node_count - 1):
+                changed = False
+                for arc, head in enumerate(heads):
+                    tail = tails[arc]
+                    if capacity[arc] and dist[tail] + costs[arc] < dist[head] - 1e-9:
+                        dist[head] = dist[tail] + costs[arc]
+                        via[head] = arc
+                        changed = True
+                if not changed:
+                    break
+            if dist[target] == np.inf:
+                maximal = True
+                break
+            node = target
+            while node != source:
+                arc = via[node]
+                capacity[arc] -= 1
+                capacity[arc ^ 1] += 1
+                node = tails[arc]
+            flow += 1
+
+        # Decompose: follow saturated forward arcs from the source
+        used = [arc for arc in range(0, len(heads), 2) if capacity[arc] == 0]
+        out: Dict[int, List[int]] = {}
+        for arc in used:
+            out.setdefault(tails[arc], []).append(arc)
+        paths = []
+        for _ in range(flow):
+            node, nodes, edges = source, [source], []
+            while node != target:
+                arc = out[node].pop()
+                edges.append(arc // 4)
+                node = heads[arc]
+                nodes.append(node)
+            length = float(self.edges[edges, 2].sum())
+            paths.append(FlowPath(tuple(nodes), tuple(edges), length))
+        paths.sort(key=lambda p: p.length_km)
+
+        # Minimum cut: cables crossing from the residual-reachable side, valid once flow is maximal
+        if maximal or flow == len(self.edges):
+            reachable = {source}
+            stack = [source]
+            while stack:
+                node = stack.pop()
+                for arc in arcs_from[node]:
+                    if capacity[arc] and heads[arc] not in reachable:
+                        reachable.add(heads[arc])
+                        stack.append(heads[arc])
+            cut = [e for e, (u, v, _, _) in enumerate(self.edges)
+                   if (int(u) in reachable) != (int(v) in reachable)]
+        else:
+            # Only k paths were wanted; rerun to maximal flow, which always takes the branch above
+            _, cut = self.disjoint_paths(source, target)
+        return paths, cut
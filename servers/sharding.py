@@ -0,0 +1,151 @@
+"""Geographic sharding of base-station queries across worker processes.
+
+Stations are bucketed into square lat/lon tiles, and tiles are packed into
+shards of roughly equal size. Each shard's columns are copied once into a
+``SharedMemory`` block. A dedicated worker process attaches to the block
+zero-copy, so CPU-bound radius and best-server queries run in parallel instead
+of being serialized by the GIL. Radius queries go only to the shards whose
+tiles the search circle overlaps. Best-server queries fan out to every shard.
+In both cases the partial results are merged in the parent.
+
+An index belongs to one dataset snapshot. Worker processes and shared memory
+are released when the index is garbage collected, so a hot reload can build a
+new index while queries still running on the old one finish undisturbed.
+"""
+import multiprocessing as mp
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from servers.datasets import BaseStationSnapshot, tiles_overlapping
+from servers.geodesy import KM_PER_DEGREE_LAT, haversine_km
+from servers.propagation import received_signal_dbm
+
+# Columns stored per shard, in order
+_COLUMNS = ("lat", "lon", "signal_strength_dbm", "index")
+
+# Set in each worker process by _attach_shard
+_shard_block = None
+_shard_columns: Dict[str, np.ndarray] = {}
+
+
+def _attach_shard(name: str, size: int) -> None:
+    """Worker initializer: map the shard's shared-memory block as NumPy columns."""
+    global _shard_block, _shard_columns
+    _shard_block = shared_memory.SharedMemory(name=name)
+    # Workers share the parent's resource tracker and must not unregister the block;
+    # the parent unlinks it when the pool is released
+    data = np.ndarray((len(_COLUMNS), size), dtype=np.float64, buffer=_shard_block.buf)
+    _shard_columns = dict(zip(_COLUMNS, data))
+
+
+def _shard_within(lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+    columns = _shard_columns
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    lo = np.searchsorted(columns["lat"], lat - dlat, side="left")
+    hi = np.searchsorted(columns["lat"], lat + dlat, side="right")
+    distances = haversine_km(lat, lon, columns["lat"][lo:hi], columns["lon"][lo:hi])
+    keep = distances <= radius_km
+    return columns["index"][lo:hi][keep].astype(np.int64), distances[keep]
+
+
+def _shard_best_server(lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    columns = _shard_columns
+    distances = haversine_km(lats[:, None], lons[:, None], columns["lat"][None, :], columns["lon"][None, :])
+    dbm = received_signal_dbm(columns["signal_strength_dbm"][None, :], distances)
+    best = np.argmax(dbm, axis=1)
+    rows = np.arange(len(lats))
+    return columns["index"][best].astype(np.int64), dbm[rows, best], distances[rows, best]
+
+
+def _release(executors: List[ProcessPoolExecutor], blocks: List[shared_memory.SharedMemory]) -> None:
+    for executor in executors:
+        executor.shutdown(wait=True)
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+class ShardedStationIndex:
+    """Base-station radius and best-server queries scattered across worker processes."""
+
+    def __init__(self, snapshot: BaseStationSnapshot, workers: int = None, tile_deg: float = 1.0):
+        self.version = snapshot.version
+        self.tile_deg = tile_deg
+
+        tile_lat = np.floor(snapshot.lat / tile_deg).astype(np.int64)
+        tile_lon = np.floor(snapshot.lon / tile_deg).astype(np.int64)
+        tiles, tile_of_station = np.unique(np.stack([tile_lat, tile_lon], axis=1), axis=0, return_inverse=True)
+        tile_of_station = tile_of_station.reshape(-1)
+        counts = np.bincount(tile_of_station, minlength=len(tiles))
+
+        # Greedy balance: largest tiles first, each onto the currently smallest shard
+        workers = max(1, min(workers or os.cpu_count() or 1, len(tiles)))
+        shard_sizes = [0] * workers
+        shard_of_tile = np.empty(len(tiles), dtype=np.int64)
+        for tile in np.argsort(-counts, kind="stable"):
+            shard = shard_sizes.index(min(shard_sizes))
+            shard_of_tile[tile] = shard
+            shard_sizes[shard] += int(counts[tile])
+        self._tiles = tiles
+        self._shard_of_tile = shard_of_tile
+
+        context = mp.get_context("spawn")
+        self._executors: List[ProcessPoolExecutor] = []
+        self._blocks: List[shared_memory.SharedMemory] = []
+        shard_of_station = shard_of_tile[tile_of_station]
+        for shard in range(workers):
+            # Snapshot rows are sorted by latitude, so each shard's rows are too
+            rows = np.flatnonzero(shard_of_station == shard)
+            block = shared_memory.SharedMemory(create=True, size=max(1, len(_COLUMNS) * len(rows) * 8))
+            data = np.ndarray((len(_COLUMNS), len(rows)), dtype=np.float64, buffer=block.buf)
+            data[0], data[1] = snapshot.lat[rows], snapshot.lon[rows]
+            data[2], data[3] = snapshot.signal_strength_dbm[rows], rows
+            self._blocks.append(block)
+            self._executors.append(ProcessPoolExecutor(
+                max_workers=1, mp_context=context,
+                initializer=_attach_shard, initargs=(block.name, len(rows))
+            ))
+        self._finalizer = weakref.finalize(self, _release, self._executors, self._blocks)
+
+    @property
+    def shards(self) -> int:
+        return len(self._executors)
+
+    def shards_for(self, lat: float, lon: float, radius_km: float) -> List[int]:
+        """Shards owning a tile that the search circle's bounding box overlaps."""
+        hit = tiles_overlapping(self._tiles, self.tile_deg, lat, lon, radius_km)
+        return sorted(set(self._shard_of_tile[hit].tolist()))
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Same contract as ``BaseStationSnapshot.within``: snapshot indices and distances, nearest first."""
+        futures = [self._executors[s].submit(_shard_within, lat, lon, radius_km)
+                   for s in self.shards_for(lat, lon, radius_km)]
+        parts = [f.result() for f in futures]
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        indices = np.concatenate([p[0] for p in parts])
+        distances = np.concatenate([p[1] for p in parts])
+        order = np.lexsort((indices, distances))
+        return indices[order], distances[order]
+
+    def best_server(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Same contract as ``basestation_server.best_server``, merged across all shards."""
+        lats = np.ascontiguousarray(lats, dtype=np.float64)
+        lons = np.ascontiguousarray(lons, dtype=np.float64)
+        futures = [executor.submit(_shard_best_server, lats, lons) for executor in self._executors]
+        parts = [f.result() for f in futures]
+        dbm = np.stack([p[1] for p in parts])
+        winner = np.argmax(dbm, axis=0)
+        columns = np.arange(len(lats))
+        best = np.stack([p[0] for p in parts])[winner, columns]
+        distance = np.stack([p[2] for p in parts])[winner, columns]
+        return best, dbm[winner, columns], distance
+
+    def close(self) -> None:
+        """Stop the workers and free shared memory now instead of at garbage collection."""
+        self._finalizer()
@@ -1,75 +1,208 @@
+import threading
+
+import numpy as np
 from agents import function_tool
-from typing import List, Dict, Any
+from models import (
+    LandingStationResponse, CableRoute, NearbyCablesResponse,
+    CableLatencyResponse, CableOutageRiskResponse,
+    CableResilienceResponse, CablePath, DisjointCablePathsResponse
+)
+from servers.datasets import SUBMARINE_CABLES_PATH, CableSnapshot, DatasetManager, load_submarine_cables
+from servers.resilience import CableGraph
+
+# Light travels through fiber at roughly 200 km per millisecond
+FIBER_KM_PER_MS = 200
+
+# Cables within this distance contribute to a location's outage risk
+OUTAGE_RISK_RADIUS_KM = 500
+BASELINE_OUTAGE_RISK = 0.05
+
+# Monte Carlo scenarios drawn by cable_resilience unless the caller asks otherwise
+DEFAULT_RESILIENCE_SCENARIOS = 100000
+MAX_RESILIENCE_SCENARIOS = 1000000
+
+
+def risk_level(score: float) -> str:
+    if score < 0.1:
+        return "low"
+    if score < 0.25:
+        return "medium"
+    return "high"
+
 
 class SubmarineCablesServer:
 
-    def _locate_landing_station_impl(self, country: str) -> Dict[str, Any]:
+    def __init__(self, datasets: DatasetManager[CableSnapshot] = None, resilience_workers: int = 0):
+        """Serve from ``datasets``; with ``resilience_workers`` > 0, Monte Carlo runs on a process pool.
+
+        ``datasets`` may hold a ``CableSnapshot`` or a tiled dataset (``servers.tiles``).
+        """
+        self.datasets = datasets or DatasetManager(SUBMARINE_CABLES_PATH, load_submarine_cables)
+        self.resilience_workers = resilience_workers
+        self._graph = None
+        self._graph_lock = threading.Lock()
+
+    @property
+    def dataset_version(self) -> str:
+        return self.datasets.version
+
+    def close(self) -> None:
+        """Shut down the resilience process pool, if any."""
+        with self._graph_lock:
+            if self._graph is not None:
+                self._graph.close()
+                self._graph = None
+
+    def _cable_graph(self, snapshot: CableSnapshot) -> CableGraph:
+        """The cable graph for ``snapshot``, rebuilt when the dataset version changes."""
+        with self._graph_lock:
+            if self._graph is None or self._graph.version != snapshot.version:
+                # The old graph's pool shuts down once in-flight analyses release it
+                self._graph = CableGraph(snapshot, self.resilience_workers)
+            return self._graph
+
+    @staticmethod
+    def _country_pair(graph: CableGraph, country_a: str, country_b: str):
+        """Graph nodes of two distinct countries."""
+        source, target = graph.node(country_a), graph.node(country_b)
+        if source == target:
+            raise ValueError(f"{country_a} and {country_b} are the same country")
+        return source, target
+
+    def _locate_landing_station_impl(self, country: str) -> LandingStationResponse:
         """Return landing stations associated with a country."""
-        return {
-            "country": country,
-            "landing_stations": [
-                {"name": "Main Landing Point", "lat": 12.11, "lon": 44.22},
-                {"name": "Backup Landing Point", "lat": 14.55, "lon": 40.81}
-            ]
-        }
+        stations = list(self.datasets.snapshot.landing_stations_in(country))
+        return LandingStationResponse(stations=stations, count=len(stations))
 
     @function_tool
-    def locate_landing_station(self, country: str) -> Dict[str, Any]:
+    def locate_landing_station(self, country: str) -> LandingStationResponse:
         """Return landing stations associated with a country."""
         return self._locate_landing_station_impl(country)
 
-    def _cable_route_between_impl(self, country_a: str, country_b: str) -> Dict[str, Any]:
+    def _cable_route_between_impl(self, country_a: str, country_b: str) -> CableRoute:
         """Return approximate cable path between two countries."""
-        return {
-            "from": country_a,
-            "to": country_b,
-            "distance_km": 8200,
-            "path_coordinates": [(10, 20), (15, 30), (25, 40)]
-        }
+        cables = self.datasets.snapshot.cables_between(country_a, country_b)
+        if not cables:
+            raise ValueError(f"No submarine cable directly connects {country_a} and {country_b}")
+        return min(cables, key=lambda c: c.distance_km)
 
     @function_tool
-    def cable_route_between(self, country_a: str, country_b: str) -> Dict[str, Any]:
+    def cable_route_between(self, country_a: str, country_b: str) -> CableRoute:
         """Return approximate cable path between two countries."""
         return self._cable_route_between_impl(country_a, country_b)
 
-    def _list_cables_near_impl(self, lat: float, lon: float, radius_km: float) -> Dict[str, Any]:
+    def _list_cables_near_impl(self, lat: float, lon: float, radius_km: float) -> NearbyCablesResponse:
         """List submarine cables near a given location."""
-        return {
-            "center": (lat, lon),
-            "radius_km": radius_km,
-            "cables": ["Cable Alpha", "Cable Beta"]
-        }
+        snapshot = self.datasets.snapshot
+        indices, _ = snapshot.cables_within(lat, lon, radius_km)
+        cables = [snapshot.cable_info[i].cable_name for i in indices]
+        return NearbyCablesResponse(lat=lat, lon=lon, radius_km=radius_km, cables=cables, count=len(cables))
 
     @function_tool
-    def list_cables_near(self, lat: float, lon: float, radius_km: float) -> Dict[str, Any]:
+    def list_cables_near(self, lat: float, lon: float, radius_km: float) -> NearbyCablesResponse:
         """List submarine cables near a given location."""
         return self._list_cables_near_impl(lat, lon, radius_km)
 
-    def _cable_latency_estimate_impl(self, country_a: str, country_b: str) -> Dict[str, Any]:
+    def _cable_latency_estimate_impl(self, country_a: str, country_b: str) -> CableLatencyResponse:
         """Estimate latency of cable route between countries."""
-        distance = 8200
-        latency_ms = round(distance / 200, 2)
-        return {
-            "from": country_a,
-            "to": country_b,
-            "distance_km": distance,
-            "estimated_latency_ms": latency_ms
-        }
+        distance = self._cable_route_between_impl(country_a, country_b).distance_km
+        latency_ms = round(distance / FIBER_KM_PER_MS, 2)
+        return CableLatencyResponse(
+            country_a=country_a,
+            country_b=country_b,
+            estimated_latency_ms=latency_ms,
+            distance_km=distance
+        )
 
     @function_tool
-    def cable_latency_estimate(self, country_a: str, country_b: str) -> Dict[str, Any]:
+    def cable_latency_estimate(self, country_a: str, country_b: str) -> CableLatencyResponse:
         """Estimate latency of cable route between countries."""
         return self._cable_latency_estimate_impl(country_a, country_b)
 
-    def _cable_outage_risk_impl(self, lat: float, lon: float) -> Dict[str, Any]:
+    def _cable_outage_risk_impl(self, lat: float, lon: float) -> CableOutageRiskResponse:
         """Return outage risk score for an ocean coordinate."""
-        return {
-            "location": (lat, lon),
-            "risk_score": 0.32,
-            "description": "Low seismic activity, stable depth"
-        }
+        snapshot = self.datasets.snapshot
+        indices, _ = snapshot.cables_within(lat, lon, OUTAGE_RISK_RADIUS_KM)
+        score = max([BASELINE_OUTAGE_RISK] + [float(snapshot.outage_risk[i]) for i in indices])
+        return CableOutageRiskResponse(
+            lat=lat,
+            lon=lon,
+            risk_score=round(score, 3),
+            risk_level=risk_level(score),
+            nearby_cables=[snapshot.cable_info[i].cable_name for i in indices]
+        )
 
     @function_tool
-    def cable_outage_risk(self, lat: float, lon: float) -> Dict[str, Any]:
+    def cable_outage_risk(self, lat: float, lon: float) -> CableOutageRiskResponse:
         """Return outage risk score for an ocean coordinate."""
         return self._cable_outage_risk_impl(lat, lon)
+
+    def _cable_resilience_impl(self, country_a: str, country_b: str,
+                               scenarios: int = DEFAULT_RESILIENCE_SCENARIOS, seed: int = None) -> CableResilienceResponse:
+        """Estimate how likely cable cuts disconnect two countries, and the latency impact."""
+        scenarios = max(1, min(int(scenarios), MAX_RESILIENCE_SCENARIOS))
+        graph = self._cable_graph(self.datasets.snapshot)
+        source, target = self._country_pair(graph, country_a, country_b)
+        baseline = graph.baseline_distance(source, target)
+        if not np.isfinite(baseline):
+            raise ValueError(f"No cable path connects {country_a} and {country_b}")
+
+        distances = graph.simulate(source, target, scenarios, seed)
+        connected = distances[np.isfinite(distances)] / FIBER_KM_PER_MS
+        baseline_ms = baseline / FIBER_KM_PER_MS
+        stats = {}
+        if len(connected):
+            p50, p90, p99 = np.percentile(connected, [50, 90, 99])
+            stats = dict(
+                mean_latency_ms=round(float(connected.mean()), 2),
+                p50_latency_ms=round(float(p50), 2),
+                p90_latency_ms=round(float(p90), 2),
+                p99_latency_ms=round(float(p99), 2),
+                mean_degradation_ms=round(float(connected.mean() - baseline_ms), 2)
+            )
+        return CableResilienceResponse(
+            country_a=country_a,
+            country_b=country_b,
+            scenarios=scenarios,
+            disconnection_probability=round(1 - len(connected) / scenarios, 6),
+            baseline_latency_ms=round(baseline_ms, 2),
+            mean_latency_ms=stats.get("mean_latency_ms"),
+            p50_latency_ms=stats.get("p50_latency_ms"),
+            p90_latency_ms=stats.get("p90_latency_ms"),
+            p99_latency_ms=stats.get("p99_latency_ms"),
+            mean_degradation_ms=stats.get("mean_degradation_ms")
+        )
+
+    @function_tool
+    def cable_resilience(self, country_a: str, country_b: str,
+                         scenarios: int = DEFAULT_RESILIENCE_SCENARIOS) -> CableResilienceResponse:
+        """Estimate how likely cable cuts disconnect two countries, and the latency impact."""
+        return self._cable_resilience_impl(country_a, country_b, scenarios)
+
+    def _disjoint_cable_paths_impl(self, country_a: str, country_b: str, k: int = 3) -> DisjointCablePathsResponse:
+        """Return up to k cable paths sharing no cable, and the cables whose loss disconnects the pair."""
+        graph = self._cable_graph(self.datasets.snapshot)
+        source, target = self._country_pair(graph, country_a, country_b)
+        flow_paths, cut = graph.disjoint_paths(source, target, max(1, k))
+        paths = [
+            CablePath(
+                countries=[graph.countries[n] for n in p.nodes],
+                cables=[graph.cable_names[e] for e in p.edges],
+                distance_km=round(p.length_km, 1),
+                latency_ms=round(p.length_km / FIBER_KM_PER_MS, 2)
+            )
+            for p in flow_paths
+        ]
+        return DisjointCablePathsResponse(
+            country_a=country_a,
+            country_b=country_b,
+            paths=paths,
+            count=len(paths),
+            min_cut_cables=[graph.cable_names[e] for e in cut],
+            min_cut_size=len(cut)
+        )
+
+    @function_tool
+    def disjoint_cable_paths(self, country_a: str, country_b: str, k: int = 3) -> DisjointCablePathsResponse:
+        """Return up to k cable paths sharing no cable, and the cables whose loss disconnects the pair."""
+        return self._disjoint_cable_paths_impl(country_a, country_b, k)
@@ -0,0 +1,548 @@
+"""Region-tiled, lazily loaded datasets with an LRU memory budget.
+
+For deployments that cannot hold a global dataset in memory, a dataset is
+split on disk into square lat/lon tiles next to a small ``manifest.json``.
+The manifest lists each tile and its summary statistics. For cables it also
+holds the per-cable attributes and landing stations, which are small.
+A tiled dataset implements the same query interface as its in-memory
+snapshot. Each query loads only the tiles its search area overlaps. Loaded
+tiles are kept in an LRU cache with a memory ceiling, and tiles left idle
+for ``idle_seconds`` are evicted, so hot regions are served from memory and
+the resident set stays bounded. Idle tiles are found on each cache access and,
+for datasets served through ``tiled_datasets``, on every poll of the manager's
+watch thread, so a cache nobody queries still drops them.
+
+The manifest is what a ``DatasetManager`` watches. Rebuilding writes tiles
+into a fresh version directory before replacing the manifest, so a hot
+reload never mixes tiles from two builds. The builder never deletes old
+builds: the serving process does, once no live snapshot reads from them.
+
+Build tiles with::
+
+    python -m servers.tiles --out data/tiles --tile-deg 1.0
+"""
+import argparse
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, Hashable, Iterable, List, Set, Tuple, Union
+
+import numpy as np
+
+from models import BaseStation, CableRoute, LandingStation
+from serialization import from_json, to_json_bytes
+from servers.datasets import (
+    BASE_STATIONS_PATH, SUBMARINE_CABLES_PATH, BaseStationSnapshot, CableInfo, DatasetManager,
+    _frozen, build_base_station_snapshot, content_version, load_base_stations,
+    load_submarine_cables, tiles_overlapping
+)
+from servers.geodesy import densify, haversine_km, segment_distance_km
+from servers.propagation import NO_SIGNAL_DBM, PATH_LOSS_DB_PER_DECADE, received_signal_dbm
+
+DEFAULT_TILE_DEG = 1.0
+DEFAULT_CACHE_BYTES = 256 * 2 ** 20
+DEFAULT_IDLE_SECONDS = 300.0
+
+# First search radius when looking for the best server around some points
+SERVING_SEARCH_KM = 10.0
+
+# Cable segments are sampled this finely, with this margin in degrees, to find every tile they cross
+SEGMENT_SAMPLE_KM = 10.0
+SEGMENT_TILE_MARGIN_DEG = 1e-3
+
+MANIFEST_NAME = "manifest.json"
+BASE_STATION_TILES = "base_stations"
+SUBMARINE_CABLE_TILES = "submarine_cables"
+
+
+def tile_key(lat: float, lon: float, tile_deg: float) -> Tuple[int, int]:
+    return int(np.floor(lat / tile_deg)), int(np.floor(lon / tile_deg))
+
+
+class TileCache:
+    """Thread-safe LRU of loaded tiles, bounded by estimated bytes and idle time.
+
+    A tile larger than the whole budget is still returned to its caller but
+    not kept. Tiles that queries are still using stay alive through their
+    references after eviction, so the budget bounds what the cache retains.
+    Eviction runs on every ``get``; call ``sweep`` periodically to also drop
+    idle tiles while no queries arrive.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES, idle_seconds: float = DEFAULT_IDLE_SECONDS):
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[object, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, load: Callable[[], Tuple[object, int]]):
+        """Return the tile for ``key``, calling ``load() -> (tile, nbytes)`` on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries[key] = (entry[0], entry[1], now)
+                self._entries.move_to_end(key)
+                self._evict(now)
+                return entry[0]
+            self.misses += 1
+        # Load outside the lock so other tiles stay readable; a racing load of the same tile is harmless
+        tile, nbytes = load()
+        with self._lock:
+            if key not in self._entries and nbytes <= self.max_bytes:
+                self._entries[key] = (tile, nbytes, now)
+                self.nbytes += nbytes
+            self._evict(now)
+        return tile
+
+    def sweep(self) -> None:
+        """Evict tiles idle for longer than ``idle_seconds``."""
+        with self._lock:
+            self._evict(time.monotonic())
+
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            key, (_, nbytes, last_used) = next(iter(self._entries.items()))
+            if self.nbytes <= self.max_bytes and now - last_used < self.idle_seconds:
+                break
+            del self._entries[key]
+            self.nbytes -= nbytes
+
+
+def _build_dir(directory: Path, build: str) -> Path:
+    """Create (or reuse) a build directory, marking it newer than the current manifest while it is written."""
+    path = directory / build
+    path.mkdir(parents=True, exist_ok=True)
+    os.utime(path)
+    return path
+
+
+def _write_manifest(directory: Path, manifest: dict) -> Path:
+    """Atomically replace the manifest; old builds are left for ``prune_builds``."""
+    path = directory / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(to_json_bytes(manifest))
+    os.replace(tmp, path)
+    return path
+
+
+def prune_builds(directory: Path, live_builds: Iterable[str]) -> None:
+    """Delete tile builds under ``directory`` that neither the manifest nor ``live_builds`` reference.
+
+    A build directory newer than the manifest is still being written by a
+    builder, so it is kept too.
+    """
+    path = directory / MANIFEST_NAME
+    written = path.stat().st_mtime_ns
+    keep = set(live_builds) | {from_json(path.read_bytes()).get("build")}
+    for child in directory.iterdir():
+        if child.is_dir() and child.name not in keep and child.stat().st_mtime_ns < written:
+            shutil.rmtree(child, ignore_errors=True)
+
+
+def _tile_file(key: Tuple[int, int]) -> str:
+    return f"{key[0]}_{key[1]}.json"
+
+
+# ============================================================================
+# BASE STATIONS
+# ============================================================================
+
+def build_base_station_tiles(out_dir: Union[str, Path], source: Union[str, Path] = BASE_STATIONS_PATH,
+                             tile_deg: float = DEFAULT_TILE_DEG) -> Path:
+    """Split a ``base_stations.json`` file into tiles; return the manifest path."""
+    snapshot = load_base_stations(source)
+    out_dir = Path(out_dir)
+    build = f"{snapshot.version}-{tile_deg:g}"
+    _build_dir(out_dir, build)
+
+    by_tile: Dict[Tuple[int, int], List[int]] = {}
+    for i, station in enumerate(snapshot.stations):
+        by_tile.setdefault(tile_key(station.lat, station.lon, tile_deg), []).append(i)
+    tiles = []
+    for key, rows in sorted(by_tile.items()):
+        file = f"{build}/{_tile_file(key)}"
+        (out_dir / file).write_bytes(to_json_bytes({"stations": [snapshot.stations[i] for i in rows]}))
+        tiles.append({
+            "key": key,
+            "file": file,
+            "count": len(rows),
+            "max_signal_dbm": float(snapshot.signal_strength_dbm[rows].max()),
+            "max_capacity": int(snapshot.capacity[rows].max())
+        })
+    return _write_manifest(out_dir, {"kind": BASE_STATION_TILES, "build": build, "tile_deg": tile_deg,
+                                     "tiles": tiles})
+
+
+def _merge_stations(parts: List[BaseStationSnapshot], version: str) -> BaseStationSnapshot:
+    """Combine latitude-sorted tiles into one latitude-sorted snapshot."""
+    if len(parts) == 1:
+        return parts[0]
+    lat = np.concatenate([p.lat for p in parts])
+    order = np.argsort(lat, kind="stable")
+    stations = [s for p in parts for s in p.stations]
+
+    def column(name):
+        return _frozen(np.concatenate([getattr(p, name) for p in parts])[order])
+
+    return BaseStationSnapshot(
+        version=version,
+        stations=tuple(stations[i] for i in order.tolist()),
+        lat=_frozen(lat[order]),
+        lon=column("lon"),
+        coverage_radius_km=column("coverage_radius_km"),
+        capacity=column("capacity"),
+        signal_strength_dbm=column("signal_strength_dbm")
+    )
+
+
+def _station_tile_nbytes(tile: BaseStationSnapshot) -> int:
+    columns = tile.lat.nbytes * 5
+    return columns + sum(sys.getsizeof(s) + sys.getsizeof(s.station_id) for s in tile.stations)
+
+
+class TiledBaseStations:
+    """Base stations served from on-disk tiles, with the query interface of ``BaseStationSnapshot``.
+
+    Regions are returned as ``BaseStationSnapshot`` objects holding the
+    stations of the overlapping tiles, so code written against a snapshot
+    works unchanged on them.
+    """
+
+    def __init__(self, manifest_path: Union[str, Path], max_bytes: int = DEFAULT_CACHE_BYTES,
+                 idle_seconds: float = DEFAULT_IDLE_SECONDS):
+        manifest_path = Path(manifest_path)
+        raw = manifest_path.read_bytes()
+        manifest = from_json(raw)
+        if manifest.get("kind") != BASE_STATION_TILES:
+            raise ValueError(f"{manifest_path} is not a base-station tile manifest")
+        self.version = content_version(raw)
+        self.directory = manifest_path.parent
+        self.build = manifest["build"]
+        self.tile_deg = float(manifest["tile_deg"])
+        tiles = manifest["tiles"]
+        self._keys = np.array([t["key"] for t in tiles], dtype=np.int64).reshape(-1, 2)
+        self._files = [t["file"] for t in tiles]
+        self._counts = np.array([t["count"] for t in tiles], dtype=np.int64)
+        self._max_signal = np.array([t["max_signal_dbm"] for t in tiles], dtype=np.float64)
+        self._max_capacity = np.array([t["max_capacity"] for t in tiles], dtype=np.int64)
+        self.cache = TileCache(max_bytes, idle_seconds)
+
+    def __len__(self) -> int:
+        return int(self._counts.sum())
+
+    @property
+    def max_signal_dbm(self) -> float:
+        return float(self._max_signal.max()) if len(self._files) else float("-inf")
+
+    def _tile(self, index: int) -> BaseStationSnapshot:
+        def load():
+            raw = (self.directory / self._files[index]).read_bytes()
+            stations = [BaseStation(**record) for record in from_json(raw)["stations"]]
+            tile = build_base_station_snapshot(stations, f"{self.version}:{self._files[index]}")
+            return tile, _station_tile_nbytes(tile)
+        return self.cache.get(index, load)
+
+    def _tiles(self, indices) -> BaseStationSnapshot:
+        indices = tuple(indices.tolist())
+        if not indices:
+            return build_base_station_snapshot([], f"{self.version}:empty")
+        if len(indices) == 1:
+            return self._tile(indices[0])
+
+        # Merged regions are cached too; they share station records with their tiles, so only columns count
+        def load():
+            region = _merge_stations([self._tile(i) for i in indices], f"{self.version}:region")
+            return region, region.lat.nbytes * 5 + sys.getsizeof(region.stations)
+        return self.cache.get(("region", indices), load)
+
+    def region(self, lat: float, lon: float, radius_km: float) -> BaseStationSnapshot:
+        return self._tiles(np.flatnonzero(tiles_overlapping(self._keys, self.tile_deg, lat, lon, radius_km)))
+
+    def serving_region(self, lats, lons) -> BaseStationSnapshot:
+        """Stations that can be the best server at any of the points, loaded by an expanding search.
+
+        Once the weakest point's current best signal is known, only a station
+        closer than the distance at which the strongest station in the
+        dataset would fall to that level could beat it. The search stops
+        once the loaded region covers that distance. Stations further away
+        than the reach of the strongest station down to ``NO_SIGNAL_DBM`` are
+        never loaded.
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+        center_lat, center_lon = float(lats.mean()), float(lons.mean())
+        extent = float(haversine_km(center_lat, center_lon, lats, lons).max())
+        strongest = self.max_signal_dbm
+        max_reach = 10 ** ((strongest - NO_SIGNAL_DBM) / PATH_LOSS_DB_PER_DECADE)
+
+        radius = min(SERVING_SEARCH_KM, max_reach)
+        while True:
+            region = self.region(center_lat, center_lon, extent + radius)
+            if len(region):
+                distances = haversine_km(lats[:, None], lons[:, None], region.lat[None, :], region.lon[None, :])
+                dbm = received_signal_dbm(region.signal_strength_dbm[None, :], distances)
+                weakest = float(dbm.max(axis=1).min())
+                needed = min(10 ** ((strongest - weakest) / PATH_LOSS_DB_PER_DECADE), max_reach)
+            else:
+                needed = min(radius * 4, max_reach)
+            if needed <= radius or radius >= max_reach:
+                return region
+            radius = needed
+
+    def with_capacity(self, min_capacity: int) -> BaseStationSnapshot:
+        return self._tiles(np.flatnonzero(self._max_capacity >= min_capacity))
+
+
+def open_base_station_tiles(manifest_path: Union[str, Path], max_bytes: int = DEFAULT_CACHE_BYTES,
+                            idle_seconds: float = DEFAULT_IDLE_SECONDS) -> TiledBaseStations:
+    return TiledBaseStations(manifest_path, max_bytes, idle_seconds)
+
+
+# ============================================================================
+# SUBMARINE CABLES
+# ============================================================================
+
+@dataclass(frozen=True, slots=True)
+class CableTile:
+    """Cable segments crossing one tile, one row per segment from waypoint 1 to waypoint 2."""
+    cable: np.ndarray
+    segment: np.ndarray
+    lat1: np.ndarray
+    lon1: np.ndarray
+    lat2: np.ndarray
+    lon2: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+
+def _segment_tiles(lat1: float, lon1: float, lat2: float, lon2: float, tile_deg: float) -> Set[Tuple[int, int]]:
+    """Keys of every tile the great-circle segment passes through, plus possibly some neighbours.
+
+    Each short step along the arc is covered by the tiles its lat/lon box
+    overlaps, widened by ``SEGMENT_TILE_MARGIN_DEG`` for the arc's bulge.
+    """
+    path = densify([[lat1, lon1], [lat2, lon2]], SEGMENT_SAMPLE_KM).tolist()
+    keys = set()
+    for (a_lat, a_lon), (b_lat, b_lon) in zip(path[:-1], path[1:]):
+        # Unwrap steps across the antimeridian; keys are wrapped back below
+        b_lon += 360.0 * np.round((a_lon - b_lon) / 360.0)
+        i_lo, j_lo = tile_key(min(a_lat, b_lat) - SEGMENT_TILE_MARGIN_DEG,
+                              min(a_lon, b_lon) - SEGMENT_TILE_MARGIN_DEG, tile_deg)
+        i_hi, j_hi = tile_key(max(a_lat, b_lat) + SEGMENT_TILE_MARGIN_DEG,
+                              max(a_lon, b_lon) + SEGMENT_TILE_MARGIN_DEG, tile_deg)
+        for j in range(j_lo, j_hi + 1):
+            lon = ((j + 0.5) * tile_deg + 180.0) % 360.0 - 180.0
+            keys.update((i, tile_key(0.0, lon, tile_deg)[1]) for i in range(i_lo, i_hi + 1))
+    return keys
+
+
+def build_submarine_cable_tiles(out_dir: Union[str, Path], source: Union[str, Path] = SUBMARINE_CABLES_PATH,
+                                tile_deg: float = DEFAULT_TILE_DEG) -> Path:
+    """Split a ``submarine_cables.json`` file into tiles of route segments; return the manifest path.
+
+    A segment is stored in every tile it crosses, so a radius search that
+    loads the tiles its circle overlaps sees every segment within reach. A
+    cable with a single waypoint is stored as one zero-length segment.
+    """
+    snapshot = load_submarine_cables(source)
+    out_dir = Path(out_dir)
+    build = f"{snapshot.version}-{tile_deg:g}"
+    _build_dir(out_dir, build)
+
+    rows: Dict[Tuple[int, int], List[Tuple[int, int, float, float, float, float]]] = {}
+    cables = []
+    for i, (cable, risk) in enumerate(zip(snapshot.cables, snapshot.outage_risk)):
+        waypoints = cable.waypoints.tolist()
+        keys = set()
+        for segment, (start, end) in enumerate(zip(waypoints, waypoints[1:] or waypoints)):
+            for key in _segment_tiles(*start, *end, tile_deg):
+                rows.setdefault(key, []).append((i, segment, *start, *end))
+                keys.add(key)
+        cables.append({
+            "cable_name": cable.cable_name,
+            "country_a": cable.country_a,
+            "country_b": cable.country_b,
+            "distance_km": cable.distance_km,
+            "outage_risk": float(risk),
+            "points": len(waypoints),
+            "tiles": sorted(keys)
+        })
+    tiles = []
+    for key, tile_rows in sorted(rows.items()):
+        file = f"{build}/{_tile_file(key)}"
+        (out_dir / file).write_bytes(to_json_bytes({"segments": tile_rows}))
+        tiles.append({"key": key, "file": file, "count": len(tile_rows)})
+    return _write_manifest(out_dir, {
+        "kind": SUBMARINE_CABLE_TILES, "build": build, "tile_deg": tile_deg,
+        "landing_stations": list(snapshot.landing_stations), "cables": cables, "tiles": tiles
+    })
+
+
+class TiledCables:
+    """Submarine cables whose geometry is served from on-disk tiles, with the interface of ``CableSnapshot``.
+
+    Landing stations and per-cable attributes come from the manifest. Route
+    segments are loaded per tile: radius searches read only the tiles the
+    circle overlaps, and a full route is assembled from its cable's tiles.
+    """
+
+    def __init__(self, manifest_path: Union[str, Path], max_bytes: int = DEFAULT_CACHE_BYTES,
+                 idle_seconds: float = DEFAULT_IDLE_SECONDS):
+        manifest_path = Path(manifest_path)
+        raw = manifest_path.read_bytes()
+        manifest = from_json(raw)
+        if manifest.get("kind") != SUBMARINE_CABLE_TILES:
+            raise ValueError(f"{manifest_path} is not a submarine-cable tile manifest")
+        self.version = content_version(raw)
+        self.directory = manifest_path.parent
+        self.build = manifest["build"]
+        self.tile_deg = float(manifest["tile_deg"])
+        self.cache = TileCache(max_bytes, idle_seconds)
+
+        self.landing_stations = tuple(LandingStation(**record) for record in manifest["landing_stations"])
+        by_country = {}
+        for station in self.landing_stations:
+            by_country.setdefault(station.country.casefold(), []).append(station)
+        self.stations_by_country = MappingProxyType({k: tuple(v) for k, v in by_country.items()})
+
+        records = manifest["cables"]
+        self.cable_info = tuple(
+            CableInfo(r["cable_name"], r["country_a"], r["country_b"], r["distance_km"]) for r in records
+        )
+        self.outage_risk = _frozen(np.array([r["outage_risk"] for r in records], dtype=np.float64))
+        by_pair = {}
+        for i, r in enumerate(records):
+            by_pair.setdefault(frozenset((r["country_a"].casefold(), r["country_b"].casefold())), []).append(i)
+        self.cables_by_pair = MappingProxyType({k: tuple(v) for k, v in by_pair.items()})
+
+        self._keys = np.array([t["key"] for t in manifest["tiles"]], dtype=np.int64).reshape(-1, 2)
+        self._files = [t["file"] for t in manifest["tiles"]]
+        tile_of_key = {tuple(key): i for i, key in enumerate(self._keys.tolist())}
+        self._cable_tiles = [[tile_of_key[tuple(key)] for key in r["tiles"]] for r in records]
+        self._cable_points = [r["points"] for r in records]
+
+    def _tile(self, index: int) -> CableTile:
+        def load():
+            rows = np.asarray(from_json((self.directory / self._files[index]).read_bytes())["segments"],
+                              dtype=np.float64).reshape(-1, 6)
+            tile = CableTile(
+                cable=_frozen(rows[:, 0].astype(np.int64)),
+                segment=_frozen(rows[:, 1].astype(np.int64)),
+                lat1=_frozen(rows[:, 2]),
+                lon1=_frozen(rows[:, 3]),
+                lat2=_frozen(rows[:, 4]),
+                lon2=_frozen(rows[:, 5])
+            )
+            return tile, tile.nbytes
+        return self.cache.get(index, load)
+
+    def cable(self, index: int) -> CableRoute:
+        """The full route of one cable, assembled from its tiles."""
+        parts = [self._tile(t) for t in self._cable_tiles[index]]
+
+        def column(name):
+            return np.concatenate([getattr(p, name)[p.cable == index] for p in parts])
+
+        # A segment crossing several tiles is stored in each of them
+        _, first = np.unique(column("segment"), return_index=True)
+        lat1, lon1, lat2, lon2 = (column(name)[first] for name in ("lat1", "lon1", "lat2", "lon2"))
+        waypoints = np.column_stack([np.append(lat1, lat2[-1]), np.append(lon1, lon2[-1])])
+        waypoints = np.ascontiguousarray(waypoints[:self._cable_points[index]])
+        waypoints.flags.writeable = False
+        info = self.cable_info[index]
+        return CableRoute(
+            country_a=info.country_a,
+            country_b=info.country_b,
+            waypoints=waypoints,
+            distance_km=info.distance_km,
+            cable_name=info.cable_name
+        )
+
+    def landing_stations_in(self, country: str) -> Tuple[LandingStation, ...]:
+        return self.stations_by_country.get(country.strip().casefold(), ())
+
+    def cables_between(self, country_a: str, country_b: str) -> List[CableRoute]:
+        key = frozenset((country_a.strip().casefold(), country_b.strip().casefold()))
+        return [self.cable(i) for i in self.cables_by_pair.get(key, ())]
+
+    def cables_within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(indices, distances_km)`` of cables whose route passes within a radius."""
+        nearest = np.full(len(self.cable_info), np.inf)
+        for index in np.flatnonzero(tiles_overlapping(self._keys, self.tile_deg, lat, lon, radius_km)):
+            tile = self._tile(index)
+            distances = segment_distance_km(lat, lon, tile.lat1, tile.lon1, tile.lat2, tile.lon2)
+            np.minimum.at(nearest, tile.cable, distances)
+        indices = np.flatnonzero(nearest <= radius_km)
+        order = np.argsort(nearest[indices], kind="stable")
+        return indices[order], nearest[indices][order]
+
+
+def open_submarine_cable_tiles(manifest_path: Union[str, Path], max_bytes: int = DEFAULT_CACHE_BYTES,
+                               idle_seconds: float = DEFAULT_IDLE_SECONDS) -> TiledCables:
+    return TiledCables(manifest_path, max_bytes, idle_seconds)
+
+
+# ============================================================================
+# MANAGERS
+# ============================================================================
+
+def tile_housekeeping(snapshots: List[Union[TiledBaseStations, TiledCables]]) -> None:
+    """Evict idle tiles from every live tiled snapshot and delete the builds none of them reads."""
+    for snapshot in snapshots:
+        snapshot.cache.sweep()
+    for directory in {snapshot.directory for snapshot in snapshots}:
+        prune_builds(directory, {snapshot.build for snapshot in snapshots if snapshot.directory == directory})
+
+
+def tiled_datasets(directory: Union[str, Path], max_bytes: int = DEFAULT_CACHE_BYTES,
+                   idle_seconds: float = DEFAULT_IDLE_SECONDS,
+                   poll_interval: float = 2.0) -> Tuple[DatasetManager, DatasetManager]:
+    """``(submarine_cables, base_stations)`` managers over a tile directory, each with its own cache budget.
+
+    Once started, each manager's watch thread also runs ``tile_housekeeping`` every ``poll_interval`` seconds.
+    """
+    directory = Path(directory)
+    return (
+        DatasetManager(directory / SUBMARINE_CABLE_TILES / MANIFEST_NAME,
+                       partial(open_submarine_cable_tiles, max_bytes=max_bytes, idle_seconds=idle_seconds),
+                       poll_interval, tile_housekeeping),
+        DatasetManager(directory / BASE_STATION_TILES / MANIFEST_NAME,
+                       partial(open_base_station_tiles, max_bytes=max_bytes, idle_seconds=idle_seconds),
+                       poll_interval, tile_housekeeping)
+    )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Split the datasets into geographic tiles.")
+    parser.add_argument("--out", default="data/tiles", help="output directory")
+    parser.add_argument("--tile-deg", type=float, default=DEFAULT_TILE_DEG, help="tile size in degrees")
+    parser.add_argument("--base-stations", default=str(BASE_STATIONS_PATH))
+    parser.add_argument("--submarine-cables", default=str(SUBMARINE_CABLES_PATH))
+    args = parser.parse_args(argv)
+    out = Path(args.out)
+    print(build_base_station_tiles(out / BASE_STATION_TILES, args.base_stations, args.tile_deg))
+    print(build_submarine_cable_tiles(out / SUBMARINE_CABLE_TILES, args.submarine_cables, args.tile_deg))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,26 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add the project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true", help="also run timing benchmarks")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock timing check, skipped unless --benchmark is given")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="timing benchmark; run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
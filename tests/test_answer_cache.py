@@ -0,0 +1,48 @@
+import asyncio
+import threading
+from answer_cache import AnswerCache, normalize_query
+
+def test_normalize_query():
+    assert normalize_query("  Latency France  to Brazil? ") == normalize_query("latency france to brazil")
+    assert normalize_query("cables near 10,20") == normalize_query("Cables near 10, 20")
+
+def test_persists_across_instances(tmp_path):
+    path = tmp_path / "answers.sqlite3"
+    cache = AnswerCache(path, dataset_version="v1")
+    cache.put("Latency France to Brazil", ("41 ms", [{"lat": 1.0, "lon": 2.0}]))
+    cache.close()
+
+    reopened = AnswerCache(path, dataset_version="v1")
+    assert reopened.get("latency france to brazil?") == ("41 ms", [{"lat": 1.0, "lon": 2.0}])
+    assert AnswerCache(path, dataset_version="v2").get("latency france to brazil") is None
+
+def test_ttl_and_size_eviction(tmp_path):
+    expired = AnswerCache(tmp_path / "ttl.sqlite3", dataset_version="v1", ttl_seconds=-1)
+    expired.put("q", ("a", []))
+    assert expired.get("q") is None
+
+    cache = AnswerCache(tmp_path / "size.sqlite3", dataset_version="v1", max_entries=2)
+    for i in range(5):
+        cache.put(f"q{i}", (f"a{i}", []))
+    assert len(cache) == 2
+    assert cache.get("q4") == ("a4", [])
+
+def test_concurrent_identical_queries_run_once(tmp_path):
+    cache = AnswerCache(tmp_path / "answers.sqlite3", dataset_version="v1")
+    calls = []
+    release = threading.Event()
+
+    async def compute():
+        calls.append(1)
+        await asyncio.get_running_loop().run_in_executor(None, release.wait)
+        return "answer", []
+
+    async def ask_many():
+        tasks = [asyncio.create_task(cache.get_or_compute("Same question", compute)) for _ in range(8)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(ask_many())
+    assert calls == [1]
+    assert all(r == ("answer", []) for r in results)
@@ -1,28 +1,68 @@
-from servers.basestation_server import BaseStationCoverageServer
+import numpy as np
+
+from servers import basestation_server
+from servers.basestation_server import BaseStationCoverageServer, max_signal_grid
+from models import (
+    BaseStationResponse, CoverageStrengthResponse, ProposedStation, HandoverPathResponse, CoverageGapsResponse
+)
 
 def test_nearest_basestations():
     server = BaseStationCoverageServer()
-    result = server._nearest_basestations_impl(10, 10, 5)
-    assert "stations" in result
-    assert isinstance(result["stations"], list)
+    result = server._nearest_basestations_impl(33.89, 35.50, 5)
+    assert isinstance(result, BaseStationResponse)
+    assert isinstance(result.stations, list)
+    assert result.count > 0
+    assert all(s.station_id.startswith("BEY") for s in result.stations)
 
 def test_coverage_strength_at():
     server = BaseStationCoverageServer()
-    result = server._coverage_strength_at_impl(1.1, 2.2)
-    assert "signal_strength" in result
+    result = server._coverage_strength_at_impl(33.89, 35.50)
+    assert isinstance(result, CoverageStrengthResponse)
+    assert result.signal_strength_dbm < 0
+    assert result.nearest_station.startswith("BEY")
+    assert server._coverage_strength_at_impl(1.1, 2.2).signal_strength_dbm < result.signal_strength_dbm
 
 def test_propose_new_station():
     server = BaseStationCoverageServer()
     result = server._propose_new_station_impl(50, 30, 2)
-    assert "suggested_location" in result
+    assert isinstance(result, ProposedStation)
 
 def test_stations_with_capacity():
     server = BaseStationCoverageServer()
     result = server._stations_with_capacity_impl(400)
-    assert len(result["filtered_stations"]) >= 1
+    assert result.count >= 1
+    assert all(s.capacity >= 400 for s in result.stations)
 
 def test_handover_path():
     server = BaseStationCoverageServer()
-    result = server._handover_path_impl(0, 0, 1, 1)
-    assert "handover_sequence" in result
-    assert isinstance(result["handover_sequence"], list)
+    result = server._handover_path_impl(33.85, 35.45, 33.93, 35.55)
+    assert isinstance(result, HandoverPathResponse)
+    assert result.total_handovers == len(result.handover_events)
+    assert result.total_handovers > 0
+
+def test_coverage_gaps():
+    server = BaseStationCoverageServer()
+    result = server._coverage_gaps_impl(33.80, 35.40, 34.00, 35.60, -80)
+    assert isinstance(result, CoverageGapsResponse)
+    assert 0 < result.uncovered_fraction < 1
+    assert result.count == len(result.gaps) >= 1
+    assert abs(sum(g.area_km2 for g in result.gaps) - result.uncovered_area_km2) < 1e-2
+    outer = result.gaps[0].polygon[0]
+    assert outer.shape[1] == 2
+    assert outer[:, 0].min() >= 33.80 and outer[:, 0].max() <= 34.00
+
+def test_coverage_gaps_fully_covered_and_empty_areas():
+    server = BaseStationCoverageServer()
+    covered = server._coverage_gaps_impl(33.88, 35.49, 33.89, 35.50, -120)
+    assert covered.count == 0 and covered.uncovered_area_km2 == 0
+    ocean = server._coverage_gaps_impl(0.0, 0.0, 0.1, 0.1, -100)
+    assert ocean.count == 1 and ocean.uncovered_fraction == 1.0
+
+def test_max_signal_grid_is_independent_of_batch_size(monkeypatch):
+    server = BaseStationCoverageServer()
+    snapshot = server.datasets.snapshot
+    lats, lons = np.linspace(33.80, 34.00, 37), np.linspace(35.40, 35.60, 41)
+    expected = max_signal_grid(snapshot, lats, lons, -100)
+    # Smaller than one grid row: batches split the stations too
+    monkeypatch.setattr(basestation_server, "GAP_CHUNK_ELEMENTS", 30)
+    np.testing.assert_allclose(max_signal_grid(snapshot, lats, lons, -100), expected)
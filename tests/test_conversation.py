@@ -0,0 +1,38 @@
+from conversation import ConversationMemory, estimate_tokens, summarize_tool_result
+
+STATIONS = {"stations": [{"station_id": f"BTS{i:03d}", "lat": 1.0, "lon": 2.0} for i in range(200)], "count": 200}
+ROUTE = {"country_a": "France", "country_b": "Brazil", "waypoints": [[10.0, 20.0]] * 500, "distance_km": 8200}
+
+def test_summarize_tool_result():
+    summary = summarize_tool_result(STATIONS)
+    assert "stations: 200 items (BTS000, BTS001, BTS002, ...)" in summary
+    assert "count: 200" in summary
+    assert "waypoints: 500 points from [10.0, 20.0] to [10.0, 20.0]" in summarize_tool_result(ROUTE)
+
+def test_recent_turns_verbatim_older_compacted():
+    memory = ConversationMemory(max_tokens=100000, keep_recent=1)
+    memory.add_turn("cable route France to Brazil", "Here it is.", [ROUTE])
+    memory.add_turn("stations near 5, 5", "Found 200.", [STATIONS])
+    messages = memory.build_input("and their capacity?")
+    assert [m["role"] for m in messages] == ["user", "assistant", "user", "assistant", "user"]
+    assert "waypoints: 500 points" in messages[1]["content"]
+    assert "BTS199" in messages[3]["content"]
+    assert messages[-1]["content"] == "and their capacity?"
+
+def test_history_stays_under_budget():
+    memory = ConversationMemory(max_tokens=400, keep_recent=2)
+    for i in range(50):
+        memory.add_turn(f"question {i}", "answer " * 20, [STATIONS])
+        messages = memory.build_input("next")
+        assert sum(estimate_tokens(m["content"]) for m in messages) <= 400
+    assert len(memory) < 50
+    assert messages[-2]["content"].startswith("answer")
+
+def test_long_message_does_not_forget_history():
+    memory = ConversationMemory(max_tokens=300, keep_recent=2)
+    for i in range(3):
+        memory.add_turn(f"question {i}", f"answer {i}")
+    assert memory.build_input("x" * 2000) == [{"role": "user", "content": "x" * 2000}]
+    assert len(memory) == 3
+    messages = memory.build_input("short")
+    assert [m["content"] for m in messages[::2]] == ["question 0", "question 1", "question 2", "short"]
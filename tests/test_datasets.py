@@ -0,0 +1,74 @@
+import gc
+import shutil
+import time
+from servers.datasets import BASE_STATIONS_PATH, DatasetManager, load_base_stations
+from servers.basestation_server import BaseStationCoverageServer
+
+def _manager(tmp_path, **kwargs):
+    path = tmp_path / "base_stations.json"
+    shutil.copy(BASE_STATIONS_PATH, path)
+    return path, DatasetManager(path, load_base_stations, **kwargs)
+
+def _drop_first_station(path):
+    text = path.read_text()
+    start = text.index("{", text.index("["))
+    end = text.index("}", start) + 2
+    path.write_text(text[:start] + text[end:].lstrip())
+
+def test_snapshot_is_immutable(tmp_path):
+    _, manager = _manager(tmp_path)
+    snapshot = manager.snapshot
+    assert not snapshot.lat.flags.writeable
+    assert list(snapshot.lat) == sorted(snapshot.lat)
+
+def test_reload_swaps_snapshot_and_frees_old_version(tmp_path):
+    path, manager = _manager(tmp_path)
+    in_flight = manager.snapshot
+    old_version, old_count = in_flight.version, len(in_flight)
+
+    _drop_first_station(path)
+    assert manager.reload()
+    assert manager.version != old_version
+    assert len(manager.snapshot) == old_count - 1
+    # A reader holding the old snapshot still sees a consistent old view
+    assert len(in_flight) == old_count
+    assert old_version in manager.live_versions()
+
+    del in_flight
+    gc.collect()
+    assert manager.live_versions() == [manager.version]
+
+def test_touch_without_change_keeps_current_version_live(tmp_path):
+    path, manager = _manager(tmp_path)
+    current = manager.snapshot
+    path.write_bytes(path.read_bytes())
+    assert not manager.reload()
+    gc.collect()
+    assert manager.snapshot is current
+    assert manager.live_versions() == [current.version]
+    assert manager.live_snapshots() == [current]
+
+def test_watcher_picks_up_changes(tmp_path):
+    path, manager = _manager(tmp_path, poll_interval=0.01)
+    server = BaseStationCoverageServer(manager)
+    old_version = server.dataset_version
+    manager.start()
+    try:
+        _drop_first_station(path)
+        deadline = time.time() + 5
+        while server.dataset_version == old_version and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        manager.stop()
+    assert server.dataset_version != old_version
+
+def test_failed_reload_keeps_last_good_snapshot(tmp_path):
+    path, manager = _manager(tmp_path, poll_interval=0.01)
+    version = manager.version
+    manager.start()
+    try:
+        path.write_text("{ not json")
+        time.sleep(0.1)
+    finally:
+        manager.stop()
+    assert manager.version == version
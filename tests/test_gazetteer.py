@@ -0,0 +1,74 @@
+import pytest
+
+from servers.gazetteer import PLACES_PATH, load_gazetteer
+from servers.geocoder_server import GeocoderServer
+
+GEONAMES_ROWS = [
+    ["2995469", "Marseille", "Marseille", "Marsella,Marsiglia", "43.29695", "5.38107", "P", "PPLA", "FR", "",
+     "93", "13", "", "", "870731", "", "28", "Europe/Paris", "2024-01-01"],
+    ["2988507", "Paris", "Paris", "Lutece", "48.85341", "2.3488", "P", "PPLC", "FR", "",
+     "11", "75", "", "", "2138551", "", "42", "Europe/Paris", "2024-01-01"],
+]
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return load_gazetteer(PLACES_PATH)
+
+def _names(places):
+    return [(p.name, p.country) for p in places]
+
+def test_exact_and_alternate_names(gazetteer):
+    assert _names(gazetteer.lookup("Marseille", 1)) == [("Marseille", "France")]
+    assert _names(gazetteer.lookup("Bombay", 1)) == [("Mumbai", "India")]
+    assert _names(gazetteer.lookup("São Paulo", 1)) == _names(gazetteer.lookup("sao paulo", 1))
+
+def test_population_ranking_and_qualifier(gazetteer):
+    assert _names(gazetteer.lookup("Tripoli")) == [("Tripoli", "Libya"), ("Tripoli", "Lebanon")]
+    assert _names(gazetteer.lookup("Tripoli, Lebanon")) == [("Tripoli", "Lebanon")]
+    assert _names(gazetteer.lookup("Paris, US")) == [("Paris", "USA")]
+
+def test_prefix_and_fuzzy(gazetteer):
+    assert gazetteer.resolve("Hermosa").name == "Hermosa Beach"
+    assert gazetteer.resolve("Marseile").name == "Marseille"
+    assert gazetteer.resolve("downtown Beirut").name == "Beirut Central District"
+    assert gazetteer.resolve("central Tokyo").name == "Tokyo"
+    with pytest.raises(ValueError):
+        gazetteer.resolve("Xyzzy")
+
+def test_geonames_dump(tmp_path):
+    path = tmp_path / "cities15000.txt"
+    path.write_text("\n".join("\t".join(row) for row in GEONAMES_ROWS) + "\n")
+    gazetteer = load_gazetteer(path)
+    assert [p.name for p in gazetteer.places] == ["Paris", "Marseille"]
+    assert gazetteer.resolve("Marsiglia, FR").population == 870731
+    assert gazetteer.resolve("Paris").country == "FR"
+
+def test_geonames_code_tables(tmp_path):
+    path = tmp_path / "cities15000.txt"
+    path.write_text("\n".join("\t".join(row) for row in GEONAMES_ROWS) + "\n")
+    (tmp_path / "countryInfo.txt").write_text(
+        "#ISO\tISO3\tISO-Numeric\tfips\tCountry\tCapital\n"
+        "FR\tFRA\t250\tFR\tFrance\tParis\n"
+    )
+    (tmp_path / "admin1CodesASCII.txt").write_text(
+        "FR.11\tÎle-de-France\tIle-de-France\t3012874\n"
+        "FR.93\tProvence-Alpes-Côte d'Azur\tProvence-Alpes-Cote d'Azur\t2985244\n"
+    )
+    gazetteer = load_gazetteer(path)
+    assert [(p.name, p.country, p.admin1) for p in gazetteer.lookup("Paris, France")] == [
+        ("Paris", "France", "Île-de-France")
+    ]
+    assert gazetteer.resolve("Marsiglia, FR").name == "Marseille"
+    assert gazetteer.resolve("Marseille, Provence-Alpes-Cote d'Azur").admin1 == "Provence-Alpes-Côte d'Azur"
+    assert gazetteer.lookup("Paris, Germany") == []
+
+def test_geocoder_server_locate_and_box():
+    geo = GeocoderServer()
+    assert geo.locate(1.0, 2.0, None) == (1.0, 2.0)
+    lat, lon = geo.locate(None, None, "Beirut")
+    assert (round(lat, 2), round(lon, 2)) == (33.89, 35.5)
+    min_lat, min_lon, max_lat, max_lon = geo.bounding_box(None, None, None, None, "Beirut")
+    assert min_lat < lat < max_lat and min_lon < lon < max_lon
+    with pytest.raises(ValueError):
+        geo.locate(None, 2.0, None)
+    assert geo._geocode_impl("Alexandria", 2).count == 2
@@ -0,0 +1,119 @@
+import math
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from servers.geodesy import (
+    EARTH_RADIUS_KM, KM_PER_DEGREE_LAT, WGS84_A_KM, densify, destination, haversine_km, initial_bearing_deg,
+    interpolate, path_distance_km, path_length_km, segment_distance_km, vincenty_km
+)
+
+def _dms(d, m, s):
+    return np.copysign(abs(d) + m / 60 + s / 3600, d)
+
+# Vincenty (1975) test line: Flinders Peak to Buninyong, 54972.271 m
+FLINDERS = (_dms(-37, 57, 3.72030), _dms(144, 25, 29.52440))
+BUNINYONG = (_dms(-37, 39, 10.15610), _dms(143, 55, 35.38390))
+
+def test_vincenty_reference_values():
+    assert vincenty_km(*FLINDERS, *BUNINYONG) == pytest.approx(54.972271, abs=1e-6)
+    # Quarter of the equator and a meridian quadrant on WGS-84
+    assert vincenty_km(0, 0, 0, 90) == pytest.approx(WGS84_A_KM * np.pi / 2, abs=1e-6)
+    assert vincenty_km(0, 0, 90, 0) == pytest.approx(10001.965729, abs=1e-5)
+    assert vincenty_km(10, 10, 10, 10) == 0.0
+
+def test_haversine_matches_sphere():
+    assert haversine_km(0, 0, 0, 90) == pytest.approx(EARTH_RADIUS_KM * np.pi / 2)
+    assert haversine_km(0, 0, 0, 180) == pytest.approx(EARTH_RADIUS_KM * np.pi)
+    # The mean-radius sphere is within about 0.56% of the ellipsoid
+    lats, lons = np.random.default_rng(0).uniform(-60, 60, (2, 1000))
+    ratio = haversine_km(0, 0, lats, lons) / vincenty_km(0, 0, lats, lons)
+    assert np.all(np.abs(ratio - 1) < 0.006)
+
+def test_bearing_destination_round_trip():
+    assert initial_bearing_deg(0, 0, [0, 10, -10, 0], [90, 0, 0, -10]).tolist() == [90.0, 0.0, 180.0, 270.0]
+    bearings = np.linspace(0, 350, 36)
+    lats, lons = destination(33.9, 35.5, bearings, 250.0)
+    np.testing.assert_allclose(haversine_km(33.9, 35.5, lats, lons), 250.0)
+    np.testing.assert_allclose(initial_bearing_deg(33.9, 35.5, lats, lons), bearings, atol=1e-9)
+
+def test_interpolate_and_densify_follow_the_great_circle():
+    lats, lons = interpolate(0, 0, 0, 90, [0.0, 0.5, 1.0])
+    np.testing.assert_allclose(lons, [0, 45, 90], atol=1e-12)
+    # The great circle from Paris to Tokyo passes far north of both
+    mid_lat, _ = interpolate(48.86, 2.35, 35.68, 139.65, 0.5)
+    assert mid_lat > 65
+    path = densify([[48.86, 2.35], [35.68, 139.65], [35.0, 139.0]], 100.0)
+    assert path[0].tolist() == [48.86, 2.35] and path[-1].tolist() == [35.0, 139.0]
+    steps = haversine_km(path[:-1, 0], path[:-1, 1], path[1:, 0], path[1:, 1])
+    assert steps.max() <= 100.0
+    assert path_length_km(path) == pytest.approx(path_length_km([[48.86, 2.35], [35.68, 139.65], [35.0, 139.0]]))
+
+def test_segment_and_path_distance():
+    one_degree = KM_PER_DEGREE_LAT
+    distances = segment_distance_km([1, 1, 0, 0], [5, 15, -3, 5], 0, 0, 0, 10)
+    np.testing.assert_allclose(distances, [one_degree, haversine_km(1, 15, 0, 10), 3 * one_degree, 0.0], atol=1e-9)
+    # Degenerate segment: distance to the point
+    assert segment_distance_km(1, 1, 0, 0, 0, 0) == pytest.approx(haversine_km(1, 1, 0, 0))
+    # Nearest leg of a route, and a single-point route
+    assert path_distance_km(-1, 5, [[0, 0], [0, 10], [5, 10]]) == pytest.approx(one_degree)
+    assert path_distance_km(1, 1, [[0, 0]]) == pytest.approx(haversine_km(1, 1, 0, 0))
+
+def _haversine_reference(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def test_batches_match_scalar_calls():
+    lats1, lons1, lats2, lons2 = np.random.default_rng(1).uniform(-70, 70, (4, 200))
+    # One nearly antipodal pair, where Vincenty falls back to the sphere
+    lats2[0], lons2[0] = -lats1[0] + 0.1, lons1[0] + 179.8
+    pairs = list(zip(lats1.tolist(), lons1.tolist(), lats2.tolist(), lons2.tolist()))
+    np.testing.assert_allclose(haversine_km(lats1, lons1, lats2, lons2),
+                               [_haversine_reference(*pair) for pair in pairs], rtol=1e-12)
+    # Pairs in a batch converge independently of each other
+    np.testing.assert_allclose(vincenty_km(lats1, lons1, lats2, lons2),
+                               [vincenty_km(*pair) for pair in pairs], rtol=1e-12)
+    np.testing.assert_allclose(segment_distance_km(lats1, lons1, 0.0, 0.0, 10.0, 10.0),
+                               [segment_distance_km(lat, lon, 0.0, 0.0, 10.0, 10.0) for lat, lon, _, _ in pairs],
+                               rtol=1e-12)
+
+def _python_calls(function, *args):
+    """Python and C function calls made while running ``function(*args)``."""
+    calls = [0]
+
+    def profile(frame, event, arg):
+        if event in ("call", "c_call"):
+            calls[0] += 1
+    sys.setprofile(profile)
+    try:
+        function(*args)
+    finally:
+        sys.setprofile(None)
+    return calls[0]
+
+def test_kernels_do_no_per_point_python_work():
+    # The same 10 pairs repeated, so Vincenty needs the same number of iterations
+    small = np.random.default_rng(2).uniform(-70, 70, (4, 10))
+    large = np.tile(small, 10_000)
+    for function, args in [
+        (haversine_km, lambda b: b),
+        (vincenty_km, lambda b: b),
+        (segment_distance_km, lambda b: (b[0], b[1], 0.0, 0.0, 10.0, 10.0)),
+    ]:
+        assert _python_calls(function, *args(large)) == _python_calls(function, *args(small))
+
+@pytest.mark.benchmark
+def test_throughput():
+    lats1, lons1, lats2, lons2 = np.random.default_rng(1).uniform(-70, 70, (4, 1_000_000))
+    start = time.perf_counter()
+    haversine_km(lats1, lons1, lats2, lons2)
+    assert time.perf_counter() - start < 1.0
+    start = time.perf_counter()
+    vincenty_km(lats1[:100_000], lons1[:100_000], lats2[:100_000], lons2[:100_000])
+    assert time.perf_counter() - start < 2.0
+    start = time.perf_counter()
+    segment_distance_km(lats1, lons1, 0.0, 0.0, 10.0, 10.0)
+    assert time.perf_counter() - start < 2.0
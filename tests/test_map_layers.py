@@ -0,0 +1,36 @@
+from map_layers import diff_layers, extract_layers, map_clear, map_update
+from serialization import from_json
+
+STATIONS = {"stations": [
+    {"station_id": "BTS001", "lat": 10.0, "lon": 10.0, "coverage_radius_km": 5.0},
+    {"station_id": "BTS002", "lat": 10.5, "lon": 10.5, "coverage_radius_km": 8.0},
+], "count": 2}
+ROUTE = {"cable_name": "SAm-1", "waypoints": [[48.0, -4.0], [10.0, -30.0], [-3.7, -38.5]], "distance_km": 8200}
+
+def test_extract_layers_ids_and_types():
+    layers = extract_layers("Found 2 stations.", [STATIONS, ROUTE])
+    assert layers["station:BTS001"]["type"] == "point"
+    assert layers["circle:10.0,10.0"]["radius_km"] == 5.0
+    assert layers["line:SAm-1"]["coords"][-1] == [-3.7, -38.5]
+    assert len(layers) == 5
+
+def test_text_coordinates_skip_existing_points():
+    layers = extract_layers("BTS001 is at (10.0, 10.0); try 12.5, 13.25 instead", [STATIONS])
+    texts = [layer for layer_id, layer in layers.items() if layer_id.startswith("point:")]
+    assert [(p["lat"], p["lon"]) for p in texts] == [(12.5, 13.25)]
+
+def test_diff_sends_only_changes():
+    first = extract_layers("", [STATIONS])
+    moved = dict(STATIONS, stations=[dict(STATIONS["stations"][0], coverage_radius_km=6.0)])
+    second = extract_layers("", [moved, ROUTE])
+    diff = diff_layers(first, second)
+    assert [layer["id"] for layer in diff["add"]] == ["line:SAm-1"]
+    assert [layer["id"] for layer in diff["update"]] == ["circle:10.0,10.0"]
+    assert sorted(diff["remove"]) == ["circle:10.5,10.5", "station:BTS002"]
+    assert diff_layers(second, second) == {}
+
+def test_messages_are_compact_and_distinct():
+    layers = extract_layers("", [STATIONS])
+    assert from_json(map_update(2, layers, layers)) == {"seq": 2}
+    assert len(map_update(3, layers, layers)) < 20
+    assert from_json(map_clear(4)) == {"seq": 4, "clear": True}
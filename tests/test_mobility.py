@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pytest
+from models import BaseStation
+from servers.basestation_server import BaseStationCoverageServer, best_server, prune_runs
+from servers.datasets import build_base_station_snapshot
+from servers.mobility import (
+    SESSION_END, SESSION_START, TICK, EventQueue, LoadSimulation, MetricsWriter, RandomWaypoint, TraceMobility
+)
+
+def _snapshot(capacity=5):
+    stations = [
+        BaseStation(station_id="W", lat=0.0, lon=0.0, coverage_radius_km=5, capacity=capacity, signal_strength_dbm=-60),
+        BaseStation(station_id="E", lat=0.0, lon=0.1, coverage_radius_km=5, capacity=capacity, signal_strength_dbm=-60),
+    ]
+    return build_base_station_snapshot(stations, "test")
+
+def test_event_queue_orders_by_time_then_kind_then_insertion():
+    queue = EventQueue()
+    queue.push(1.0, TICK, "tick")
+    queue.push(1.0, SESSION_START, "first")
+    queue.push(1.0, SESSION_START, "second")
+    queue.extend([0.5, 1.0], SESSION_END, ["early", "end"])
+    assert [queue.pop()[2] for _ in range(len(queue))] == ["early", "end", "first", "second", "tick"]
+
+def test_random_waypoint_stays_in_box_at_bounded_speed():
+    mobility = RandomWaypoint(2000, 33.8, 35.4, 34.0, 35.6, speed_kmh=(10, 20), pause_s=(0, 0), seed=1)
+    previous = mobility.positions(0.0)
+    for t in np.arange(10.0, 600.0, 10.0):
+        lats, lons = mobility.positions(t)
+        assert lats.min() >= 33.8 and lats.max() <= 34.0 and lons.min() >= 35.4 and lons.max() <= 35.6
+        # Turning at a waypoint only shortens the straight-line displacement
+        step_km = np.hypot(lats - previous[0], (lons - previous[1]) * np.cos(np.radians(33.9))) * 111.2
+        assert step_km.max() <= 20 * 10 / 3600 * 1.01
+        previous = lats, lons
+
+def test_trace_mobility_interpolates_csv(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("time_s,mobile_id,lat,lon\n0,a,0,0\n0,b,1,1\n10,a,0,1\n10,b,1,1\n")
+    trace = TraceMobility.from_csv(path)
+    lats, lons = trace.positions(5.0)
+    assert trace.mobiles == 2
+    assert lons.tolist() == [0.5, 1.0] and lats.tolist() == [0.0, 1.0]
+    assert trace.positions(99.0)[1].tolist() == [1.0, 1.0]
+    path.write_text("time_s,mobile_id,lat,lon\n0,a,0,0\n10,b,1,1\n")
+    with pytest.raises(ValueError):
+        TraceMobility.from_csv(path)
+
+def test_vectorized_best_server_matches_reference():
+    snapshot = BaseStationCoverageServer().datasets.snapshot
+    simulation = LoadSimulation(snapshot, RandomWaypoint(1, 0, 0, 1, 1))
+    rng = np.random.default_rng(0)
+    lats, lons = rng.uniform(33.7, 34.1, 5000), rng.uniform(35.3, 35.7, 5000)
+    best, dbm = simulation.best_servers(lats, lons)
+    expected_best, expected_dbm, _ = best_server(snapshot, lats, lons)
+    assert best.tolist() == expected_best.tolist()
+    np.testing.assert_allclose(dbm, expected_dbm, atol=1e-3)
+
+def test_load_respects_capacity_and_streams_metrics(tmp_path):
+    snapshot = _snapshot(capacity=5)
+    # Mobiles commute between the two stations, so sessions hand over mid-way
+    times = np.array([0.0, 300.0, 600.0])
+    lats = np.zeros((3, 200))
+    lons = np.tile([[0.0], [0.1], [0.0]], (1, 200))
+    simulation = LoadSimulation(snapshot, TraceMobility(times, lats, lons), tick_s=10,
+                                mean_session_s=200, mean_idle_s=50, seed=2)
+    totals = simulation.run(600, tmp_path)
+
+    assert totals.ticks == 61
+    assert totals.peak_load.max() <= 5
+    assert totals.blocked_attaches > 0 and totals.station_blocked.sum() == totals.blocked_attaches
+    # Both stations stay full, so handovers towards them are refused
+    assert totals.failed_handovers > 0
+    summary = np.loadtxt(tmp_path / "summary.csv", delimiter=",", skiprows=1)
+    loads = np.loadtxt(tmp_path / "station_load.csv", delimiter=",", skiprows=1)
+    assert len(summary) == len(loads) == totals.ticks
+    assert summary[:, 3].sum() == totals.blocked_attaches
+    assert (loads[:, 1:] <= 5).all()
+    np.testing.assert_array_equal(summary[:, 1], loads[:, 1:].sum(axis=1))
+
+def test_events_after_the_last_tick_reach_the_totals(tmp_path):
+    times = np.array([0.0, 300.0, 600.0])
+    lats = np.zeros((3, 200))
+    lons = np.tile([[0.0], [0.1], [0.0]], (1, 200))
+    simulation = LoadSimulation(_snapshot(capacity=5), TraceMobility(times, lats, lons), tick_s=10,
+                                mean_session_s=200, mean_idle_s=50, seed=2)
+    # The horizon is not a multiple of the tick: attempts in (600, 609] come after the last tick
+    totals = simulation.run(609, tmp_path)
+    summary = np.loadtxt(tmp_path / "summary.csv", delimiter=",", skiprows=1)
+    assert totals.ticks == len(summary) == 61
+    assert totals.session_attempts > summary[:, 2].sum()
+    assert totals.blocked_attaches == totals.station_blocked.sum()
+
+def test_metrics_writer_flushes_in_chunks(tmp_path):
+    writer = MetricsWriter(tmp_path, ["A"], chunk_ticks=4)
+    for t in range(10):
+        writer.record([t] + [0] * 10, np.array([t]))
+    # Two full chunks are on disk; the remainder waits for the next flush
+    assert len((tmp_path / "summary.csv").read_text().splitlines()) == 1 + 8
+    writer.flush()
+    assert len((tmp_path / "station_load.csv").read_text().splitlines()) == 1 + 10
+
+def test_simulate_network_load_tool(tmp_path):
+    server = BaseStationCoverageServer(simulation_dir=tmp_path)
+    result = server._simulate_network_load_impl(33.80, 35.40, 34.00, 35.65, mobiles=2000, duration_minutes=10, seed=1)
+    assert result.mobiles == 2000 and result.duration_s == 600
+    assert result.session_attempts > 0 and result.handovers > 0
+    assert 0 < len(result.busiest_stations) <= 10
+    utilization = [s.peak_utilization for s in result.busiest_stations]
+    assert utilization == sorted(utilization, reverse=True)
+    assert (tmp_path / result.metrics_dir.split("/")[-1] / "summary.csv").exists()
+
+def test_old_simulation_runs_are_pruned(tmp_path):
+    for i in range(5):
+        run = tmp_path / f"run-{i}"
+        run.mkdir()
+        (run / "summary.csv").write_text("")
+        os.utime(run, (i, i))
+    prune_runs(tmp_path, 2)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["run-3", "run-4"]
@@ -0,0 +1,29 @@
+import numpy as np
+from servers.raster import label_regions, trace_rings, signed_area
+
+def test_label_regions_uses_4_connectivity():
+    mask = np.array([
+        [1, 1, 0, 0],
+        [0, 1, 0, 1],
+        [1, 0, 0, 1],
+    ], dtype=bool)
+    labels, count = label_regions(mask)
+    assert count == 3
+    assert labels[0, 0] == labels[1, 1]
+    assert labels[2, 0] != labels[1, 1]
+    assert (labels == 0).sum() == (~mask).sum()
+
+def test_trace_square_with_hole():
+    mask = np.ones((3, 3), dtype=bool)
+    mask[1, 1] = False
+    rings = sorted(trace_rings(mask), key=signed_area, reverse=True)
+    assert len(rings) == 2
+    outer, hole = rings
+    assert len(outer) == 4 and signed_area(outer) == 9
+    assert len(hole) == 4 and signed_area(hole) == -1
+
+def test_diagonal_cells_trace_separately():
+    mask = np.array([[1, 0], [0, 1]], dtype=bool)
+    rings = trace_rings(mask)
+    assert len(rings) == 2
+    assert all(signed_area(r) == 1 for r in rings)
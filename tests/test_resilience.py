@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+import pytest
+from servers.datasets import load_submarine_cables
+from servers.resilience import CableGraph
+from servers.submarine_server import SubmarineCablesServer
+
+# A--B has two parallel cables, B--D one long and one short route via C
+CABLES = [
+    ("ab1", "A", "B", 0.1, [[0, 0], [0, 1]]),
+    ("ab2", "A", "B", 0.1, [[0, 0], [1, 1], [0, 1]]),
+    ("bd", "B", "D", 0.5, [[0, 1], [0, 5]]),
+    ("bc", "B", "C", 0.0, [[0, 1], [0, 2]]),
+    ("cd", "C", "D", 0.0, [[0, 2], [0, 3]]),
+]
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / "cables.json"
+    path.write_text(json.dumps({
+        "landing_stations": [],
+        "cables": [dict(cable_name=n, country_a=a, country_b=b, outage_risk=r, waypoints=w)
+                   for n, a, b, r, w in CABLES]
+    }))
+    return load_submarine_cables(path)
+
+def test_disjoint_paths_and_min_cut(snapshot):
+    graph = CableGraph(snapshot)
+    paths, cut = graph.disjoint_paths(graph.node("A"), graph.node("D"))
+    assert len(paths) == 2
+    used = [graph.cable_names[e] for p in paths for e in p.edges]
+    assert sorted(used) == ["ab1", "ab2", "bc", "bd", "cd"]
+    assert sorted(graph.cable_names[e] for e in cut) == ["ab1", "ab2"]
+    assert paths[0].length_km <= paths[1].length_km
+
+def test_simulated_disconnection_matches_analytic(snapshot):
+    graph = CableGraph(snapshot)
+    distances = graph.simulate(graph.node("A"), graph.node("D"), 100000, seed=7)
+    # Only losing both A--B cables disconnects A from D
+    assert np.isinf(distances).mean() == pytest.approx(0.01, abs=0.002)
+    assert np.nanmin(distances) == pytest.approx(graph.baseline_distance(graph.node("A"), graph.node("D")))
+
+def test_pool_matches_in_process(snapshot):
+    graph = CableGraph(snapshot, workers=2)
+    try:
+        source, target = graph.node("A"), graph.node("D")
+        pooled = graph.simulate(source, target, 60000, seed=1)
+        local = CableGraph(snapshot).simulate(source, target, 60000, seed=1)
+        np.testing.assert_array_equal(pooled, local)
+    finally:
+        graph.close()
+
+def test_same_country_is_rejected(snapshot):
+    graph = CableGraph(snapshot)
+    with pytest.raises(ValueError):
+        graph.disjoint_paths(graph.node("A"), graph.node("A"))
+    with pytest.raises(ValueError):
+        graph.simulate(graph.node("A"), graph.node("A"), 10)
+    server = SubmarineCablesServer()
+    with pytest.raises(ValueError):
+        server._disjoint_cable_paths_impl("France", "france", 3)
+    with pytest.raises(ValueError):
+        server._cable_resilience_impl("France", "France", 10)
+
+def test_cable_resilience_tool():
+    server = SubmarineCablesServer()
+    result = server._cable_resilience_impl("Lebanon", "USA", 100000, seed=3)
+    assert result.scenarios == 100000
+    assert 0 < result.disconnection_probability < 1
+    assert result.baseline_latency_ms <= result.p50_latency_ms <= result.p90_latency_ms <= result.p99_latency_ms
+    with pytest.raises(ValueError):
+        server._cable_resilience_impl("Lebanon", "Atlantis", 10)
+
+def test_disjoint_cable_paths_tool():
+    result = SubmarineCablesServer()._disjoint_cable_paths_impl("France", "Brazil", 3)
+    assert result.count == len(result.paths) >= 1
+    assert result.paths[0].countries[0] == "France" and result.paths[0].countries[-1] == "Brazil"
+    used = [c for p in result.paths for c in p.cables]
+    assert len(used) == len(set(used))
+    assert result.min_cut_size == len(result.min_cut_cables) >= result.count
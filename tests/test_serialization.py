@@ -0,0 +1,18 @@
+from models import CableRoute, BaseStation
+from serialization import to_json, to_json_bytes, from_json
+
+def test_models_are_slotted():
+    station = BaseStation("BTS001", 1.0, 2.0, 2.0, 500, -65.0)
+    assert not hasattr(station, "__dict__")
+
+def test_cable_route_waypoints_array():
+    route = CableRoute("France", "Brazil", [(10, 20), (15, 30)], 8200, "Test")
+    assert route.waypoints.dtype.name == "float64"
+    assert route.waypoints.shape == (2, 2)
+
+def test_round_trip():
+    route = CableRoute("France", "Brazil", [(10, 20), (15, 30)], 8200, "Test")
+    data = from_json(to_json(route))
+    assert data["country_a"] == "France"
+    assert data["waypoints"] == [[10.0, 20.0], [15.0, 30.0]]
+    assert isinstance(to_json_bytes(route), bytes)
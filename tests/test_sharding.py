@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from servers.basestation_server import BaseStationCoverageServer, best_server
+from servers.sharding import ShardedStationIndex
+
+@pytest.fixture(scope="module")
+def sharded():
+    server = BaseStationCoverageServer()
+    index = ShardedStationIndex(server.datasets.snapshot, workers=3, tile_deg=0.05)
+    yield server.datasets.snapshot, index
+    index.close()
+
+def test_within_matches_unsharded(sharded):
+    snapshot, index = sharded
+    for lat, lon, radius in [(33.89, 35.50, 5), (33.89, 35.50, 300), (48.86, 2.35, 3), (0, 0, 10)]:
+        expected = snapshot.within(lat, lon, radius)
+        actual = index.within(lat, lon, radius)
+        assert actual[0].tolist() == expected[0].tolist()
+        np.testing.assert_allclose(actual[1], expected[1])
+
+def test_radius_query_only_touches_overlapping_shards(sharded):
+    _, index = sharded
+    assert index.shards == 3
+    assert len(index.shards_for(35.68, 139.76, 1)) < index.shards
+    assert index.shards_for(0, 0, 10) == []
+    assert len(index.shards_for(33.89, 35.50, 20000)) == index.shards
+
+def test_best_server_matches_unsharded(sharded):
+    snapshot, index = sharded
+    lats = np.linspace(33.80, 34.50, 50)
+    lons = np.linspace(35.40, 35.90, 50)
+    expected = best_server(snapshot, lats, lons)
+    actual = index.best_server(lats, lons)
+    assert actual[0].tolist() == expected[0].tolist()
+    np.testing.assert_allclose(actual[1], expected[1])
+
+def test_server_sharded_mode():
+    server = BaseStationCoverageServer(shard_workers=2)
+    try:
+        plain = BaseStationCoverageServer(server.datasets)
+        assert server._nearest_basestations_impl(33.89, 35.50, 5) == plain._nearest_basestations_impl(33.89, 35.50, 5)
+        assert server._coverage_strength_at_impl(33.89, 35.50) == plain._coverage_strength_at_impl(33.89, 35.50)
+    finally:
+        server.close()
@@ -1,32 +1,47 @@
+import pytest
 from servers.submarine_server import SubmarineCablesServer
+from models import LandingStationResponse, CableRoute, NearbyCablesResponse
 
 def test_locate_landing_station():
     server = SubmarineCablesServer()
     result = server._locate_landing_station_impl(country="Japan")
-    assert "landing_stations" in result
-    assert isinstance(result["landing_stations"], list)
+    assert isinstance(result, LandingStationResponse)
+    assert isinstance(result.stations, list)
+    assert result.count == len(result.stations) > 0
 
 def test_cable_route_between():
     server = SubmarineCablesServer()
     result = server._cable_route_between_impl("France", "Brazil")
-    assert result["from"] == "France"
-    assert result["to"] == "Brazil"
-    assert "distance_km" in result
+    assert isinstance(result, CableRoute)
+    assert result.country_a == "France"
+    assert result.country_b == "Brazil"
+    assert result.distance_km > 0
+    assert result.waypoints.shape[1] == 2
 
 def test_list_cables_near():
     server = SubmarineCablesServer()
-    result = server._list_cables_near_impl(10, 20, 100)
-    assert "cables" in result
-    assert isinstance(result["cables"], list)
+    result = server._list_cables_near_impl(33.90, 35.50, 100)
+    assert isinstance(result, NearbyCablesResponse)
+    assert isinstance(result.cables, list)
+    assert "Cadmos" in result.cables
+
+def test_list_cables_near_measures_to_route_segments():
+    # Midway along the Atlantis South leg from (44, -9) to (30, -20), ~900 km from either waypoint
+    server = SubmarineCablesServer()
+    result = server._list_cables_near_impl(37.126, -15.010, 20)
+    assert result.cables == ["Atlantis South"]
+
+def test_cable_route_between_unknown_pair():
+    server = SubmarineCablesServer()
+    with pytest.raises(ValueError):
+        server._cable_route_between_impl("Japan", "Brazil")
 
 def test_cable_latency_estimate():
     server = SubmarineCablesServer()
     result = server._cable_latency_estimate_impl("USA", "UK")
-    assert "estimated_latency_ms" in result
-    assert result["estimated_latency_ms"] > 0
+    assert result.estimated_latency_ms > 0
 
 def test_cable_outage_risk():
     server = SubmarineCablesServer()
     result = server._cable_outage_risk_impl(5.0, 8.0)
-    assert "risk_score" in result
-    assert 0 <= result["risk_score"] <= 1
+    assert 0 <= result.risk_score <= 1
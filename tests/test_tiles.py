@@ -0,0 +1,111 @@
+import gc
+import json
+import time
+
+import pytest
+from serialization import to_json
+from servers.basestation_server import BaseStationCoverageServer
+from servers.datasets import BASE_STATIONS_PATH, DatasetManager
+from servers.submarine_server import SubmarineCablesServer
+from servers.tiles import (
+    TileCache, build_base_station_tiles, main, open_base_station_tiles, tile_housekeeping, tiled_datasets
+)
+
+@pytest.fixture(scope="module")
+def tiled(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("tiles")
+    main(["--out", str(directory), "--tile-deg", "0.1"])
+    return directory
+
+def test_tiled_servers_match_in_memory(tiled):
+    cables, stations = tiled_datasets(tiled, max_bytes=20000)
+    tiled_base, base = BaseStationCoverageServer(stations), BaseStationCoverageServer()
+    tiled_sub, sub = SubmarineCablesServer(cables), SubmarineCablesServer()
+    for query in [
+        lambda s: s._nearest_basestations_impl(33.89, 35.50, 5),
+        lambda s: s._coverage_strength_at_impl(48.85, 2.35),
+        lambda s: s._propose_new_station_impl(33.90, 35.50, 3),
+        lambda s: s._stations_with_capacity_impl(1500),
+        lambda s: s._handover_path_impl(33.85, 35.45, 34.00, 35.65),
+        lambda s: s._coverage_gaps_impl(33.80, 35.40, 34.00, 35.65, -90),
+    ]:
+        assert to_json(query(tiled_base)) == to_json(query(base))
+    for query in [
+        lambda s: s._list_cables_near_impl(33.90, 35.50, 300),
+        lambda s: s._list_cables_near_impl(37.126, -15.010, 20),
+        lambda s: s._cable_route_between_impl("France", "Brazil"),
+        lambda s: s._cable_outage_risk_impl(36.0, 5.0),
+        lambda s: s._disjoint_cable_paths_impl("Lebanon", "Japan"),
+    ]:
+        assert to_json(query(tiled_sub)) == to_json(query(sub))
+
+def test_queries_load_only_touched_tiles(tiled):
+    _, stations = tiled_datasets(tiled)
+    server = BaseStationCoverageServer(stations)
+    server._nearest_basestations_impl(35.68, 139.76, 2)
+    cache = stations.snapshot.cache
+    assert cache.misses == len(cache) == 1
+    server._nearest_basestations_impl(35.68, 139.76, 2)
+    assert cache.hits == 1 and cache.misses == 1
+
+def test_resident_set_stays_within_budget(tiled):
+    _, stations = tiled_datasets(tiled, max_bytes=4000)
+    server = BaseStationCoverageServer(stations)
+    for lat, lon in [(33.89, 35.50), (34.43, 35.84), (43.30, 5.37), (48.86, 2.35), (35.68, 139.76)] * 3:
+        assert server._nearest_basestations_impl(lat, lon, 20).count > 0
+        assert stations.snapshot.cache.nbytes <= 4000
+
+def test_tile_cache_evicts_least_recent_and_idle(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("servers.tiles.time.monotonic", lambda: clock[0])
+    cache = TileCache(max_bytes=30, idle_seconds=100)
+    for key in "abc":
+        cache.get(key, lambda: (key, 10))
+    cache.get("a", lambda: ("a", 10))
+    cache.get("d", lambda: ("d", 10))
+    assert "b" not in cache and {"a", "c", "d"} <= {k for k in "abcd" if k in cache}
+    assert cache.get("oversized", lambda: ("x", 100)) == "x" and "oversized" not in cache
+    clock[0] = 150.0
+    cache.get("e", lambda: ("e", 10))
+    assert len(cache) == 1 and cache.nbytes == 10
+
+def test_watch_thread_sweeps_idle_tiles(tiled):
+    _, stations = tiled_datasets(tiled, idle_seconds=0.05, poll_interval=0.01)
+    BaseStationCoverageServer(stations)._nearest_basestations_impl(33.89, 35.50, 2)
+    cache = stations.snapshot.cache
+    assert len(cache) > 0
+    stations.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(cache) and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        stations.stop()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+def test_rebuild_hot_reloads_manifest(tmp_path):
+    source = tmp_path / "base_stations.json"
+    data = json.loads(BASE_STATIONS_PATH.read_text())
+    source.write_text(json.dumps(data))
+    manifest = build_base_station_tiles(tmp_path / "tiles", source)
+    stations = DatasetManager(manifest, open_base_station_tiles)
+    old = stations.snapshot
+    data["stations"] = data["stations"][1:]
+    source.write_text(json.dumps(data))
+    build_base_station_tiles(tmp_path / "tiles", source)
+    assert stations.reload()
+    assert len(stations.snapshot) == len(old) - 1
+    data["stations"] = data["stations"][1:]
+    source.write_text(json.dumps(data))
+    build_base_station_tiles(tmp_path / "tiles", source)
+    assert stations.reload()
+    gc.collect()
+    tile_housekeeping(stations.live_snapshots())
+    # The build from two rebuilds ago stays on disk while a reader still holds it; the unused one goes
+    builds = {p.name for p in (tmp_path / "tiles").iterdir() if p.is_dir()}
+    assert builds == {old.build, stations.snapshot.build}
+    assert len(old.region(33.89, 35.50, 5)) > 0
+    del old
+    gc.collect()
+    tile_housekeeping(stations.live_snapshots())
+    assert {p.name for p in (tmp_path / "tiles").iterdir() if p.is_dir()} == {stations.snapshot.build}